@@ -4,6 +4,7 @@
 ABSTRACT: Visi-Trak FasTrak3 A/D channels interface
 """
 import sys
+import numpy as np
 import pandas as pd
 
 from dataclasses import dataclass
@@ -32,6 +33,32 @@ class Sources:
     attrib: ColumnDataSource
 
 
+class Calibration(object):
+    def __init__(self, attrib):
+        """Initialize compiled A/D calibration
+           (gain, offset and A/D mode arrays of all channels)
+        """
+        self.compile(attrib)
+
+    def compile(self, attrib):
+        """Compile calibration arrays from A/D channel attributes
+        """
+        _Eu0 = attrib.engr_data_min.to_numpy(dtype=np.float64)
+        _Eu1 = attrib.engr_data_max.to_numpy(dtype=np.float64)
+
+        self.signed = (attrib.ad_mode.to_numpy(dtype=np.int64) == cfgad.ADMode.signed)
+        self.gain = (_Eu1 - _Eu0) / cfgad._FT3_AD_DATA_RESOLUTION
+        self.offset = np.where(self.signed, 0.50 * (_Eu0 + _Eu1), _Eu0)
+
+    def convert(self, ad, channels):
+        """Convert A/D data of channels to engineering units
+           (ad samples-by-channels array, one NumPy pass)
+        """
+        c = np.asarray(channels, dtype=np.int64)
+        _ad = cfgad._FT3_AD_DATA_UNPACK(ad, self.signed[c])
+        return self.gain[c] * _ad + self.offset[c]
+
+
 class Channels(object):
     def __init__(self, session=None, verbose=util.VerboseLevel.info):
         """Initialize FasTrak3 A/D channels
@@ -83,6 +110,37 @@ class Channels(object):
 
         self.data.press_rod = pd.Series(data=_attrib.loc[_ii], name='press_rod')
 
+        # Compiled calibration
+        # NB: Recompile (see calibrate) on A/D channel attribute changes
+        self.cal = Calibration(_attrib)
+
+    def calibrate(self):
+        """Recompile A/D calibration from channel attributes
+        """
+        self.cal.compile(self.data.attrib)
+
+    def calc_all(self, df, channels=None):
+        """Calculate engineering units from A/D data for channels
+           (all analog channels of A/D data by default)
+        """
+        _methodname = self.calc_all.__name__
+
+        if channels is None:
+            channels = [c for c in range(cfgad._FT3_AD_CHANNELS_NUM) if cfgad._FT3_AD_CHANNEL_NAME(c) in df]
+        _names = [cfgad._FT3_AD_CHANNEL_NAME(c) for c in channels]
+
+        try:
+            _ad = np.column_stack([np.asarray(df[n]) for n in _names]) if _names else np.empty((len(df),0))
+            rv = pd.DataFrame(data=self.cal.convert(_ad, channels), columns=_names, index=df.index)
+        except Exception as e:
+            rv = None
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("channels A/D to engineering data exception e {}".format(e))
+                sys.stdout.flush()
+
+        return rv
+
     def calc(self, df, c):
         """Calculate engineering units from A/D data for a channel
         """
@@ -95,21 +153,9 @@ class Channels(object):
 
         try:
             _name = cfgad._FT3_AD_CHANNEL_NAME(c)
-            _attr = pd.Series(data=self.data.attrib.loc[c], name=_name)
-
-            _Eu0 = _attr.engr_data_min
-            _Eu1 = _attr.engr_data_max
-
-            if _attr.ad_mode == cfgad.ADMode.unsigned:
-                _ad = df[_name].apply(cfgad._FT3_AD_DATA_UNSIGNED)
-                _m = (_Eu1 - _Eu0) / cfgad._FT3_AD_DATA_RESOLUTION
-                _b = _Eu0
-            elif _attr.ad_mode == cfgad.ADMode.signed:
-                _ad = df[_name].apply(cfgad._FT3_AD_DATA_SIGNED)
-                _m = (_Eu1 - _Eu0) / cfgad._FT3_AD_DATA_RESOLUTION
-                _b = 0.50 * (_Eu0 + _Eu1)
+            _ad = np.asarray(df[_name])
 
-            rv = _m * _ad + _b
+            rv = pd.Series(data=self.cal.convert(_ad, c), index=df.index, name=_name)
         except Exception as e:
             rv = None
             if self.verbose >= util.VerboseLevel.error:
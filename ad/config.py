@@ -19,6 +19,10 @@ _FT3_AD_DATA_BITMASK   = np.int16(_FT3_AD_DATA_RESOLUTION - 1)
 _FT3_AD_DATA_UNSIGNED = lambda x: (x & _FT3_AD_DATA_BITMASK)
 _FT3_AD_DATA_SIGNED   = lambda x: (x & _FT3_AD_DATA_BITMASK) - (1 << _FT3_AD_DATA_BITS) if x & (1 << _FT3_AD_DATA_BITS_H) else (x & _FT3_AD_DATA_BITMASK)
 
+# A/D (array) unpacking, twos-complement sign extension iff signed (per-column Boolean)
+_FT3_AD_DATA_UNPACK = lambda x, signed: ((np.asarray(x, dtype=np.int32) & _FT3_AD_DATA_BITMASK) -
+                                         (((np.asarray(x, dtype=np.int32) >> _FT3_AD_DATA_BITS_H) & 1) * signed) * _FT3_AD_DATA_RESOLUTION)
+
 
 @unique
 class SensorType(IntEnum):
@@ -108,7 +108,7 @@ class Alarm(object):
 
 
             # Reusable shot parameter dataframe parts and dimensions
-            _A = self.session.state.data.alarm_state.drop(columns=cfgss._FT3_ALARM_STATE_SHOT_VARIABLE)
+            _A = self.session.hub.state.data.frame.drop(columns=cfgss._FT3_ALARM_STATE_SHOT_VARIABLE)
             num_shot,num_p = _A.shape
 
             _s = self.session.board.data.param.data.shot
@@ -28,12 +28,13 @@ class Recipients:
 
 
 class Alert(object):
-    def __init__(self, session=None, verbose=util.VerboseLevel.info):
+    def __init__(self, board=None, verbose=util.VerboseLevel.info):
         """Initialize FasTrak3 email/SMS alert system
+           (per board, see board.hub)
         """
         _methodname = self.__init__.__name__
 
-        self.session = session
+        self.board = board
         self.verbose = verbose
 
         if self.verbose >= util.VerboseLevel.info:
@@ -44,20 +45,26 @@ class Alert(object):
         _message = EmailMessage()
         _message['From']    = cfga._FT3_ALERT_SMTP_SERVER_USER
         _message['Subject'] = "FasTrak3 Alarms"
-        
-        _ft3_info  = 'Board Name: {:}\n'.format(session.board.name)
-        _ft3_info += 'Board IPv4: {:}\n\n'.format(session.board.ip)
 
         self.smtp = SMTP(server=None,
                          user=cfga._FT3_ALERT_SMTP_SERVER_USER,
                          password=cfga._FT3_ALERT_SMTP_SERVER_PASSWORD,
-                         message=_message, ft3_info=_ft3_info)
+                         message=_message, ft3_info=None)
+        self.bind(board)
 
         self._ssl_conn()
         self.recipients = Recipients(email=[], sms=[])
 
         self._ssl_except = 0
 
+    def bind(self, board):
+        """Bind alerts to board
+        """
+        self.board = board
+        _ft3_info  = 'Board Name: {:}\n'.format(board.name)
+        _ft3_info += 'Board IPv4: {:}\n\n'.format(board.ip)
+        self.smtp.ft3_info = _ft3_info
+
     def subscribe(self, email=None, sms=None):
         """Subscribe recipient to alerts
         """
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 end-to-end ingest benchmark
+"""
+import os
+import sys
+import time
+import json
+import platform
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from bokeh.document import Document
+
+import board.config as cfgb
+import bench.config as cfgbench
+import metrics.metrics as metrics
+import server.server as server
+import sim.emulator as emulator
+import sim.config as cfgsim
+import tcpip.capture as capture
+
+import util.util as util
+
+
+def run(source=None, shots=cfgbench._FT3_BENCH_SHOTS_NUM, rate=cfgbench._FT3_BENCH_RATE_HZ,
+        speed=cfgbench._FT3_BENCH_REPLAY_SPEED, verbose=util.VerboseLevel.warn):
+    """Run ingest benchmark of headless session
+       (shots streamed by local emulator if source is None, else
+        replay of capture file source)
+       Returns benchmark results
+    """
+    _methodname = run.__name__
+
+    metrics.clear()
+
+    E = None
+    if source is None:
+        E = emulator.Emulator(host=cfgsim._FT3_SIM_EMULATOR_HOST(0), rate=rate, verbose=verbose)
+        E.start()
+        ip = E.host
+    else:
+        ip = cfgb._FT3_BOARD_IP_LOCALHOST
+
+    S = server.Session(names=[cfgsim._FT3_SIM_EMULATOR_NAME(0)], ips=[ip], document=Document(), verbose=verbose)
+    H,B = S.hub,S.board
+    P = B.client.cb.pipeline
+
+    t0 = time.perf_counter()
+    if source is not None:
+        capture.Replay(source, B.client.cb, speed=speed, verbose=verbose).run()
+
+    # Wait on shots (emulator) and drained stack
+    _idle = None
+    while time.perf_counter() - t0 < cfgbench._FT3_BENCH_TIMEOUT_S:
+        time.sleep(cfgbench._FT3_BENCH_POLL_S)
+        if E is not None and P.persist.num_done < shots:
+            continue
+        if E is not None:
+            E.stop()
+            E = None
+        if not _busy(H):
+            _idle = _idle if _idle is not None else time.perf_counter()
+            if time.perf_counter() - _idle >= cfgbench._FT3_BENCH_SETTLE_S:
+                break
+        else:
+            _idle = None
+    t1 = (_idle if _idle is not None else time.perf_counter())
+
+    if E is not None:
+        E.stop()
+        if verbose >= util.VerboseLevel.warn:
+            util._FT3_UTIL_VERBOSE_WARN_WITH_TS(_methodname)
+            print("benchmark timeout [{} of {} shots]".format(P.persist.num_done, shots))
+            sys.stdout.flush()
+
+    rv = results(H, t1 - t0, source=source, shots=P.persist.num_done, rate=rate if source is None else speed)
+    H.close()
+    return rv
+
+def results(H, elapsed, source=None, shots=0, rate=None):
+    """Get benchmark results of board hub
+       (throughput per second and latency percentiles in ms per stage)
+    """
+    _pl = H.board.client.cb.pipeline.stats()
+    _mr = metrics.registry()
+
+    stages = {}
+    for n,kind,name in cfgbench._FT3_BENCH_STAGES:
+        if kind == 'pipeline':
+            _s = _pl[name]['latency'] if name in _pl else None
+        else:
+            _s = _mr[name].summary() if name in _mr else None
+        if _s is None:
+            continue
+        stages[n] = {'count'     : int(_s['count']),
+                     'throughput': _s['count'] / elapsed if elapsed > 0 else np.nan}
+        stages[n].update({k: 1000.0 * _s[k] for k in _s if k != 'count'})
+
+    meta = {'source' : 'emulator' if source is None else os.path.basename(source),
+            'shots'  : int(shots),
+            'lost'   : int(H.board.client.cb.num_lost),
+            'rate'   : rate,
+            'elapsed': elapsed,
+            'time'   : pd.Timestamp.now().isoformat(),
+            'rev'    : _rev(),
+            'host'   : platform.node(),
+            'python' : platform.python_version(),
+            'numpy'  : np.__version__,
+            'pandas' : pd.__version__}
+
+    return {'meta'     : meta,
+            'stages'   : stages,
+            'pipeline' : _pl,
+            'pools'    : H.pools.stats()}
+
+def save(rv, path=None):
+    """Save benchmark results (JSON)
+       Returns results file path
+    """
+    if path is None:
+        os.makedirs(cfgbench._FT3_BENCH_RESULTS_ABSPATH, exist_ok=True)
+        _name = cfgbench._FT3_BENCH_RESULTS_NAME(os.path.splitext(rv['meta']['source'])[0], pd.Timestamp.now())
+        path = os.path.join(cfgbench._FT3_BENCH_RESULTS_ABSPATH, _name)
+
+    # NB: NaN (no samples) saved as null
+    with open(path, 'w') as f:
+        json.dump(_json(rv), f, indent=2)
+    return path
+
+def load(path):
+    """Load benchmark results
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def compare(rv, baseline, tolerance=cfgbench._FT3_BENCH_REGRESSION_TOLERANCE):
+    """Compare benchmark results to baseline
+       Returns regressed stages as (stage, baseline p95, p95) list
+    """
+    reg = []
+    for n,s in rv['stages'].items():
+        b = baseline['stages'].get(n)
+        if b is None or b.get('p95') is None or s.get('p95') is None:
+            continue
+        if s['p95'] > (1.0 + tolerance) * b['p95']:
+            reg += [(n, b['p95'], s['p95'])]
+    return reg
+
+def report(rv):
+    """Print benchmark results table
+    """
+    m = rv['meta']
+    print("FasTrak3 ingest benchmark [{} {} shots, {:.2f}s, rev {}]".format(m['source'], m['shots'], m['elapsed'], m['rev']))
+    print("{:<12s} {:>8s} {:>10s} {:>10s} {:>10s} {:>10s}".format('stage', 'count', 'per s', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for n,s in rv['stages'].items():
+        print("{:<12s} {:>8d} {:>10.2f} {:>10.3f} {:>10.3f} {:>10.3f}".format(n, s['count'], s['throughput'],
+                                                                           s['p50'], s['p95'], s['p99']))
+    sys.stdout.flush()
+
+def _busy(H):
+    """Board hub has queued or running work
+    """
+    if H.board.client.cb.pipeline.depth:
+        return True
+    if any(S.depth for S in H.board.bus.subscribers()):
+        return True
+    return any(p.depth or p.running for p in H.pools)
+
+def _rev():
+    """Get source revision (None if unavailable)
+    """
+    try:
+        _cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=_cwd,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def _json(x):
+    """JSON-serializable copy of results (NaN as None)
+    """
+    if isinstance(x, dict):
+        return {str(k): _json(v) for k,v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_json(v) for v in x]
+    if isinstance(x, (np.integer,)):
+        return int(x)
+    if isinstance(x, (float, np.floating)):
+        return None if np.isnan(x) else float(x)
+    return x
+
+
+if __name__ == '__main__':
+    # Usage: python -m bench.bench [capture [baseline]]
+    _source = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != 'emulator' else None
+
+    rv = run(source=_source)
+    report(rv)
+    print("results {}".format(save(rv)))
+
+    if len(sys.argv) > 2:
+        for n,b,s in compare(rv, load(sys.argv[2])):
+            print("REGRESSION {:<12s} p95 {:.3f} ms -> {:.3f} ms".format(n, b, s))
+
+    # NB: Exit without waiting on session (e.g. SMTP) threads
+    sys.stdout.flush()
+    os._exit(0)
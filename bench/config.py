@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"""
+import os
+
+from pathlib import Path
+import inspect
+
+import metrics.config as cfgm
+
+
+_FT3_BENCH_SHOTS_NUM = 100   # Shots per emulator run
+_FT3_BENCH_RATE_HZ   = 10.00 # Emulator shot rate
+
+_FT3_BENCH_REPLAY_SPEED = None # Capture replay speed (None for maximum)
+
+_FT3_BENCH_TIMEOUT_S = 600.0 # Run timeout (incl. drain)
+_FT3_BENCH_POLL_S    = 0.10
+_FT3_BENCH_SETTLE_S  = 1.00  # Idle time of drained stack (run complete)
+
+# Reported stages (report name, pipeline stage or named latency statistics)
+_FT3_BENCH_STAGES = []
+_FT3_BENCH_STAGES += [('reassemble' , 'pipeline', 'reassemble')]
+_FT3_BENCH_STAGES += [('decode'     , 'pipeline', 'decode')]
+_FT3_BENCH_STAGES += [('convert_ad' , 'metrics' , cfgm._FT3_METRICS_CONVERT_AD)]
+_FT3_BENCH_STAGES += [('publish'    , 'pipeline', 'publish')]
+_FT3_BENCH_STAGES += [('calc'       , 'metrics' , cfgm._FT3_METRICS_CALC)]
+_FT3_BENCH_STAGES += [('classify'   , 'metrics' , cfgm._FT3_METRICS_CLASSIFY)]
+_FT3_BENCH_STAGES += [('ui_schedule', 'metrics' , cfgm._FT3_METRICS_UI)]
+_FT3_BENCH_STAGES += [('sql_write'  , 'metrics' , cfgm._FT3_METRICS_SQL_WRITE)]
+
+_FT3_BENCH_REGRESSION_TOLERANCE = 0.20 # Fractional p95 latency increase over baseline
+
+f = inspect.getfile(inspect.currentframe())
+_FT3_BENCH_RESULTS_RELPATH = 'results'
+_FT3_BENCH_RESULTS_ABSPATH = os.path.join(Path(f).resolve().parent, _FT3_BENCH_RESULTS_RELPATH)
+
+_FT3_BENCH_RESULTS_NAME = lambda source, ts: 'bench_' + source + '_' + ts.strftime('%Y%m%d_%H%M%S') + '.json'
@@ -3,8 +3,9 @@
 """
 ABSTRACT: Visi-Trak FasTrak3 board manager
 """
+import os
 import sys
-import concurrent.futures
+import time
 
 import numpy as np
 import pandas as pd
@@ -18,16 +19,36 @@ import sqlalchemy as sqla
 import sqlalchemy_utils as sqlu
 
 import data.data as data
+import data.index as index
+import data.archive as archive
+
+import bus.bus as bus
+import pool.pool as pool
+import metrics.metrics as metrics
 
 import ad.ad as ad
+import machine.machine as machine
+import part.part as part
+import calc.batch as batch
+import calc.preview as preview
+import calc.registry as registry
 import tcpip.client as client
+import tcpip.aclient as aclient
+import tcpip.connection as connection
+import tcpip.capture as capture
 
 import state.uiprop as uipss
 
 import board.config as cfgb
+import machine.config as cfgmc
+import part.config as cfgpt
 
 import data.config as cfgd
 import param.config as cfgp
+import calc.config as cfgc
+import ad.config as cfgad
+import tcpip.config as cfgt
+import metrics.config as cfgm
 
 import util.util as util
 import units.units as units
@@ -72,12 +93,14 @@ class BoardSQL:
 
 
 class Board(object):
-    def __init__(self, session=None, version=Version.ft3, name=cfgb._FT3_BOARD_NAME_DEFAULT, ip=cfgb._FT3_BOARD_IP_DEFAULT, unitsys=units.UnitSystem.bg, verbose=util.VerboseLevel.info):
+    def __init__(self, session=None, version=Version.ft3, name=cfgb._FT3_BOARD_NAME_DEFAULT, ip=cfgb._FT3_BOARD_IP_DEFAULT, unitsys=units.UnitSystem.bg, pools=None, verbose=util.VerboseLevel.info):
         """Initialize FasTrak3 board
+           (shared by subscribed server sessions, see board.hub)
         """
         self._active = False
 
-        self.session = session
+        # Subscribed server sessions
+        self.sessions = [session] if session is not None else []
         self.verbose = verbose
 
         self.version = version
@@ -86,6 +109,20 @@ class Board(object):
 
         self.unitsys = unitsys
 
+        # Board machine and part settings
+        # NB: Apply to board data conversion / calculation / alarm
+        #     states independent of sessions (sessions edit copies,
+        #     applied by apply)
+        self.machine = self._load(machine.Machine, cfgmc._FT3_MACHINE_MACHINES_ABSPATH,
+                                  cfgmc._FT3_MACHINE_MACHINES_FILENAME_PREFIX)
+        if self.machine is None:
+            self.machine = machine.Machine(verbose=verbose)
+
+        self.part = self._load(part.Part, cfgpt._FT3_PART_PARTS_ABSPATH,
+                               cfgpt._FT3_PART_PARTS_FILENAME_PREFIX)
+        if self.part is None:
+            self.part = part.Part(unitsys=unitsys, verbose=verbose)
+
         self.data = Data(meta=pd.DataFrame().ft3meta,
                          shot=pd.Series().ft3shot,
                          ref=pd.DataFrame().ft3ref,
@@ -93,6 +130,32 @@ class Board(object):
                          events=pd.Series().ft3events,
                          ad=pd.Series().ft3ad)
 
+        # Shot-number index shared by board data accessors
+        self.index = index.FT3ShotIndex()
+        for _d in (self.data.meta, self.data.shot, self.data.param, self.data.events, self.data.ad):
+            _d.index = self.index
+
+        # Named persistent worker pools (ui, sql, alerts, compute, calc)
+        self.pools = pools if pools is not None else pool.FT3Pools(verbose=verbose)
+
+        # Event bus of appended board data (topics by data type)
+        self.bus = bus.FT3Bus(verbose=verbose)
+        for _d in (self.data.meta, self.data.shot, self.data.ref, self.data.param, self.data.events, self.data.ad):
+            _d.bus = self.bus
+
+        # Memory-mapped archive of shots evicted from board data
+        # NB: One run per board session (archives of previous sessions
+        #     reset, shot numbering may restart)
+        if cfgb._FT3_BOARD_ARCHIVE_ENABLE:
+            _path = os.path.join(cfgd._FT3_DATA_ARCHIVE_ABSPATH, cfgb._FT3_BOARD_ARCHIVE_DIR(self.ip))
+            _run = time.time_ns()
+            for _d,_dt in ((self.data.meta, cfgd._FT3_DATA_META_DTYPES),
+                           (self.data.shot, cfgd._FT3_DATA_SHOT_DTYPES),
+                           (self.data.param, cfgd._FT3_DATA_PARAM_DTYPES),
+                           (self.data.events, cfgd._FT3_DATA_EVENTS_DTYPES),
+                           (self.data.ad, cfgd._FT3_DATA_AD_DTYPES)):
+                _d.archive = archive.FT3ShotArchive(path=_path, name=_d.type.name, dtypes=_dt, run=_run)
+
         _db = SQLDatabase(name=cfgb._FT3_BOARD_SQL_DATABASE+'_'+str(self.ip).replace('.','_'),
                           pdio=None)
         _tables = SQLTables(meta=cfgb._FT3_BOARD_SQL_META_TABLE,
@@ -109,8 +172,27 @@ class Board(object):
 
         self.channels = ad.Channels(session=self, verbose=verbose)
 
-        self.client = client.Client(self, verbose=verbose) # FasTrak3 TCP/IP client
-        self.client.connect()
+        # FasTrak3 TCP/IP client
+        # NB: asyncio clients of all boards share one event loop thread
+        if cfgb._FT3_BOARD_CLIENT_ASYNC and ipaddress.ip_address(self.ip) != cfgb._FT3_BOARD_IP_LOCALHOST:
+            self.client = aclient.AsyncClient(self, verbose=verbose)
+        else:
+            self.client = client.Client(self, verbose=verbose)
+
+        # Raw TCP/IP wire capture (replay by tcpip.capture.Replay)
+        if cfgb._FT3_BOARD_CAPTURE_ENABLE:
+            _name = cfgt._FT3_TCPIP_CAPTURE_NAME(self.ip, pd.Timestamp.now())
+            self.client.capture = capture.Capture(os.path.join(cfgt._FT3_TCPIP_CAPTURE_ABSPATH, _name))
+
+        # Background connection manager (board initialization does not
+        # wait on connect, state changes published to board bus)
+        self.connection = None
+        if isinstance(self.client, aclient.AsyncClient):
+            self.connection = aclient.AsyncConnectionManager(self.client, bus=self.bus, verbose=verbose)
+            self.connection.start()
+        elif self.client.super_thread is not None:
+            self.connection = connection.ConnectionManager(self.client, bus=self.bus, verbose=verbose)
+            self.connection.start()
 
     def sql_read(self):
         """Read SQL database
@@ -123,8 +205,10 @@ class Board(object):
             sys.stdout.flush()
 
 
-    def sql_write(self):
+    @metrics.timed(cfgm._FT3_METRICS_SQL_WRITE)
+    def sql_write(self, shot=None):
         """Write SQL database
+           (shot number, newest shot if None)
         """
         _methodname = self.sql_write.__name__
 
@@ -140,7 +224,7 @@ class Board(object):
             sqldb = self.sql.database.pdio
 
             # SQL database shot metadata table
-            df = self.data.meta._data.tail(1)
+            df = self.data.meta.tail(1) if shot is None else self.data.meta.get(shot)
 
             # Create empty shot metadata table
             # NB: Pandas io.sql.SQLDatabase() function
@@ -163,7 +247,7 @@ class Board(object):
 
 
             #SQL database shot data table
-            df = self.data.shot._data.iloc[-1]
+            df = self.data.shot.data.last() if shot is None else self.data.shot.get(shot)
 
             # Create empty shot data table
             # NB: Pandas io.sql.SQLDatabase() function
@@ -187,7 +271,7 @@ class Board(object):
 
 
             #SQL database events table
-            df = self.data.events._data.iloc[-1]
+            df = self.data.events.data.last() if shot is None else self.data.events.get(shot)
 
             # Create empty events table
             # NB: Pandas io.sql.SQLDatabase() function
@@ -211,7 +295,7 @@ class Board(object):
 
 
             #SQL database shot A/D measurements table
-            df = self.data.ad._data.iloc[-1]
+            df = self.data.ad.data.last() if shot is None else self.data.ad.get(shot)
 
             # Create empty shot A/D measurements table
             # NB: Pandas io.sql.SQLDatabase() function
@@ -270,6 +354,7 @@ class Board(object):
                 sys.stdout.flush()
 
 
+    @metrics.timed(cfgm._FT3_METRICS_CALC)
     def _calc_cb(self, new):
         """Calculate derived-parameters for warnings/alarms
            NB: Implicit reqm't to pass metadata (and events)
@@ -283,108 +368,28 @@ class Board(object):
 
         try:
             # Machine and part references
-            Sm,Sp = self.session.machine, self.session.part
-
-            # Shot data, position- and time- subsets
-            dfp = new[(new.type=='P')]
-            dft = new[(new.type=='T')]
-
-            # Drop invalid first sample of datasets owing to one-based start 
-            # indexes of position- and time- sampled data in the FasTrak2(3)
-            # firmware.
-            dfp = dfp.drop(dfp.head(2).index)
-            dft = dft.drop(dft.head(2).index)
-
-            dfp.reset_index(drop=True, inplace=True)
-            dft.reset_index(drop=True, inplace=True)
+            Sm,Sp = self.machine, self.part
 
             # Shot number
             s = new.shot.values[0]
 
-            # FILL TIME (Sect 2.1 Design Document)
-            # NB: t2 calculation via searchsorted() method
-            #     implies position increases monotonically
-            t3,p3 = dfp.t.iloc[-1], dfp.pos.iloc[-1]
-            p2 = p3 - Sp.plunger.p2_p3
-            t2 = dfp.t.iloc[min(dfp.pos.searchsorted(p2),len(dfp)-1)]
-            _fill_time = t3 - t2
-
-            # intermediate/reusable indices
-            _ii_fs = ((dfp.pos > Sp.csfs.min_pos) &
-                      (dfp.vel > Sp.csfs.min_vel))
-            _ii_csfs = _ii_fs.idxmax()
-
-            # AVERAGE SLOW SHOT VELOCITY (Sect. 2.2 Deisgn Document)
-            # NB: FasTrak2 SureTrak codebase defines initial movement
-            #     of plunger as first position-sampled point
-            _ss_vel_avg = dfp.vel[:_ii_csfs].mean()
-
-            # AVERAGE FAST SHOT VELOCITY (Sect. 2.3 Design Document)
-            _fs_vel_avg = dfp.vel[_ii_fs].mean()
-
-            # BISCUIT SIZE (Sect. 2.4 Design Document)
-            _biscuit_size = Sp.stroke.total - new.pos.max()
-
-            # INTENSIFICATION SQUEEZE DISTANCE (Sect. 2.5 Design Document)
-            _intens_squeeze_dist = dft.pos.max() - p3
-    
-            # INTENSIFICATION RISE TIME (Sect. 2.6 Design Document)
-            # NB: t3 (time corresponding to p3) explicitly handled
-            #     in time-sampled points from FasTrak3 board, i.e.
-            #     time restarts at zero for time-sampled data
-            _ii_dt = (dft.press_head >= Sp.intens.p_target).idxmax()
-            _intens_rise_time = dft.t[_ii_dt]
-
-            # CSFS (Sect. 2.7 Design Document)
-            _csfs = dfp.pos[_ii_csfs]
-
-            # CYCLE TIME (Sect. 2.8 Design Document)
-            _Mh = self.data.meta.data
-            if s > _Mh.shot.min():
-                _cycle_time = _Mh.t0[_Mh.shot==s].values[0] - _Mh.t0[_Mh.shot==(s-1)].values[0]
-                _cycle_time /= np.timedelta64(1, 's')
-            else:
-                # No historical prior shots to calculate cycle time
-                _cycle_time = cfgp._FT3_ALARM_PARAMETER_TARGET_VALUES[-3]
-
-            # PEAK INTENSIFICATION PRESSURE (Sect. 2.9 Design Document)
-            # NB: metal pressure definition per technical interchanges
-            #     with Visi-Trak 21-AUG-2019 and review of the FasTrak2
-            #     SureTrak 2020 codebase.
-            _mepr = ((dft.press_head * Sm.geom.head_area) -
-                     (dft.press_rod * Sm.geom.rod_area  ))
-            _mepr /= Sm.geom.plunger_area
-            
-            _ii_pk = _mepr[Sp.intens.pk_skip:].idxmax()
-            _peak_intens_press = dft.press_head[_ii_pk]
-
-            # SLOW SHOT VARIATION RATE (Sect. 2.10 Design Document)
-            _ii_ss_user = ((dfp.pos >= Sp.ss_var.start_pos_user) &
-                           (dfp.pos <= Sp.ss_var.end_pos_user  ))
-            _ss_vel = dfp.vel[_ii_ss_user].mean()
-
-            _ii_ss_p0 = ((dfp.pos > (Sp.ss_var.start_pos_init + Sp.ss_var.start_pos_bias)) &
-                         (dfp.vel > (Sp.ss_var.start_pos_gain *_ss_vel                  ))).idxmax()
-            _ii_ss_p1 = (dfp.pos <= (_csfs - Sp.ss_var.end_pos_bias)).idxmin()
-
-            _Vss = dfp.vel[_ii_ss_p0:_ii_ss_p1]
-            _ss_var_rate = 50.0 * (_Vss.max() - _Vss.min()) / _ss_vel
+            # Derived parameters (Sect. 2 Design Document) of registered
+            # parameter modules, shared intermediates evaluated once
+            # NB: Failed parameters NaN, remaining parameters retained
+            _pool = self.pools.calc if cfgc._FT3_CALC_REGISTRY_PARALLEL else None
+            r = registry.registry(verbose=self.verbose).evaluate(pool=_pool, new=new, machine=Sm, part=Sp,
+                                                                 meta=self.data.meta, shot=s)
+
+            if r.errors and self.verbose >= util.VerboseLevel.error:
+                for n,e in r.errors.items():
+                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                    print("shot {} parameter {} exception e {}".format(s, n, e))
+                sys.stdout.flush()
 
-            if np.isnan(_ss_var_rate):
-                _ss_var_rate = 100.0
-            
             # Alarm parameters
-            p = []
-            p += [_fill_time]
-            p += [_ss_vel_avg]
-            p += [_fs_vel_avg]
-            p += [_biscuit_size]
-            p += [_intens_squeeze_dist]
-            p += [_intens_rise_time]
-            p += [_csfs]
-            p += [_cycle_time]
-            p += [_peak_intens_press]
-            p += [_ss_var_rate]
+            # NB: Site-specific parameters retained iff named in
+            #     _FT3_ALARM_PARAMETER_NAMES
+            p = [r.values.get(n, np.nan) for n in cfgp._FT3_ALARM_PARAMETER_NAMES]
 
             _shot = pd.Series(data=[s], name="shot")
             _p = pd.DataFrame(data=[p], columns=cfgp._FT3_ALARM_PARAMETER_NAMES)
@@ -403,26 +408,9 @@ class Board(object):
             return
 
         if self.verbose >= util.VerboseLevel.debug:
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("fill time                        {:8.2f} ms  ".format(_fill_time))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("average slow-shot velocity       {:8.2f} in/s".format(_ss_vel_avg))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("average fast-shot velocity       {:8.2f} in/s".format(_fs_vel_avg))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("biscuit size                     {:8.2f} in  ".format(_biscuit_size))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("intensification squeeze distance {:8.2f} in  ".format(_intens_squeeze_dist))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("intensification rise time        {:8.2f} ms  ".format(_intens_rise_time))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("CSFS                             {:8.2f} in  ".format(_csfs))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("cycle time                       {:8.2f} s   ".format(_cycle_time))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("peak intensification pressure    {:8.2f} psi ".format(_peak_intens_press))
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("slow-shot variation rate         {:8.2f}     ".format(_ss_var_rate))
+            for n,v in zip(cfgp._FT3_ALARM_PARAMETER_DESCR, p):
+                util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
+                print("{:<32s} {:8.2f}".format(n.lower(), v))
             sys.stdout.flush()
 
         # Profile/debug
@@ -434,8 +422,74 @@ class Board(object):
             print("profile (t1 - t0) {:.3f}s   (tf - t1) {:.3f}s".format(dt0,dt1))
             print("")
  
+    @metrics.timed(cfgm._FT3_METRICS_RECALC)
+    def recalc(self):
+        """Recalculate derived-parameters of all retained shots
+           (vectorized batch, e.g. part settings applied, compute pool),
+           republishing parameters (and alarm states)
+        """
+        _methodname = self.recalc.__name__
+
+        Sm,Sp = self.machine, self.part
+
+        # NB: Parameters replaced only if not replaced meanwhile (e.g.
+        #     SQL read), else recalculated; parameters of shots
+        #     calculated meanwhile (newer) and of shots no longer
+        #     retained by trajectory store (older) retained. Samples
+        #     copied under store mutex (publish thread appends wrap
+        #     store arena)
+        for _ in range(cfgc._FT3_CALC_RECALC_RETRY_NUM):
+            _g = self.data.param.generation
+
+            _shots = self.data.shot.data.shots
+            if not len(_shots):
+                return
+
+            _v = self.data.shot.range(_shots[0], _shots[-1], copy=True)
+            T = batch.gather([v for _,v in _v], [s for s,_ in _v])
+            _p = batch.calc(T, self.data.meta.data, Sm, Sp, shot=self._roots(_v), verbose=self.verbose)
+            _p = self.data.param.merge(_p, generation=_g)
+            if _p is not None:
+                break
+        else:
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("derived-parameters replaced during recalculation ({:d} attempts)".format(cfgc._FT3_CALC_RECALC_RETRY_NUM))
+                sys.stdout.flush()
+            return
+
+        self.bus.publish(data.FT3DataType.param, _p)
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("recalculated derived-parameters of {:d} shots".format(len(T.shot)))
+            sys.stdout.flush()
+
+    def preview(self, machine, part, n=cfgc._FT3_CALC_PREVIEW_SHOTS_NUM):
+        """Get part settings what-if preview of last n retained shots
+           (None if no retained shots)
+        """
+        _shots = self.data.shot.data.shots
+        if not len(_shots):
+            return None
+
+        _v = self.data.shot.range(_shots[max(len(_shots) - n, 0)], _shots[-1], copy=True)
+        T = batch.gather([v for _,v in _v], [s for s,_ in _v])
+        _meta, _shot = self.data.meta.data, self._roots(_v)
+        return preview.Preview(T, batch.calc(T, _meta, machine, part, shot=_shot, verbose=self.verbose), part,
+                               machine=machine, meta=_meta, shot=_shot, verbose=self.verbose)
+
+    def _roots(self, views):
+        """Per-shot evaluation roots of shot views (shot,views) by shot
+           index (parameters without batch implementation, see
+           calc.batch)
+        """
+        return lambda i: {'new': pd.DataFrame(views[i][1]), 'shot': views[i][0], 'meta': self.data.meta}
+
+    @metrics.timed(cfgm._FT3_METRICS_UI)
     def _update_cb(self, new):
         """Update shot trajectory and parameter alarm-state UIs
+           of subscribed (streaming) sessions
         """
         _methodname = self._update_cb.__name__
 
@@ -443,12 +497,41 @@ class Board(object):
         if self.verbose >= util.VerboseLevel.debug:
             t0 = util._FT3_UTIL_NOW_TS()
 
-        # Shot parameter data
+        _ss = [ss for ss in list(self.sessions) if ss.stream]
+        if not _ss:
+            return
+
+        # NB: UI updates queued to persistent ui pool (not awaited),
+        #     coalesced per session (slow sessions skip to newest shot)
+        for ss in _ss:
+            self._update_session(ss)
+
+        # Profile/debug
+        if self.verbose >= util.VerboseLevel.debug:
+            tf = util._FT3_UTIL_NOW_TS()
+            print("____________________________________________________________________________________")
+            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
+            print("shot-data update total profile     {:.3f}s".format((tf - t0).total_seconds()))
+            print("____________________________________________________________________________________")
+            
+    def _update_session(self, ss):
+        """Schedule shot trajectory and parameter alarm-state UI
+           updates of session (e.g. session board selected)
+           NB: At most one pending or running update per session
+        """
+        self.pools.ui.submit_latest(ss, self._session_update, ss)
+
+    def _session_update(self, ss):
+        """Update shot trajectory and parameter alarm-state UIs of
+           session (newest shot, ui pool)
+        """
         _spdf = self.data.param.data
+        if not len(_spdf):
+            return
 
         # UI shot indexes and shot data dimensions
         # NB: UI shot indexes are not equal to shot numbers in general
-        _uii = self.session.state.uii
+        _uii = ss.state.uii
 
         _uii.num_shot = len(_spdf)
         _uii.num_view = min(_uii.num_shot,uipss._FT3_ALARM_STATE_STATUS_PLOT_COLS)
@@ -460,76 +543,102 @@ class Board(object):
         if (s < _uii.min_shot):
             _uii.sel_shot = _uii.min_shot - 1
 
-        # UI consistency iff state / shot-trajectory updates
-        # partitioned to parallel asynchronous thread-pools
         s = _uii.sel_shot
         if (s < _uii.num_shot - 1):
             s += 1
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as e:
-            _ = e.submit(fn=self.session.state.update)
-            _ = e.submit(fn=self.session.shot.update, sel_shot=_spdf.shot[s])
+        ss.state.update()
+        ss.shot.update(sel_shot=_spdf.shot[s])
+
+    @property
+    def session(self):
+        """Get primary (first subscribed) session, None if unsubscribed
+        """
+        _ss = self.sessions
+        return _ss[0] if _ss else None
 
-        # Profile/debug
-        if self.verbose >= util.VerboseLevel.debug:
-            tf = util._FT3_UTIL_NOW_TS()
-            print("____________________________________________________________________________________")
-            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
-            print("shot-data update total profile     {:.3f}s".format((tf - t0).total_seconds()))
-            print("____________________________________________________________________________________")
-            
     @property
     def active(self):
         return self._active
 
     @active.setter
     def active(self, val):
-        if val:
-            self._active = True
-            self.data.shot.cb = self._calc_cb
-            self.data.param.cb = self._update_cb
-        else:
-            self._active = False
-            #self.data.shot.cb = lambda new: None
-            self.data.param.cb = lambda new: None
+        # NB: Session UI updates only (calculation and alarm states
+        #     independent of sessions, see board.hub)
+        self._active = bool(val)
+
+    def apply(self, machine=None, part=None):
+        """Apply machine and/or part settings (e.g. of session) to board
+           (saved per board, loaded on board initialization), scheduling
+           recalculation iff calculation settings changed
+        """
+        _recalc = False
+        if machine is not None:
+            _recalc = True
+            self.machine.update(machine)
+            self.machine.save(filename=cfgb._FT3_BOARD_SETTINGS_NAME(cfgmc._FT3_MACHINE_MACHINES_FILENAME_PREFIX, self.ip))
+        if part is not None:
+            # NB: Targets/limits/wires (part parameters) reclassify
+            #     alarm states only
+            _calc = lambda P: (P.stroke, P.plunger, P.csfs, P.intens, P.ss_var)
+            _recalc = _recalc or _calc(self.part) != _calc(part)
+            self.part.update(part)
+            self.part.save(filename=cfgb._FT3_BOARD_SETTINGS_NAME(cfgpt._FT3_PART_PARTS_FILENAME_PREFIX, self.ip))
+
+        # NB: At most one pending or running recalculation per board
+        if _recalc:
+            self.pools.compute.submit_latest(self.recalc, self.recalc)
+
+    def _load(self, cls, path, prefix):
+        """Load board settings (machine or part class cls) saved by apply
+           (None if not saved)
+        """
+        _f = cfgb._FT3_BOARD_SETTINGS_NAME(prefix, self.ip)
+        if not os.path.exists(os.path.join(path, _f)):
+            return None
+        return cls.load(_f)
 
+    @metrics.timed(cfgm._FT3_METRICS_CONVERT_AD)
     def convert_ad(self, ad):
         """Convert A/D measurements to engineering-units data
+           (vectorized over A/D sample columns, position- then
+            time- sampled data)
         """
-        _dfp = pd.DataFrame(data=None, columns=cfgd._FT3_DATA_SHOT_DATAFRAME_VARIABLES)
-        _dft = pd.DataFrame(data=None, columns=cfgd._FT3_DATA_SHOT_DATAFRAME_VARIABLES)
-
-        _adp = ad[ad.type=='P']
-        _adt = ad[ad.type=='T']
-
-        _dfp.shot = _adp.shot
-        _dft.shot = _adt.shot
-        
-        _dfp.type = _adp.type
-        _dft.type = _adt.type
-        
-        _dfp.t = _adp.one_ms_timer
-        _t = _adt.one_ms_timer.values - _dfp.t.values[-1]
-        _t[0] = 0.0
-        _dft.t = _t
+        _type = np.asarray(ad['type'])
+        _ii = np.concatenate((np.flatnonzero(_type == 'P'), np.flatnonzero(_type == 'T')))
+        _num_p = np.count_nonzero(_type == 'P')
+
+        _col = lambda n: np.asarray(ad[n])[_ii]
 
         # rod pitch, mm
-        _pmm = self.session.machine.rod.pitch
+        _pmm = self.machine.rod.pitch
+
+        # Time-sampled data time restarts at zero after position-sampled data
+        _t = _col('one_ms_timer').astype(np.float64)
+        if _num_p and len(_t) > _num_p:
+            _t[_num_p:] -= _t[_num_p-1]
+            _t[_num_p] = 0.0
 
-        _dfp.pos = (_adp.position * _pmm)/4.0
-        _dft.pos = (_adt.position * _pmm)/4.0
+        _pos = (_col('position') * _pmm)/4.0
 
-        _vel = (cfgb._FT3_BOARD_QUAD_COUNTS_PER_SEC * _pmm)/np.diff(_adp.vel_count_q1)
-        _dfp.vel = np.append(0.0,_vel)
-        _dft.vel = 0.0
+        _vel = np.zeros(len(_ii))
+        _vel[1:_num_p] = (cfgb._FT3_BOARD_QUAD_COUNTS_PER_SEC * _pmm)/np.diff(_col('vel_count_q1')[:_num_p])
 
-        _dfp.press_head = self.channels.calc_press_head(_adp)
-        _dft.press_head = self.channels.calc_press_head(_adt)
+        # Head and rod pressure channels (one calibration pass)
+        _c = [self.channels.data.press_head_channel, self.channels.data.press_rod_channel]
+        _ad = np.column_stack([_col(cfgad._FT3_AD_CHANNEL_NAME(c)) for c in _c])
+        _press = self.channels.cal.convert(_ad, _c)
 
-        _dfp.press_rod  = self.channels.calc_press_rod(_adp)
-        _dft.press_rod  = self.channels.calc_press_rod(_adt)
+        data = {}
+        data.update(shot = _col('shot'))
+        data.update(type = _type[_ii])
+        data.update(t = _t)
+        data.update(pos = _pos)
+        data.update(vel = _vel)
+        data.update(press_head = _press[:,0])
+        data.update(press_rod = _press[:,1])
 
-        return pd.concat((_dfp,_dft)).reset_index(drop=True)
+        return pd.DataFrame(data=data, columns=cfgd._FT3_DATA_SHOT_DATAFRAME_VARIABLES)
 
 class Boards(object):
     def __init__(self, default=True, verbose=util.VerboseLevel.info):
@@ -564,7 +673,7 @@ class Boards(object):
                 except ValueError:
                     _ip = int(cfgb._FT3_BOARD_IP_DEFAULT)
             
-            self.boards += [cfgb.Board(version=Version.ft3, name=_name, ip=ipaddress.ip_address(_ip))]
+            self.boards += [Board(version=Version.ft3, name=_name, ip=ipaddress.ip_address(_ip), verbose=self.verbose)]
         else:
             if self.verbose >= util.VerboseLevel.error:
                 util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -25,6 +25,15 @@ _FT3_BOARD_SQL_SHOT_TABLE   = "shot"
 _FT3_BOARD_SQL_EVENTS_TABLE = "events"
 _FT3_BOARD_SQL_AD_TABLE     = "ad"
 
+_FT3_BOARD_CLIENT_ASYNC = False # Serve board connection by shared asyncio event loop (tcpip.aclient)
+
+_FT3_BOARD_CAPTURE_ENABLE = False # Tee raw TCP/IP traffic to capture file (tcpip.capture)
+
+_FT3_BOARD_ARCHIVE_ENABLE  = True # Spill evicted shots to memory-mapped archive
+_FT3_BOARD_ARCHIVE_DIR     = lambda ip: str(ip).replace('.','_')
+
+_FT3_BOARD_SETTINGS_NAME = lambda prefix, ip: prefix + '_' + str(ip).replace('.','_') + '.pkl' # Board machine/part settings
+
 _FT3_BOARD_SQL_CONN_PREFIX = "postgresql+psycopg2://"
 _FT3_BOARD_SQL_FOREIGN_KEY = "shot"
 
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 process-wide board data hub
+"""
+import sys
+
+from threading import Thread, Event, Lock, RLock
+
+from dataclasses import dataclass
+
+import ipaddress
+
+import board.board as board
+import pool.pool as pool
+import bus.bus as bus
+import data.data as data
+import alert.alert as alert
+import state.alarms as alarms
+import board.config as cfgb
+
+import tcpip.config as cfgt
+
+import util.util as util
+import units.units as units
+
+
+_hubs = {}     # Board hubs keyed by board IP
+_pools = None  # Worker pools shared by board hubs
+_mutex = RLock() # NB: Reentrant (hub initialization gets shared pools)
+
+
+@dataclass
+class Subscriptions:
+    calc : bus.Subscriber
+    state: bus.Subscriber
+
+
+class BoardHub(object):
+    def __init__(self, version=board.Version.ft3, name=cfgb._FT3_BOARD_NAME_DEFAULT, ip=cfgb._FT3_BOARD_IP_DEFAULT, unitsys=units.UnitSystem.bg, verbose=util.VerboseLevel.info):
+        """Initialize FasTrak3 board hub
+           (one TCP/IP client, data store and ingest pipeline per board,
+            shared read-only by subscribed server sessions)
+        """
+        self.verbose = verbose
+
+        self.ip = ipaddress.ip_address(ip)
+
+        # Named persistent worker pools (ui, sql, alerts, compute, calc) shared by boards
+        self.pools = pools(verbose=verbose)
+
+        self.board = board.Board(version=version, name=name, ip=self.ip, unitsys=unitsys, pools=self.pools, verbose=verbose)
+
+        # Board e-mail/SMS alerts and alarm states (board part limits)
+        self.alert = alert.Alert(board=self.board, verbose=verbose)
+        self.state = alarms.AlarmStates(self.board, alert=self.alert, verbose=verbose)
+
+        # NB: Parameter calculation is lossless (every shot), alarm
+        #     states and session UI updates latest-only (slow UIs skip
+        #     to newest shot), independent of subscribed sessions
+        _calc = self.board.bus.subscribe(data.FT3DataType.shot, self.board._calc_cb,
+                                         policy=bus.Policy.lossless)
+        _state = self.board.bus.subscribe(data.FT3DataType.param, self._state_cb,
+                                          policy=bus.Policy.latest)
+        self._subs = Subscriptions(calc=_calc, state=_state)
+
+        self._mutex = Lock()
+
+        # TCP/IP heartbeat (one per board, independent of sessions)
+        self._stop = Event()
+        if self.board.client.super_thread is not None:
+            self.heartbeat_thread = Thread(target=self._heartbeat, daemon=True)
+            self.heartbeat_thread.start()
+        else:
+            self.heartbeat_thread = None
+
+    def subscribe(self, session):
+        """Subscribe server session to board data
+           (activates board on first subscription)
+        """
+        _methodname = self.subscribe.__name__
+
+        with self._mutex:
+            if session not in self.board.sessions:
+                self.board.sessions = self.board.sessions + [session]
+            self.board.active = True
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("board {} session subscribed ({:d} sessions)".format(self.ip, len(self.board.sessions)))
+            sys.stdout.flush()
+
+    def unsubscribe(self, session):
+        """Unsubscribe server session from board data
+           (deactivates board UI updates on last unsubscription)
+        """
+        _methodname = self.unsubscribe.__name__
+
+        with self._mutex:
+            self.board.sessions = [ss for ss in self.board.sessions if ss is not session]
+            if not self.board.sessions:
+                self.board.active = False
+
+        # Session connection-state subscription
+        _sub = getattr(session, '_conn_sub', None)
+        if _sub is not None:
+            self.board.bus.unsubscribe(_sub)
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("board {} session unsubscribed ({:d} sessions)".format(self.ip, len(self.board.sessions)))
+            sys.stdout.flush()
+
+    def close(self):
+        """Close board hub
+           (draining ingest pipeline and queued bus messages; shared pool
+            tasks drained on close of last board hub)
+        """
+        global _pools
+
+        self._stop.set()
+        if self.board.connection is not None:
+            self.board.connection.stop()
+        self.board.client.cb.pipeline.close(drain=True)
+        self.board.active = False
+        self.board.bus.close(drain=True)
+
+        # Archives (pending index entries written)
+        for _d in (self.board.data.meta, self.board.data.shot, self.board.data.param,
+                   self.board.data.events, self.board.data.ad):
+            if _d.archive is not None:
+                _d.archive.close()
+
+        with _mutex:
+            if _hubs.get(self.ip) is self:
+                del _hubs[self.ip]
+            _last = not _hubs and _pools is self.pools
+            if _last:
+                _pools = None
+        if _last:
+            self.pools.shutdown(wait=True)
+
+        if self.board.client.super_thread is not None:
+            self.board.client.stop()
+        else:
+            self.board.client.close()
+        if self.board.client.capture is not None:
+            self.board.client.capture.close()
+
+    @property
+    def sessions(self):
+        return self.board.sessions
+
+    def telemetry(self):
+        """Get board connection health (see tcpip.telemetry)
+        """
+        rv = self.board.client.telemetry.snapshot()
+        rv['state'] = self.board.connection.state.name if self.board.connection is not None else None
+        rv['lost_shots'] = self.board.client.cb.num_lost
+        return rv
+
+    def _state_cb(self, new):
+        """Update board alarm states (and alerts), then UIs of
+           subscribed sessions
+        """
+        self.state.update()
+        if self.board.active:
+            self.board._update_cb(new)
+
+    def _heartbeat(self):
+        """FasTrak3 TCP/IP heartbeat periodic transmit
+        """
+        while not self._stop.wait(cfgt._FT3_TCPIP_HEARTBEAT_PERIOD_MS / 1000.0):
+            self.board.client._heartbeat()
+
+
+def get(version=board.Version.ft3, name=cfgb._FT3_BOARD_NAME_DEFAULT, ip=cfgb._FT3_BOARD_IP_DEFAULT, unitsys=units.UnitSystem.bg, verbose=util.VerboseLevel.info):
+    """Get board hub by board IP (created on first request)
+    """
+    _ip = ipaddress.ip_address(ip)
+    with _mutex:
+        H = _hubs.get(_ip)
+        if H is None:
+            H = _hubs[_ip] = BoardHub(version=version, name=name, ip=_ip, unitsys=unitsys, verbose=verbose)
+    return H
+
+def pools(verbose=util.VerboseLevel.info):
+    """Get worker pools shared by board hubs (created on first request)
+    """
+    global _pools
+    with _mutex:
+        if _pools is None:
+            _pools = pool.FT3Pools(verbose=verbose)
+        return _pools
+
+def hubs():
+    """Get board hubs
+    """
+    with _mutex:
+        return list(_hubs.values())
+
+def telemetry():
+    """Get connection health of board hubs (keyed by board IP)
+    """
+    return {str(H.ip): H.telemetry() for H in hubs()}
+
+def release(session_context):
+    """Unsubscribe sessions of (destroyed) server session context
+       from board hubs
+    """
+    for H in hubs():
+        for ss in list(H.sessions):
+            if ss.document.session_context is session_context:
+                H.unsubscribe(ss)
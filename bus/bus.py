@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 publish/subscribe event bus
+"""
+import sys
+
+from collections import deque
+from enum import IntEnum,unique
+
+from threading import Thread, Condition, Lock
+
+import bus.config as cfgbus
+
+import util.util as util
+
+
+@unique
+class Policy(IntEnum):
+    latest   = 0 # Deliver newest message only (older undelivered messages dropped)
+    lossless = 1 # Deliver every message (publisher blocks while queue full, up to publish timeout)
+
+
+class Subscriber(object):
+    def __init__(self, topic, fn, policy=Policy.latest, maxlen=cfgbus._FT3_BUS_QUEUE_MAX_LEN, name=None, verbose=util.VerboseLevel.info):
+        """Initialize event bus subscriber
+           (bounded queue and dispatch thread per subscriber)
+        """
+        self.topic = topic
+        self.fn = fn
+        self.policy = policy
+        self.name = name if name is not None else cfgbus._FT3_BUS_SUBSCRIBER_NAME(topic, fn)
+        self.verbose = verbose
+
+        self._maxlen = 1 if policy == Policy.latest else max(int(maxlen), 1)
+        self._queue = deque()
+        self._cv = Condition()
+        self._closed = False
+
+        self.num_delivered = 0
+        self.num_dropped = 0
+
+        self.thread = Thread(target=self._dispatch, name=self.name, daemon=True)
+        self.thread.start()
+
+    def put(self, msg):
+        """Queue message per subscriber delivery policy
+           Returns False if message not queued (closed or timeout)
+        """
+        _methodname = self.put.__name__
+
+        with self._cv:
+            if self._closed:
+                return False
+
+            if self.policy == Policy.latest:
+                self.num_dropped += len(self._queue)
+                self._queue.clear()
+            else:
+                # NB: Wedged subscriber (e.g. stalled callback) drops
+                #     messages after publish timeout rather than
+                #     blocking publisher (and ingest) indefinitely
+                ok = self._cv.wait_for(lambda: self._closed or len(self._queue) < self._maxlen,
+                                       timeout=cfgbus._FT3_BUS_PUBLISH_TIMEOUT_S)
+                if not ok or self._closed:
+                    self.num_dropped += 1
+                    if not ok and self.verbose >= util.VerboseLevel.error:
+                        util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                        print("subscriber {} queue full {:.2f}s, message dropped ({:d} dropped)".format(
+                              self.name, cfgbus._FT3_BUS_PUBLISH_TIMEOUT_S, self.num_dropped))
+                        sys.stdout.flush()
+                    return False
+
+            self._queue.append(msg)
+            self._cv.notify_all()
+        return True
+
+    def close(self, drain=True, timeout=cfgbus._FT3_BUS_CLOSE_TIMEOUT_S):
+        """Close subscriber, optionally delivering queued messages
+        """
+        with self._cv:
+            self._closed = True
+            if not drain:
+                self.num_dropped += len(self._queue)
+                self._queue.clear()
+            self._cv.notify_all()
+        self.thread.join(timeout)
+
+    @property
+    def depth(self):
+        """Get queued (undelivered) message count
+        """
+        return len(self._queue)
+
+    def _dispatch(self):
+        """Subscriber dispatch thread
+        """
+        _methodname = self._dispatch.__name__
+
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: self._closed or self._queue)
+                if not self._queue:
+                    return
+                msg = self._queue.popleft()
+                self._cv.notify_all()
+
+            try:
+                self.fn(msg)
+                self.num_delivered += 1
+            except Exception as e:
+                if self.verbose >= util.VerboseLevel.error:
+                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                    print("subscriber {} exception e {}".format(self.name, e))
+                    sys.stdout.flush()
+
+
+class FT3Bus(object):
+    def __init__(self, verbose=util.VerboseLevel.info):
+        """Initialize publish/subscribe event bus
+           (topics are FasTrak3 data types)
+        """
+        self.verbose = verbose
+
+        self._subs = {} # Subscribers keyed by topic
+        self._mutex = Lock()
+
+    def subscribe(self, topic, fn, policy=Policy.latest, maxlen=cfgbus._FT3_BUS_QUEUE_MAX_LEN, name=None):
+        """Subscribe callback to topic
+           Returns subscriber (see unsubscribe)
+        """
+        S = Subscriber(topic, fn, policy=policy, maxlen=maxlen, name=name, verbose=self.verbose)
+        with self._mutex:
+            self._subs[topic] = self._subs.get(topic, []) + [S]
+        return S
+
+    def unsubscribe(self, sub, drain=False):
+        """Unsubscribe (and close) subscriber
+        """
+        with self._mutex:
+            self._subs[sub.topic] = [S for S in self._subs.get(sub.topic, []) if S is not sub]
+        sub.close(drain=drain)
+
+    def publish(self, topic, msg):
+        """Publish message to topic subscribers
+           NB: Returns without waiting on delivery (lossless subscribers
+               with full queues apply back-pressure to publisher)
+        """
+        for S in self._subs.get(topic, []):
+            S.put(msg)
+
+    def subscribers(self, topic=None):
+        """Get subscribers (of topic)
+        """
+        with self._mutex:
+            if topic is not None:
+                return list(self._subs.get(topic, []))
+            return [S for ss in self._subs.values() for S in ss]
+
+    def close(self, drain=True):
+        """Close bus, optionally delivering queued messages
+        """
+        with self._mutex:
+            _subs = [S for ss in self._subs.values() for S in ss]
+            self._subs = {}
+        for S in _subs:
+            S.close(drain=drain)
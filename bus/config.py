@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"""
+
+_FT3_BUS_QUEUE_MAX_LEN = 64 # Lossless subscriber queue bound (publisher blocks when full)
+
+_FT3_BUS_PUBLISH_TIMEOUT_S = 2.00 # Lossless publisher wait on full queue (message dropped, counted, on timeout)
+_FT3_BUS_CLOSE_TIMEOUT_S   = 5.00 # Dispatch thread drain wait on close
+
+_FT3_BUS_SUBSCRIBER_NAME = lambda topic, fn: '{}:{}'.format(getattr(topic, 'name', topic), getattr(fn, '__name__', fn))
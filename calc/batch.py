@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 vectorized batch alarm-parameter calculation
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from dataclasses import dataclass
+
+import calc.registry as registry
+
+import calc.config as cfgc
+import param.config as cfgp
+
+import util.util as util
+
+
+# NB: Batch calculations reproduce Board._calc_cb (registered
+#     parameters) over all shots at once, by vectorized batch
+#     implementations of parameters (e.g. calc.params) where declared,
+#     else per shot. Shots are segments of concatenated trajectory
+#     arrays; per-shot masks, first indexes (cf. idxmax) and means are
+#     segmented reductions.
+
+
+@dataclass
+class Segments:
+    start: np.ndarray # Segment (shot) sample offsets
+    count: np.ndarray # Segment sample counts
+    seg  : np.ndarray # Segment of each sample
+    local: np.ndarray # Sample index within segment
+
+
+@dataclass
+class Trajectories:
+    shot   : np.ndarray # Shot numbers, oldest to newest
+    p      : dict       # Position-sampled columns (concatenated)
+    t      : dict       # Time-sampled columns (concatenated)
+    ps     : Segments   # Position-sampled segments
+    ts     : Segments   # Time-sampled segments
+    pos_max: np.ndarray # Shot maximum position (all samples)
+
+
+_COLUMNS = ('t', 'pos', 'vel', 'press_head', 'press_rod')
+
+
+def segments(count):
+    """Make segments of per-segment sample counts
+    """
+    count = np.asarray(count, dtype=np.int64)
+    start = np.zeros(len(count), dtype=np.int64)
+    if len(count):
+        start[1:] = np.cumsum(count)[:-1]
+    seg = np.repeat(np.arange(len(count)), count)
+    local = np.arange(len(seg)) - start[seg]
+    return Segments(start=start, count=count, seg=seg, local=local)
+
+def gather(views, shots):
+    """Gather per-shot trajectory arrays (e.g. of trajectory store range)
+       as position- and time- sampled segments, dropping invalid first
+       samples of each
+    """
+    shots = np.asarray(shots, dtype=np.int64)
+    n = np.array([len(v['type']) for v in views], dtype=np.int64)
+
+    _cat = lambda c, dt: np.concatenate([v[c] for v in views]).astype(dt, copy=False) if views else np.zeros(0, dtype=dt)
+    _type = _cat('type', 'U1')
+    _all = {c: _cat(c, np.float64) for c in _COLUMNS}
+
+    S = segments(n)
+    _pos_max = reduce(np.maximum, _all['pos'], S, empty=np.nan)
+
+    rv = []
+    for _t in ('P', 'T'):
+        # Subset samples (in shot order), less first samples of each shot
+        ii = np.flatnonzero(_type == _t)
+        _seg = S.seg[ii]
+        _n = np.bincount(_seg, minlength=len(n))
+        _local = np.arange(len(ii)) - (np.cumsum(_n) - _n)[_seg]
+        ii = ii[_local >= cfgc._FT3_CALC_DROP_SAMPLES_NUM]
+        _n = np.maximum(_n - cfgc._FT3_CALC_DROP_SAMPLES_NUM, 0)
+        rv += [({c: a[ii] for c,a in _all.items()}, segments(_n))]
+
+    (p,ps),(t,ts) = rv
+    return Trajectories(shot=shots, p=p, t=t, ps=ps, ts=ts, pos_max=_pos_max)
+
+def reduce(ufunc, x, S, empty=np.nan):
+    """Segmented reduction (empty segments set to empty)
+    """
+    rv = np.full(len(S.count), empty, dtype=np.float64)
+    if not len(x):
+        return rv
+    _r = ufunc.reduceat(x, np.minimum(S.start, len(x) - 1))
+    _ok = S.count > 0
+    rv[_ok] = _r[_ok]
+    return rv
+
+def mean(x, mask, S):
+    """Segmented masked mean (NaN if no samples)
+    """
+    _n = reduce(np.add, mask.astype(np.float64), S, empty=0.0)
+    _s = reduce(np.add, np.where(mask, x, 0.0), S, empty=0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(_n > 0, _s / _n, np.nan)
+
+def first(mask, S):
+    """Segmented first True sample (local index, 0 if none as in idxmax)
+    """
+    rv = np.zeros(len(S.count), dtype=np.int64)
+    ii = np.flatnonzero(mask)
+    k,i0 = np.unique(S.seg[ii], return_index=True)
+    rv[k] = S.local[ii[i0]]
+    return rv
+
+def at(x, S, i):
+    """Segmented sample by local index (NaN for empty segments)
+    """
+    rv = np.full(len(S.count), np.nan)
+    _ok = S.count > 0
+    rv[_ok] = x[S.start[_ok] + i[_ok]]
+    return rv
+
+def calc(T, meta, machine, part, shot=None, verbose=util.VerboseLevel.info):
+    """Calculate alarm parameters of trajectories by registered
+       parameters (metadata dataframe of shot start times for cycle
+       time), vectorized where declared, else per shot (shot, if not
+       None, callable of shot index returning per-shot roots, see
+       Registry.evaluate_batch)
+       Returns derived-parameter dataframe (one row per shot)
+    """
+    _methodname = calc.__name__
+
+    # NB: Parameters retained iff named in _FT3_ALARM_PARAMETER_NAMES
+    R = registry.registry(verbose=verbose)
+    _names = [n for n in cfgp._FT3_ALARM_PARAMETER_NAMES if n in R]
+    r = R.evaluate_batch(T, shot=shot, names=_names, meta=meta, machine=machine, part=part)
+
+    if r.errors and verbose >= util.VerboseLevel.error:
+        for n,e in r.errors.items():
+            util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+            print("batch parameter {} exception e {}".format(n, e))
+        sys.stdout.flush()
+
+    _p = pd.DataFrame(data={n: r.values.get(n, np.nan) for n in cfgp._FT3_ALARM_PARAMETER_NAMES},
+                      columns=cfgp._FT3_ALARM_PARAMETER_NAMES, index=np.arange(len(T.shot)))
+    _p.insert(0, 'shot', T.shot)
+    return _p
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"""
+import param.config as cfgp
+
+
+# Invalid first samples of position- and time- sampled datasets
+# (one-based start indexes in FasTrak2(3) firmware)
+_FT3_CALC_DROP_SAMPLES_NUM = 2
+
+_FT3_CALC_SS_VAR_RATE_INVALID = 100.0 # Slow-shot variation rate if undefined (NaN)
+
+_FT3_CALC_CYCLE_TIME_DEFAULT = cfgp._FT3_ALARM_PARAMETER_TARGET_VALUES[-3] # No prior shot
+
+# Derived-parameter registry modules (each registering parameters by
+# register(registry), e.g. site-specific parameters appended here)
+# NB: Parameters are retained iff named in _FT3_ALARM_PARAMETER_NAMES
+_FT3_CALC_REGISTRY_MODULES = ['calc.params']
+
+_FT3_CALC_REGISTRY_PARALLEL = False # Evaluate independent parameters by calc pool (see pool.config)
+
+_FT3_CALC_RECALC_RETRY_NUM = 3 # Recalculation attempts (derived parameters replaced meanwhile)
+
+# Part settings what-if preview
+_FT3_CALC_PREVIEW_SHOTS_NUM = 100 # Previewed (last retained) shots
+
+_FT3_CALC_PREVIEW_SETTINGS = ['csfs.min_pos',
+                              'ss_var.start_pos_user',
+                              'ss_var.end_pos_user',
+                              'ss_var.start_pos_init',
+                              'ss_var.start_pos_bias',
+                              'ss_var.start_pos_gain',
+                              'ss_var.end_pos_bias',
+                              'intens.p_target']
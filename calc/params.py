@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 alarm parameters (Design Document Sect. 2)
+"""
+import numpy as np
+import pandas as pd
+
+import calc.batch as batch
+import calc.config as cfgc
+
+
+# NB: Roots (evaluation arguments) are the shot data dataframe (new),
+#     shot number, shot metadata, and machine and part settings. Batch
+#     roots are gathered trajectories (T, see calc.batch), metadata
+#     dataframe (meta), and machine and part settings; batch values
+#     are per-shot arrays (per-sample arrays for sample masks)
+
+
+# Shot data, position- and time- subsets
+# Drop invalid first sample of datasets owing to one-based start
+# indexes of position- and time- sampled data in the FasTrak2(3)
+# firmware.
+def dfp(new):
+    _df = new[(new.type=='P')]
+    _df = _df.drop(_df.head(cfgc._FT3_CALC_DROP_SAMPLES_NUM).index)
+    return _df.reset_index(drop=True)
+
+def dft(new):
+    _df = new[(new.type=='T')]
+    _df = _df.drop(_df.head(cfgc._FT3_CALC_DROP_SAMPLES_NUM).index)
+    return _df.reset_index(drop=True)
+
+def p3(dfp):
+    return dfp.pos.iloc[-1]
+
+# intermediate/reusable indices
+def ii_fs(dfp, part):
+    return ((dfp.pos > part.csfs.min_pos) &
+            (dfp.vel > part.csfs.min_vel))
+
+def ii_csfs(ii_fs):
+    return ii_fs.idxmax()
+
+# Metal pressure
+# NB: metal pressure definition per technical interchanges
+#     with Visi-Trak 21-AUG-2019 and review of the FasTrak2
+#     SureTrak 2020 codebase.
+def mepr(dft, machine):
+    _mepr = ((dft.press_head * machine.geom.head_area) -
+             (dft.press_rod * machine.geom.rod_area  ))
+    return _mepr / machine.geom.plunger_area
+
+def ss_vel(dfp, part):
+    _ii_ss_user = ((dfp.pos >= part.ss_var.start_pos_user) &
+                   (dfp.pos <= part.ss_var.end_pos_user  ))
+    return dfp.vel[_ii_ss_user].mean()
+
+
+# FILL TIME (Sect 2.1 Design Document)
+# NB: t2 calculation via searchsorted() method
+#     implies position increases monotonically
+def fill_time(dfp, p3, part):
+    t3 = dfp.t.iloc[-1]
+    p2 = p3 - part.plunger.p2_p3
+    t2 = dfp.t.iloc[min(dfp.pos.searchsorted(p2),len(dfp)-1)]
+    return t3 - t2
+
+# AVERAGE SLOW SHOT VELOCITY (Sect. 2.2 Deisgn Document)
+# NB: FasTrak2 SureTrak codebase defines initial movement
+#     of plunger as first position-sampled point
+def ss_vel_avg(dfp, ii_csfs):
+    return dfp.vel[:ii_csfs].mean()
+
+# AVERAGE FAST SHOT VELOCITY (Sect. 2.3 Design Document)
+def fs_vel_avg(dfp, ii_fs):
+    return dfp.vel[ii_fs].mean()
+
+# BISCUIT SIZE (Sect. 2.4 Design Document)
+def biscuit_size(new, part):
+    return part.stroke.total - new.pos.max()
+
+# INTENSIFICATION SQUEEZE DISTANCE (Sect. 2.5 Design Document)
+def intens_squeeze_dist(dft, p3):
+    return dft.pos.max() - p3
+
+# INTENSIFICATION RISE TIME (Sect. 2.6 Design Document)
+# NB: t3 (time corresponding to p3) explicitly handled
+#     in time-sampled points from FasTrak3 board, i.e.
+#     time restarts at zero for time-sampled data
+def intens_rise_time(dft, part):
+    _ii_dt = (dft.press_head >= part.intens.p_target).idxmax()
+    return dft.t[_ii_dt]
+
+# CSFS (Sect. 2.7 Design Document)
+def csfs(dfp, ii_csfs):
+    return dfp.pos[ii_csfs]
+
+# CYCLE TIME (Sect. 2.8 Design Document)
+def cycle_time(meta, shot):
+    _t0 = meta.value(shot, 't0')
+    _t0_prev = meta.value(shot-1, 't0')
+    if _t0 is not None and _t0_prev is not None:
+        return (_t0 - _t0_prev) / np.timedelta64(1, 's')
+    # No historical prior shots to calculate cycle time
+    return cfgc._FT3_CALC_CYCLE_TIME_DEFAULT
+
+# PEAK INTENSIFICATION PRESSURE (Sect. 2.9 Design Document)
+def peak_intens_press(dft, mepr, part):
+    _ii_pk = mepr[part.intens.pk_skip:].idxmax()
+    return dft.press_head[_ii_pk]
+
+# SLOW SHOT VARIATION RATE (Sect. 2.10 Design Document)
+def ss_var_rate(dfp, ss_vel, csfs, part):
+    _ii_ss_p0 = ((dfp.pos > (part.ss_var.start_pos_init + part.ss_var.start_pos_bias)) &
+                 (dfp.vel > (part.ss_var.start_pos_gain * ss_vel                      ))).idxmax()
+    _ii_ss_p1 = (dfp.pos <= (csfs - part.ss_var.end_pos_bias)).idxmin()
+
+    _Vss = dfp.vel[_ii_ss_p0:_ii_ss_p1]
+    _ss_var_rate = 50.0 * (_Vss.max() - _Vss.min()) / ss_vel
+
+    if np.isnan(_ss_var_rate):
+        _ss_var_rate = cfgc._FT3_CALC_SS_VAR_RATE_INVALID
+    return _ss_var_rate
+
+
+# Vectorized batch implementations (all shots at once, see calc.batch)
+# NB: Shots are segments of concatenated trajectory arrays; per-shot
+#     masks, first indexes (cf. idxmax) and means are segmented
+#     reductions.
+def _last(S):
+    return np.maximum(S.count - 1, 0)
+
+def p3_batch(T):
+    return batch.at(T.p['pos'], T.ps, _last(T.ps))
+
+def ii_fs_batch(T, part):
+    return (T.p['pos'] > part.csfs.min_pos) & (T.p['vel'] > part.csfs.min_vel)
+
+def ii_csfs_batch(T, ii_fs):
+    return batch.first(ii_fs, T.ps)
+
+def mepr_batch(T, machine):
+    _mepr = ((T.t['press_head'] * machine.geom.head_area) -
+             (T.t['press_rod'] * machine.geom.rod_area  ))
+    return _mepr / machine.geom.plunger_area
+
+def ss_vel_batch(T, part):
+    _ii_ss_user = ((T.p['pos'] >= part.ss_var.start_pos_user) &
+                   (T.p['pos'] <= part.ss_var.end_pos_user  ))
+    return batch.mean(T.p['vel'], _ii_ss_user, T.ps)
+
+# NB: Per-shot searchsorted() via shot-offset positions
+#     (position increases monotonically within shots)
+def fill_time_batch(T, p3, part):
+    p,ps = T.p,T.ps
+    _i3 = _last(ps)
+    t3 = batch.at(p['t'], ps, _i3)
+    p2 = p3 - part.plunger.p2_p3
+    _pmin = np.nanmin(p['pos']) if len(p['pos']) else 0.0
+    _K = (np.nanmax(p['pos']) - _pmin if len(p['pos']) else 0.0) + abs(part.plunger.p2_p3) + 1.0
+    _gpos = (p['pos'] - _pmin) + ps.seg * _K
+    _i2 = np.searchsorted(_gpos, (p2 - _pmin) + np.arange(len(ps.count)) * _K) - ps.start
+    _i2 = np.clip(_i2, 0, _i3)
+    return t3 - batch.at(p['t'], ps, _i2)
+
+def ss_vel_avg_batch(T, ii_csfs):
+    return batch.mean(T.p['vel'], T.ps.local < ii_csfs[T.ps.seg], T.ps)
+
+def fs_vel_avg_batch(T, ii_fs):
+    return batch.mean(T.p['vel'], ii_fs, T.ps)
+
+def biscuit_size_batch(T, part):
+    return part.stroke.total - T.pos_max
+
+def intens_squeeze_dist_batch(T, p3):
+    return batch.reduce(np.maximum, T.t['pos'], T.ts) - p3
+
+def intens_rise_time_batch(T, part):
+    _ii_dt = batch.first(T.t['press_head'] >= part.intens.p_target, T.ts)
+    return batch.at(T.t['t'], T.ts, _ii_dt)
+
+def csfs_batch(T, ii_csfs):
+    return batch.at(T.p['pos'], T.ps, ii_csfs)
+
+def cycle_time_batch(T, meta):
+    _t0 = pd.Series(np.asarray(meta.t0), index=np.asarray(meta.shot))
+    _t0 = _t0[~_t0.index.duplicated(keep='last')]
+    _dt = (_t0.reindex(T.shot).values - _t0.reindex(T.shot - 1).values) / np.timedelta64(1, 's')
+    return np.where(np.isnan(_dt), cfgc._FT3_CALC_CYCLE_TIME_DEFAULT, _dt)
+
+def peak_intens_press_batch(T, mepr, part):
+    t,ts = T.t,T.ts
+    _mepr = np.where(ts.local >= part.intens.pk_skip, mepr, -np.inf)
+    _pk = batch.reduce(np.maximum, _mepr, ts, empty=-np.inf)
+    _ii_pk = batch.first(_mepr == _pk[ts.seg], ts)
+    return np.where(_pk > -np.inf, batch.at(t['press_head'], ts, _ii_pk), np.nan)
+
+def ss_var_rate_batch(T, ss_vel, csfs, part):
+    p,ps = T.p,T.ps
+    _ii_ss_p0 = batch.first((p['pos'] > (part.ss_var.start_pos_init + part.ss_var.start_pos_bias)) &
+                            (p['vel'] > (part.ss_var.start_pos_gain * ss_vel[ps.seg]           )), ps)
+    _ii_ss_p1 = batch.first(~(p['pos'] <= (csfs - part.ss_var.end_pos_bias)[ps.seg]), ps)
+
+    _ii_vss = (ps.local >= _ii_ss_p0[ps.seg]) & (ps.local < _ii_ss_p1[ps.seg])
+    _vmax = batch.reduce(np.maximum, np.where(_ii_vss, p['vel'], -np.inf), ps, empty=-np.inf)
+    _vmin = batch.reduce(np.minimum, np.where(_ii_vss, p['vel'],  np.inf), ps, empty=np.inf)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        _ss_var_rate = np.where(_vmax > -np.inf, 50.0 * (_vmax - _vmin) / ss_vel, np.nan)
+    return np.where(np.isnan(_ss_var_rate), cfgc._FT3_CALC_SS_VAR_RATE_INVALID, _ss_var_rate)
+
+
+def register(R):
+    """Register alarm parameters and shared intermediates
+       (with vectorized batch implementations)
+    """
+    R.add('dfp', dfp, inputs=('new',))
+    R.add('dft', dft, inputs=('new',))
+    R.add('p3', p3, inputs=('dfp',), batch=p3_batch, batch_inputs=('T',))
+    R.add('ii_fs', ii_fs, inputs=('dfp', 'part'), batch=ii_fs_batch, batch_inputs=('T', 'part'))
+    R.add('ii_csfs', ii_csfs, inputs=('ii_fs',), batch=ii_csfs_batch, batch_inputs=('T', 'ii_fs'))
+    R.add('mepr', mepr, inputs=('dft', 'machine'), batch=mepr_batch, batch_inputs=('T', 'machine'))
+    R.add('ss_vel', ss_vel, inputs=('dfp', 'part'), batch=ss_vel_batch, batch_inputs=('T', 'part'))
+
+    # NB: Declaration order of parameters (cf. _FT3_ALARM_PARAMETER_NAMES)
+    R.add('fill_time', fill_time, inputs=('dfp', 'p3', 'part'), parameter=True,
+          batch=fill_time_batch, batch_inputs=('T', 'p3', 'part'))
+    R.add('ss_vel_avg', ss_vel_avg, inputs=('dfp', 'ii_csfs'), parameter=True,
+          batch=ss_vel_avg_batch, batch_inputs=('T', 'ii_csfs'))
+    R.add('fs_vel_avg', fs_vel_avg, inputs=('dfp', 'ii_fs'), parameter=True,
+          batch=fs_vel_avg_batch, batch_inputs=('T', 'ii_fs'))
+    R.add('biscuit_size', biscuit_size, inputs=('new', 'part'), parameter=True,
+          batch=biscuit_size_batch, batch_inputs=('T', 'part'))
+    R.add('intens_squeeze_dist', intens_squeeze_dist, inputs=('dft', 'p3'), parameter=True,
+          batch=intens_squeeze_dist_batch, batch_inputs=('T', 'p3'))
+    R.add('intens_rise_time', intens_rise_time, inputs=('dft', 'part'), parameter=True,
+          batch=intens_rise_time_batch, batch_inputs=('T', 'part'))
+    R.add('csfs', csfs, inputs=('dfp', 'ii_csfs'), parameter=True,
+          batch=csfs_batch, batch_inputs=('T', 'ii_csfs'))
+    R.add('cycle_time', cycle_time, inputs=('meta', 'shot'), parameter=True,
+          batch=cycle_time_batch, batch_inputs=('T', 'meta'))
+    R.add('peak_intens_press', peak_intens_press, inputs=('dft', 'mepr', 'part'), parameter=True,
+          batch=peak_intens_press_batch, batch_inputs=('T', 'mepr', 'part'))
+    R.add('ss_var_rate', ss_var_rate, inputs=('dfp', 'ss_vel', 'csfs', 'part'), parameter=True,
+          batch=ss_var_rate_batch, batch_inputs=('T', 'ss_vel', 'csfs', 'part'))
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 part settings what-if preview
+"""
+import copy
+
+import numpy as np
+
+from functools import reduce
+
+import calc.batch as batch
+import calc.registry as registry
+import calc.config as cfgc
+
+import util.util as util
+
+
+# NB: Preview re-derives the parameters of part settings (CSFS minimum
+#     position, slow-shot variation and intensification rise-time
+#     target pressure) over gathered trajectories. Prefix sums, sorted
+#     (shot-offset) positions and range max/min tables are built once,
+#     so each settings change is O(shots log samples) rather than
+#     O(samples). Position is assumed to increase monotonically within
+#     shots (cf. fill time searchsorted() in Board._calc_cb). Other
+#     registered parameters of part settings are re-evaluated by the
+#     registry (batch, else per shot) with previewed settings.
+
+_PREVIEW_PARAMETERS = ('ss_vel_avg', 'fs_vel_avg', 'intens_rise_time', 'csfs', 'ss_var_rate')
+
+
+def settings(part):
+    """Get previewable part settings (keyed as _FT3_CALC_PREVIEW_SETTINGS)
+    """
+    return {k: reduce(getattr, k.split('.'), part) for k in cfgc._FT3_CALC_PREVIEW_SETTINGS}
+
+def previewed(part, settings):
+    """Get part with previewed settings (keyed as
+       _FT3_CALC_PREVIEW_SETTINGS), part unchanged
+       (shallow copy, previewed settings groups copied)
+    """
+    rv = copy.copy(part)
+    for k,v in settings.items():
+        _k = k.split('.')
+        _o = rv
+        for a in _k[:-1]:
+            _c = copy.copy(getattr(_o, a))
+            setattr(_o, a, _c)
+            _o = _c
+        setattr(_o, _k[-1], v)
+    return rv
+
+def _offset(x, S):
+    """Offset per-shot samples by shot (power-of-two spacing, exact
+       for float32 samples), shots ascending in one sorted array
+       Returns (offset samples, minimum, spacing)
+    """
+    _min = np.nanmin(x) if len(x) else 0.0
+    _K = 2.0 ** np.ceil(np.log2((np.nanmax(x) - _min if len(x) else 0.0) + 2.0))
+    return (x - _min) + S.seg * _K, _min, _K
+
+def _cumsum(x):
+    """Prefix sums (leading zero)
+    """
+    rv = np.zeros(len(x) + 1)
+    np.cumsum(x, out=rv[1:])
+    return rv
+
+def _sparse(x, ufunc):
+    """Range max/min (ufunc) sparse table of samples
+    """
+    rv = [x]
+    k = 1
+    while 2 * k <= len(x):
+        rv += [ufunc(rv[-1][:-k], rv[-1][k:])]
+        k *= 2
+    return rv
+
+
+class Preview(object):
+    def __init__(self, T, params, part, machine=None, meta=None, shot=None, verbose=util.VerboseLevel.info):
+        """Initialize part settings what-if preview of trajectories
+           (parameters of current part settings, e.g. batch.calc(),
+            updated per previewed settings; other registered parameters
+            of part settings re-evaluated iff machine given, see
+            batch.calc for metadata and per-shot roots)
+        """
+        self.verbose = verbose
+
+        self.T = T
+        self.params = params
+        self.settings = settings(part)
+
+        self.part = part
+        self.machine = machine
+        self.meta = meta
+        self.shot = shot
+
+        # Registered parameters of part settings (not previewed above)
+        R = registry.registry(verbose=verbose)
+        self._registered = [n for n in params.columns if n in R and n not in _PREVIEW_PARAMETERS and
+                            'part' in R.requires([n])] if machine is not None else []
+
+        p,ps = T.p,T.ps
+        t,ts = T.t,T.ts
+
+        # Sorted (shot-offset) positions and prefix sums of velocity
+        self._pos, self._pos_min, self._pos_K = _offset(p['pos'], ps)
+        self._vel = _cumsum(p['vel'])
+
+        # Fast-shot samples (CSFS minimum velocity) indexes and prefix sums
+        _fast = p['vel'] > part.csfs.min_vel
+        self._fast = np.flatnonzero(_fast)
+        self._fast_vel = _cumsum(np.where(_fast, p['vel'], 0.0))
+        self._fast_num = _cumsum(_fast)
+
+        # Range max/min velocity tables (slow-shot variation)
+        self._vel_max = _sparse(p['vel'], np.maximum)
+        self._vel_min = _sparse(p['vel'], np.minimum)
+
+        # Sorted (shot-offset) prefix max head pressure (rise time)
+        _ph, self._ph_min, self._ph_K = _offset(t['press_head'], ts)
+        self._ph = np.maximum.accumulate(_ph) if len(_ph) else _ph
+
+    def _search(self, x, side='right'):
+        """Get per-shot first position-sampled index of position
+           greater than (side right) or not less than (left) x
+           (sample count if none)
+        """
+        ps = self.T.ps
+        _q = np.clip(np.asarray(x, dtype=np.float64) - self._pos_min, -0.5, self._pos_K - 1.5)
+        _q = _q + np.arange(len(ps.count)) * self._pos_K
+        return np.searchsorted(self._pos, _q, side=side) - ps.start
+
+    def _range(self, table, ufunc, a, b):
+        """Get range max/min (ufunc) of samples [a, b) (b > a)
+        """
+        _n = b - a
+        _l = np.floor(np.log2(np.maximum(_n, 1))).astype(np.int64)
+        rv = np.empty(len(_n))
+        for l in np.unique(_l):
+            ii = np.flatnonzero(_l == l)
+            rv[ii] = ufunc(table[l][a[ii]], table[l][b[ii] - (1 << l)])
+        return rv
+
+    def _first_above(self, k, thr):
+        """Get per-shot first position-sampled index not before k of
+           velocity greater than thr (0 if none, as in idxmax)
+        """
+        ps = self.T.ps
+        _k = ps.start + k
+        _ok = k < ps.count
+        _ok[_ok] = self._range(self._vel_max, np.maximum, _k[_ok], (ps.start + ps.count)[_ok]) > thr[_ok]
+
+        # Binary search of shortest range [k, m) of maximum above thr
+        lo, hi = k + 1, np.maximum(ps.count, k + 1)
+        for _ in range(int(np.ceil(np.log2(max(ps.count.max(initial=1), 1)))) + 1):
+            _m = (lo + hi) // 2
+            _c = _ok & (lo < hi)
+            _gt = np.zeros(len(k), dtype=bool)
+            _gt[_c] = self._range(self._vel_max, np.maximum, _k[_c], (ps.start + _m)[_c]) > thr[_c]
+            hi = np.where(_c & _gt, _m, hi)
+            lo = np.where(_c & ~_gt, _m + 1, lo)
+        return np.where(_ok, lo - 1, 0)
+
+    def calc(self, settings=None):
+        """Calculate parameters of previewed part settings (keyed as
+           _FT3_CALC_PREVIEW_SETTINGS, unspecified settings current)
+           Returns derived-parameter dataframe (one row per shot)
+        """
+        _s = dict(self.settings)
+        for k,v in (settings or {}).items():
+            if k not in _s:
+                raise ValueError("part setting {} not previewable".format(k))
+            _s[k] = v
+
+        T = self.T
+        p,ps = T.p,T.ps
+        t,ts = T.t,T.ts
+        _n = ps.count
+        _ok = _n > 0
+        _end = ps.start + _n
+
+        # Calculated start of fast shot (first fast sample past CSFS
+        # minimum position)
+        _k = self._search(np.full(len(_n), _s['csfs.min_pos']))
+        _j = np.searchsorted(self._fast, ps.start + _k)
+        _f = self._fast[np.minimum(_j, len(self._fast) - 1)] if len(self._fast) else np.zeros(len(_n), dtype=np.int64)
+        _ii_csfs = np.where((_j < len(self._fast)) & (_f < _end), _f - ps.start, 0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # AVERAGE SLOW SHOT VELOCITY (Sect. 2.2 Deisgn Document)
+            _ss_vel_avg = (self._vel[ps.start + _ii_csfs] - self._vel[ps.start]) / _ii_csfs
+
+            # AVERAGE FAST SHOT VELOCITY (Sect. 2.3 Design Document)
+            _a = ps.start + np.minimum(_k, _n)
+            _fs_vel_avg = ((self._fast_vel[_end] - self._fast_vel[_a]) /
+                           (self._fast_num[_end] - self._fast_num[_a]))
+
+            # CSFS (Sect. 2.7 Design Document)
+            _csfs = batch.at(p['pos'], ps, _ii_csfs)
+
+            # SLOW SHOT VARIATION RATE (Sect. 2.10 Design Document)
+            _a = self._search(np.full(len(_n), _s['ss_var.start_pos_user']), side='left')
+            _b = self._search(np.full(len(_n), _s['ss_var.end_pos_user']))
+            _ss_vel = np.where(_b > _a, (self._vel[ps.start + np.maximum(_b, _a)] - self._vel[ps.start + _a]) /
+                               (_b - _a), np.nan)
+
+            _k0 = self._search(np.full(len(_n), _s['ss_var.start_pos_init'] + _s['ss_var.start_pos_bias']))
+            _ii_ss_p0 = self._first_above(np.minimum(_k0, _n), _s['ss_var.start_pos_gain'] * _ss_vel)
+            _ii_ss_p1 = self._search(np.nan_to_num(_csfs) - _s['ss_var.end_pos_bias'])
+            _ii_ss_p1 = np.where(_ii_ss_p1 < _n, _ii_ss_p1, 0)
+
+            _ii_vss = _ok & (_ii_ss_p1 > _ii_ss_p0)
+            _vmax = np.full(len(_n), np.nan)
+            _vmin = np.full(len(_n), np.nan)
+            _a,_b = (ps.start + _ii_ss_p0)[_ii_vss], (ps.start + _ii_ss_p1)[_ii_vss]
+            _vmax[_ii_vss] = self._range(self._vel_max, np.maximum, _a, _b)
+            _vmin[_ii_vss] = self._range(self._vel_min, np.minimum, _a, _b)
+            _ss_var_rate = 50.0 * (_vmax - _vmin) / _ss_vel
+        _ss_var_rate = np.where(np.isnan(_ss_var_rate), cfgc._FT3_CALC_SS_VAR_RATE_INVALID, _ss_var_rate)
+
+        _ss_vel_avg[~_ok] = np.nan
+        _fs_vel_avg[~_ok] = np.nan
+
+        # INTENSIFICATION RISE TIME (Sect. 2.6 Design Document)
+        _q = np.clip(_s['intens.p_target'] - self._ph_min, -0.5, self._ph_K - 1.5)
+        _q = _q + np.arange(len(ts.count)) * self._ph_K
+        _ii_dt = np.searchsorted(self._ph, _q, side='left') - ts.start
+        _ii_dt = np.where(_ii_dt < ts.count, _ii_dt, 0)
+        _intens_rise_time = batch.at(t['t'], ts, _ii_dt)
+
+        rv = self.params.copy()
+        rv['ss_vel_avg'] = _ss_vel_avg
+        rv['fs_vel_avg'] = _fs_vel_avg
+        rv['intens_rise_time'] = _intens_rise_time
+        rv['csfs'] = _csfs
+        rv['ss_var_rate'] = _ss_var_rate
+
+        if self._registered:
+            r = registry.registry(verbose=self.verbose).evaluate_batch(T, shot=self.shot, names=self._registered, meta=self.meta,
+                                                                       machine=self.machine, part=previewed(self.part, _s))
+            for n in self._registered:
+                rv[n] = r.values[n]
+        return rv
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 derived-parameter registry
+"""
+import importlib
+
+import numpy as np
+
+from dataclasses import dataclass
+
+from threading import Lock
+
+import calc.config as cfgc
+
+import util.util as util
+
+
+@dataclass
+class Node:
+    name        : str
+    fn          : object # Callable of input values (in inputs order)
+    inputs      : tuple  # Node or root (evaluation argument) names
+    parameter   : bool   # Derived parameter (else shared intermediate)
+    batch       : object = None # Vectorized callable of batch input values (None if per shot only)
+    batch_inputs: tuple  = ()   # Node or batch root names
+
+
+@dataclass
+class Result:
+    values: dict # Node values keyed by name (parameters NaN if failed)
+    errors: dict # Exceptions of failed nodes keyed by name
+
+
+class Registry(object):
+    def __init__(self, verbose=util.VerboseLevel.info):
+        """Initialize derived-parameter registry
+           (parameters and shared intermediates declared with their
+            inputs, each evaluated once per shot)
+        """
+        self.verbose = verbose
+
+        self._nodes = {}
+        self._levels = None # Evaluation levels (cached)
+        self._mutex = Lock()
+
+    def __contains__(self, name):
+        return name in self._nodes
+
+    def __getitem__(self, name):
+        return self._nodes[name]
+
+    def add(self, name, fn, inputs=(), parameter=False, batch=None, batch_inputs=()):
+        """Declare (or replace) parameter or intermediate
+           (optionally with vectorized batch implementation, see
+            evaluate_batch)
+        """
+        with self._mutex:
+            self._nodes[name] = Node(name=name, fn=fn, inputs=tuple(inputs), parameter=parameter,
+                                     batch=batch, batch_inputs=tuple(batch_inputs))
+            self._levels = None
+
+    def parameter(self, name, inputs=(), batch=None, batch_inputs=()):
+        """Declare parameter (decorator)
+        """
+        def _add(fn):
+            self.add(name, fn, inputs=inputs, parameter=True, batch=batch, batch_inputs=batch_inputs)
+            return fn
+        return _add
+
+    def intermediate(self, name, inputs=()):
+        """Declare shared intermediate (decorator)
+        """
+        def _add(fn):
+            self.add(name, fn, inputs=inputs, parameter=False)
+            return fn
+        return _add
+
+    def remove(self, name):
+        with self._mutex:
+            self._nodes.pop(name, None)
+            self._levels = None
+
+    @property
+    def parameters(self):
+        """Get parameter names (declaration order)
+        """
+        return [n for n,N in self._nodes.items() if N.parameter]
+
+    def levels(self):
+        """Get evaluation levels, i.e. lists of nodes whose inputs are
+           roots or nodes of preceding levels (independent within level)
+        """
+        with self._mutex:
+            if self._levels is not None:
+                return self._levels
+
+            _level = {}
+            def _depth(n, path=()):
+                if n not in self._nodes:
+                    return -1 # Root (evaluation argument)
+                if n in path:
+                    raise ValueError("parameter registry cycle {}".format(' -> '.join(path + (n,))))
+                if n not in _level:
+                    _level[n] = 1 + max([_depth(i, path + (n,)) for i in self._nodes[n].inputs], default=-1)
+                return _level[n]
+
+            for n in self._nodes:
+                _depth(n)
+
+            L = [[] for _ in range(max(_level.values(), default=-1) + 1)]
+            for n in self._nodes:
+                L[_level[n]] += [self._nodes[n]]
+            self._levels = L
+            return L
+
+    def requires(self, names):
+        """Get names of nodes and roots required by named nodes
+           (per-shot and batch inputs, transitively)
+        """
+        rv = set()
+        def _visit(n):
+            if n in rv:
+                return
+            rv.add(n)
+            N = self._nodes.get(n)
+            if N is not None:
+                for i in N.inputs + N.batch_inputs:
+                    _visit(i)
+        for n in names:
+            _visit(n)
+        return rv
+
+    def evaluate(self, pool=None, names=None, **roots):
+        """Evaluate parameters of roots (e.g. shot data, machine and
+           part), failures isolated to failed nodes and their dependents
+           (pool, if not None, evaluates nodes of each level in parallel;
+            names, if not None, restricts evaluation to named nodes and
+            their inputs)
+           Returns evaluation result
+        """
+        values = dict(roots)
+        errors = {}
+
+        _req = self.requires(names) if names is not None else None
+        for L in self.levels():
+            if _req is not None:
+                L = [N for N in L if N.name in _req]
+            if pool is not None and len(L) > 1:
+                ff = [(N, pool.submit(self._eval, N, values, errors)) for N in L]
+                for N,f in ff:
+                    self._store(N, f.result(), values, errors)
+            else:
+                for N in L:
+                    self._store(N, self._eval(N, values, errors), values, errors)
+
+        for n in errors:
+            if self._nodes[n].parameter:
+                values[n] = np.nan
+
+        return Result(values={n: values[n] for n in self._nodes if n in values}, errors=errors)
+
+    def evaluate_batch(self, T, shot=None, names=None, **roots):
+        """Evaluate parameters of gathered trajectories T (calc.batch)
+           and batch roots (e.g. metadata dataframe, machine and part)
+           by vectorized batch implementations, parameters without
+           (or failing) batch implementation evaluated per shot
+           (shot, if not None, callable of shot index returning per-shot
+            roots, e.g. shot data, see evaluate; else parameters NaN)
+           Returns evaluation result (parameter arrays, one value per
+           shot, NaN if failed)
+        """
+        _names = self.parameters if names is None else list(names)
+        _n = len(T.shot)
+
+        values = dict(roots, T=T)
+        errors = {}
+
+        def _batch(n, path=()):
+            if n in values or n in errors:
+                return
+            N = self._nodes.get(n)
+            if N is None:
+                errors[n] = KeyError("batch root {} undefined".format(n))
+                return
+            if N.batch is None:
+                errors[n] = NotImplementedError("parameter {} not vectorized".format(n))
+                return
+            if n in path:
+                raise ValueError("parameter registry batch cycle {}".format(' -> '.join(path + (n,))))
+            for i in N.batch_inputs:
+                _batch(i, path + (n,))
+            self._store(N, self._eval(N, values, errors, batch=True), values, errors)
+
+        for n in _names:
+            _batch(n)
+
+        # Per-shot evaluation of remaining parameters
+        _rest = [n for n in _names if n in errors]
+        if _rest and shot is not None:
+            _v = {n: np.full(_n, np.nan) for n in _rest}
+            _e = {}
+            for i in range(_n):
+                r = self.evaluate(names=_rest, **dict(roots, **shot(i)))
+                for n in _rest:
+                    _v[n][i] = r.values.get(n, np.nan)
+                _e.update({n: e for n,e in r.errors.items() if n in _v})
+            for n in _rest:
+                values[n] = _v[n]
+                errors.pop(n, None)
+            errors.update(_e)
+
+        # NB: Errors of per-shot evaluation (failed shots NaN) retained
+        rv = {}
+        for n in _names:
+            v = values.get(n, np.nan)
+            rv[n] = np.broadcast_to(np.asarray(v, dtype=np.float64), (_n,)).copy()
+
+        return Result(values=rv, errors={n: e for n,e in errors.items() if n in rv})
+
+    def _eval(self, N, values, errors, batch=False):
+        """Evaluate node (batch implementation if batch)
+           Returns (value, exception) pair
+        """
+        _fn,_inputs = (N.batch, N.batch_inputs) if batch else (N.fn, N.inputs)
+        for i in _inputs:
+            if i in errors:
+                return None, errors[i]
+            if i not in values:
+                return None, KeyError("parameter {} input {} undefined".format(N.name, i))
+        try:
+            return _fn(*[values[i] for i in _inputs]), None
+        except Exception as e:
+            return None, e
+
+    def _store(self, N, rv, values, errors):
+        v,e = rv
+        if e is None:
+            values[N.name] = v
+        else:
+            errors[N.name] = e
+
+
+_registry = None
+_mutex = Lock()
+
+def registry(verbose=util.VerboseLevel.info):
+    """Get process-wide derived-parameter registry
+       (parameter modules, incl. site-specific, registered on first use)
+    """
+    global _registry
+    with _mutex:
+        if _registry is None:
+            R = Registry(verbose=verbose)
+            for m in cfgc._FT3_CALC_REGISTRY_MODULES:
+                importlib.import_module(m).register(R)
+            _registry = R
+    return _registry
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 append-only memory-mapped shot archive
+"""
+import os
+import re
+import time
+
+import numpy as np
+
+from dataclasses import dataclass
+from threading import Lock
+
+import data.config as cfgd
+
+
+# NB: Archive records are appended to fixed-size (sparse, preallocated)
+#     segment files, each memory-mapped once (records written and read
+#     through the map, remapped only on segment roll). Segment index
+#     entries are written in batches, so an interrupted archive loses
+#     only unindexed (trailing) shots. Oldest segments are dropped
+#     beyond the archive byte cap or age (on segment roll and index
+#     writes). Index files are headed by the run of their shots, and
+#     segments of other runs dropped on load (shot numbers are unique
+#     per run only).
+
+
+@dataclass
+class Segment:
+    seq  : int        # Segment sequence number
+    map  : np.memmap  # Records file memory map
+    index: object     # Index file (active segment, else None)
+    len  : int        # Indexed records
+    shots: list       # Indexed shot numbers
+    mtime: float      # Last index write (seconds since epoch)
+
+
+class FT3ShotArchive(object):
+    def __init__(self, path, name, dtypes,
+                 segment_bytes=cfgd._FT3_DATA_ARCHIVE_SEGMENT_BYTES,
+                 max_bytes=cfgd._FT3_DATA_ARCHIVE_MAX_BYTES,
+                 max_age_s=cfgd._FT3_DATA_ARCHIVE_MAX_AGE_S, run=None):
+        """Initialize append-only memory-mapped shot archive
+           (Segmented records files and shot-offset index files per
+            dataset, oldest segments dropped beyond byte cap or age;
+            shots numbered per run, default new run)
+        """
+        self._path = path
+        self._name = name
+        self._run = int(run) if run is not None else time.time_ns()
+        self._dtype = np.dtype([(c, cfgd._FT3_DATA_ARCHIVE_DTYPE(dt)) for c,dt in dtypes.items()])
+
+        self._segment_len = max(int(segment_bytes) // self._dtype.itemsize, 1) # Records per segment
+        self._max_bytes = max_bytes
+        self._max_age_s = max_age_s
+
+        os.makedirs(path, exist_ok=True)
+
+        self._index = {}    # Shot number to (segment, record offset, record count)
+        self._segments = {} # Segments keyed by sequence number
+
+        self._seg = None    # Active (appended) segment
+        self._pending = []  # Active segment index entries not yet written
+
+        self._mutex = Lock()
+
+        self._load()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, shot):
+        return int(shot) in self._index
+
+    def append(self, shot, data):
+        """Append shot records (dict of equal-length column arrays)
+        """
+        n = len(next(iter(data.values()))) if data else 0
+
+        with self._mutex:
+            S = self._seg
+            if S is None or S.len + n > len(S.map):
+                S = self._roll(n)
+
+            rec = S.map[S.len:S.len+n]
+            for c in self._dtype.names:
+                if c in data:
+                    rec[c] = data[c]
+
+            # NB: Records written prior to index so interrupted appends
+            #     leave unindexed (ignored) trailing records
+            self._pending += [(shot, S.len, n)]
+            self._index[int(shot)] = (S.seq, S.len, n)
+            S.shots += [int(shot)]
+            S.len += n
+
+            if len(self._pending) >= cfgd._FT3_DATA_ARCHIVE_INDEX_BATCH:
+                self._flush()
+
+    def get(self, shot):
+        """Get zero-copy (memory-mapped) column arrays of archived shot
+           (None if not archived)
+        """
+        with self._mutex:
+            rv = self._index.get(int(shot))
+            if rv is None:
+                return None
+            seq,i0,n = rv
+            m = self._segments[seq].map
+
+        return {c: m[c][i0:i0+n] for c in self._dtype.names}
+
+    def flush(self):
+        """Write pending index entries of active segment
+           (and drop segments beyond byte cap or age)
+        """
+        with self._mutex:
+            self._flush()
+            self._retain()
+
+    def close(self):
+        """Close archive (pending index entries written)
+        """
+        with self._mutex:
+            self._flush()
+            if self._seg is not None:
+                self._seg.map.flush()
+                self._seg.index.close()
+                self._seg.index = None
+                self._seg = None
+
+    @property
+    def shots(self):
+        """Get archived shot numbers (sorted)
+        """
+        return np.array(sorted(self._index), dtype=np.int64)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def run(self):
+        return self._run
+
+    @property
+    def nbytes(self):
+        """Get archive segment files size (bytes, preallocated)
+        """
+        return sum(len(S.map) for S in self._segments.values()) * self._dtype.itemsize
+
+    def _file(self, seq, ext):
+        return os.path.join(self._path, cfgd._FT3_DATA_ARCHIVE_SEGMENT_NAME(self._name, seq) + ext)
+
+    def _roll(self, n):
+        """Start new active segment (of at least n records)
+           Returns new active segment
+        """
+        if self._seg is not None:
+            self._flush()
+            self._seg.map.flush()
+            self._seg.index.close()
+            self._seg.index = None
+
+        seq = max(self._segments, default=-1) + 1
+        _len = max(self._segment_len, n)
+
+        _f = self._file(seq, cfgd._FT3_DATA_ARCHIVE_DATA_EXT)
+        with open(_f, 'wb') as f:
+            f.truncate(_len * self._dtype.itemsize)
+
+        S = self._seg = Segment(seq=seq,
+                                map=np.memmap(_f, dtype=self._dtype, mode='r+', shape=(_len,)),
+                                index=open(self._file(seq, cfgd._FT3_DATA_ARCHIVE_INDEX_EXT), 'ab'),
+                                len=0, shots=[], mtime=time.time())
+        self._segments[seq] = S
+
+        _h = np.array([(cfgd._FT3_DATA_ARCHIVE_INDEX_MAGIC, self._run, 0)], dtype=cfgd._FT3_DATA_ARCHIVE_INDEX_HEADER_DTYPE)
+        S.index.write(_h.tobytes())
+        S.index.flush()
+
+        self._retain()
+        return S
+
+    def _flush(self):
+        """Write pending index entries of active segment (mutex held)
+           NB: Segments beyond byte cap or age dropped per index write
+               (long-running archives without segment roll)
+        """
+        if not self._pending or self._seg is None:
+            return
+        idx = np.array(self._pending, dtype=cfgd._FT3_DATA_ARCHIVE_INDEX_DTYPE)
+        self._seg.index.write(idx.tobytes())
+        self._seg.index.flush()
+        self._seg.mtime = time.time()
+        self._pending = []
+
+        self._retain()
+
+    def _retain(self):
+        """Drop oldest (inactive) segments beyond archive byte cap or age
+        """
+        _now = time.time()
+        for seq in sorted(self._segments):
+            S = self._segments[seq]
+            if S is self._seg:
+                break
+            _old = self._max_age_s is not None and _now - S.mtime > self._max_age_s
+            _big = self._max_bytes is not None and self.nbytes > self._max_bytes
+            if not (_old or _big):
+                break
+            self._drop(seq)
+
+    def _drop(self, seq):
+        """Drop segment (files removed, shots unindexed)
+           NB: Column arrays of dropped segment remain valid until
+               released (unlinked files stay mapped)
+        """
+        S = self._segments.pop(seq)
+        for s in S.shots:
+            if self._index.get(s, (None,))[0] == seq:
+                del self._index[s]
+        for ext in (cfgd._FT3_DATA_ARCHIVE_DATA_EXT, cfgd._FT3_DATA_ARCHIVE_INDEX_EXT):
+            try:
+                os.remove(self._file(seq, ext))
+            except OSError:
+                pass
+
+    def _load(self):
+        """Load shot-offset indexes of existing archive segments of run
+           (appends continue in new segment, segments of other runs or
+            without index header dropped)
+        """
+        _re = re.compile(cfgd._FT3_DATA_ARCHIVE_SEGMENT_RE(self._name, cfgd._FT3_DATA_ARCHIVE_DATA_EXT))
+        for f in sorted(os.listdir(self._path)):
+            m = _re.fullmatch(f)
+            if m is None:
+                continue
+            seq = int(m.group(1))
+
+            _f = self._file(seq, cfgd._FT3_DATA_ARCHIVE_DATA_EXT)
+            _len = os.path.getsize(_f) // self._dtype.itemsize
+            if _len == 0:
+                os.remove(_f)
+                continue
+
+            S = Segment(seq=seq,
+                        map=np.memmap(_f, dtype=self._dtype, mode='r', shape=(_len,)),
+                        index=None, len=0, shots=[], mtime=os.path.getmtime(_f))
+
+            _i = self._file(seq, cfgd._FT3_DATA_ARCHIVE_INDEX_EXT)
+            _h = np.fromfile(_i, dtype=cfgd._FT3_DATA_ARCHIVE_INDEX_HEADER_DTYPE, count=1) if os.path.exists(_i) else []
+            if len(_h) == 0 or _h[0]['magic'] != cfgd._FT3_DATA_ARCHIVE_INDEX_MAGIC or _h[0]['run'] != self._run:
+                self._segments[seq] = S
+                self._drop(seq)
+                continue
+
+            S.mtime = os.path.getmtime(_i)
+            _isz = cfgd._FT3_DATA_ARCHIVE_INDEX_DTYPE.itemsize
+            for s,i0,n in np.fromfile(_i, dtype=cfgd._FT3_DATA_ARCHIVE_INDEX_DTYPE, offset=_isz):
+                if i0 + n <= _len:
+                    self._index[int(s)] = (seq, int(i0), int(n))
+                    S.shots += [int(s)]
+                    S.len = max(S.len, int(i0 + n))
+
+            self._segments[seq] = S
+
+        self._retain()
+
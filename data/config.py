@@ -2,12 +2,53 @@
 # -*- coding: utf-8 -*-
 """
 """
+import os
+import re
+
+import numpy as np
+
+from pathlib import Path
+
 import param.config as cfgp
 import tcpip.msgdata as msg
 
 _FT3_DATA_MAX_LEN    = 1000
 _FT3_DATA_AD_MAX_LEN = 10
+
+# Nominal per-shot sample counts (trajectory store arena sizing)
+_FT3_DATA_SHOT_SAMPLES_NUM   = 1500
+_FT3_DATA_EVENTS_SAMPLES_NUM = 16
 _FT3_DATA_DROP    = lambda x: x._data.drop(x._data.head(max(len(x._data) - x._maxlen,0)).index)
+_FT3_DATA_RING_LEN = lambda maxlen: maxlen + 1 # Retained length of drop-then-increment datasets
+
+
+# Memory-mapped archive of shots evicted from (in-memory) board data
+# NB: Outside package, overridden by FT3_DATA_ARCHIVE_DIR environment variable
+_FT3_DATA_ARCHIVE_ABSPATH = os.environ.get('FT3_DATA_ARCHIVE_DIR',
+                                           os.path.join(Path.home(), '.fastrak3', 'archive'))
+
+_FT3_DATA_ARCHIVE_DATA_EXT  = '.bin'
+_FT3_DATA_ARCHIVE_INDEX_EXT = '.idx'
+
+_FT3_DATA_ARCHIVE_SEGMENT_NAME = lambda name,seq: '{}.{:06d}'.format(name, seq)
+_FT3_DATA_ARCHIVE_SEGMENT_RE   = lambda name,ext: re.escape(name) + r'\.(\d{6})' + re.escape(ext)
+
+_FT3_DATA_ARCHIVE_SEGMENT_BYTES = 64 * 2**20       # Segment file size (preallocated, sparse)
+_FT3_DATA_ARCHIVE_MAX_BYTES     = 1024 * 2**20     # Per-dataset archive cap (oldest segments dropped), None unlimited
+_FT3_DATA_ARCHIVE_MAX_AGE_S     = 30 * 24 * 3600.0 # Segment retention (seconds since last write), None unlimited
+_FT3_DATA_ARCHIVE_INDEX_BATCH   = 64               # Index entries per index file write
+
+_FT3_DATA_ARCHIVE_STRING_LEN = 64
+_FT3_DATA_ARCHIVE_DTYPE = lambda dt: 'U{:d}'.format(_FT3_DATA_ARCHIVE_STRING_LEN) if np.dtype(dt) == object else np.dtype(dt)
+
+_FT3_DATA_ARCHIVE_INDEX_DTYPE = np.dtype([('shot', np.int64), ('offset', np.int64), ('count', np.int64)])
+
+# Index file header (one index-entry sized record), run of indexed shots
+# NB: Shot numbers are unique per run only (e.g. numbering restarted
+#     without SQL database), archives of other runs reset on load
+_FT3_DATA_ARCHIVE_INDEX_MAGIC = b'FT3ARCH1'
+_FT3_DATA_ARCHIVE_INDEX_HEADER_DTYPE = np.dtype([('magic', 'S8'), ('run', np.int64), ('reserved', np.int64)])
+assert(_FT3_DATA_ARCHIVE_INDEX_HEADER_DTYPE.itemsize == _FT3_DATA_ARCHIVE_INDEX_DTYPE.itemsize)
 
 
 _FT3_DATA_META_DATAFRAME_VARIABLES = []
@@ -17,6 +58,14 @@ _FT3_DATA_META_DATAFRAME_VARIABLES += ["t1"]
 _FT3_DATA_META_DATAFRAME_VARIABLES += ["num_pos_samples"]
 _FT3_DATA_META_DATAFRAME_VARIABLES += ["num_time_samples"]
 
+# Metadata dtypes (archived rows)
+_FT3_DATA_META_DTYPES = {}
+_FT3_DATA_META_DTYPES.update(shot = np.int64)
+_FT3_DATA_META_DTYPES.update(t0 = 'datetime64[ns]')
+_FT3_DATA_META_DTYPES.update(t1 = 'datetime64[ns]')
+_FT3_DATA_META_DTYPES.update(num_pos_samples = np.int64)
+_FT3_DATA_META_DTYPES.update(num_time_samples = np.int64)
+
 
 _FT3_DATA_SHOT_DATAFRAME_VARIABLES = []
 _FT3_DATA_SHOT_DATAFRAME_VARIABLES += ["shot"]
@@ -27,6 +76,15 @@ _FT3_DATA_SHOT_DATAFRAME_VARIABLES += ["vel"]
 _FT3_DATA_SHOT_DATAFRAME_VARIABLES += ["press_head"]
 _FT3_DATA_SHOT_DATAFRAME_VARIABLES += ["press_rod"]
 
+# Per-sample shot data dtypes (shot number retained per shot)
+_FT3_DATA_SHOT_DTYPES = {}
+_FT3_DATA_SHOT_DTYPES.update(type = 'U1')
+_FT3_DATA_SHOT_DTYPES.update(t = np.float32)
+_FT3_DATA_SHOT_DTYPES.update(pos = np.float32)
+_FT3_DATA_SHOT_DTYPES.update(vel = np.float32)
+_FT3_DATA_SHOT_DTYPES.update(press_head = np.float32)
+_FT3_DATA_SHOT_DTYPES.update(press_rod = np.float32)
+
 
 _FT3_DATA_REF_DATAFRAME_VARIABLES = _FT3_DATA_SHOT_DATAFRAME_VARIABLES
 
@@ -35,14 +93,29 @@ _FT3_DATA_PARAM_DATAFRAME_VARIABLES = []
 _FT3_DATA_PARAM_DATAFRAME_VARIABLES += ["shot"]
 _FT3_DATA_PARAM_DATAFRAME_VARIABLES += cfgp._FT3_ALARM_PARAMETER_NAMES
 
+# Derived parameters dtypes (archived rows)
+_FT3_DATA_PARAM_DTYPES = {}
+_FT3_DATA_PARAM_DTYPES.update(shot = np.int64)
+_FT3_DATA_PARAM_DTYPES.update({p: np.float64 for p in cfgp._FT3_ALARM_PARAMETER_NAMES})
+
 
 _FT3_DATA_EVENTS_DATAFRAME_VARIABLES = []
 _FT3_DATA_EVENTS_DATAFRAME_VARIABLES += ["shot"]
 _FT3_DATA_EVENTS_DATAFRAME_VARIABLES += ["t"]
 _FT3_DATA_EVENTS_DATAFRAME_VARIABLES += ["event"]
 
+# Per-event dtypes (shot number retained per shot)
+_FT3_DATA_EVENTS_DTYPES = {}
+_FT3_DATA_EVENTS_DTYPES.update(t = 'datetime64[ns]')
+_FT3_DATA_EVENTS_DTYPES.update(event = object)
+
 
 _FT3_DATA_AD_DATAFRAME_VARIABLES = []
 _FT3_DATA_AD_DATAFRAME_VARIABLES += ["shot"]
 _FT3_DATA_AD_DATAFRAME_VARIABLES += ["type"]
 _FT3_DATA_AD_DATAFRAME_VARIABLES += msg._FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES
+
+# Per-sample A/D dtypes (FasTrak3 shot-data wire format widths)
+_FT3_DATA_AD_DTYPES = {}
+_FT3_DATA_AD_DTYPES.update(type = 'U1')
+_FT3_DATA_AD_DTYPES.update({n: msg._FT3_TCPIP_ASYNC_SHOT_DATA_DTYPE[n] for n in msg._FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES})
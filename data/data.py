@@ -7,12 +7,15 @@ import pandas as pd
 
 from enum import IntEnum,unique
 
+import data.ring as ring
+import data.store as store
 import data.config as cfgd
 
 
 # NB: Dataframe and series maximum lengths are one element larger
 #     than _maxlen property b/c of how overloaded (+=) assignment
-#     operators  drop-then-increment datasets
+#     operators  drop-then-increment datasets (ring buffer capacities
+#     preserve the same retained lengths)
 
 
 @unique
@@ -30,37 +33,62 @@ class FT3MetaAccessor(object):
     def __init__(self, pd_obj, maxlen=cfgd._FT3_DATA_MAX_LEN):
         """Initialize FasTrak3 metadata
         """
-        self._data = pd.DataFrame(data=None, columns=cfgd._FT3_DATA_META_DATAFRAME_VARIABLES)
         self._type = FT3DataType.meta
+        self._ring = ring.FT3RingBuffer(columns=cfgd._FT3_DATA_META_DATAFRAME_VARIABLES,
+                                        maxlen=cfgd._FT3_DATA_RING_LEN(maxlen),
+                                        key=self._type)
         self._maxlen = maxlen
-        self._cb = lambda new: None
+        self._bus = None # Publish/subscribe event bus
 
     def __iadd__(self, new):
         """FasTrak3 metadata overloaded (+=) assignment operator
+           (O(1) append and eviction of oldest rows)
         """
-        self._drop()
-        self._data = pd.concat((self._data, new), ignore_index=True)
-        self._cb(new)
+        self._ring.append(new)
+        if self._bus is not None:
+            self._bus.publish(self._type, new)
 
         return self
 
-    def _drop(self):
-        """Drop too-old FasTrak3 metadata
+    def __len__(self):
+        return len(self._ring)
+
+    def tail(self, n=1):
+        """Get newest n rows of FasTrak3 metadata
         """
-        self._data = cfgd._FT3_DATA_DROP(self)
+        return self._ring.tail(n)
+
+    def get(self, shot):
+        """Get FasTrak3 metadata row by shot number
+           (single-row dataframe, empty if not retained)
+        """
+        return self._ring.get(shot)
+
+    def value(self, shot, column):
+        """Get FasTrak3 metadata value by shot number
+           (None if not retained)
+        """
+        return self._ring.value(shot, column)
+
+    def range(self, lo, hi):
+        """Get zero-copy FasTrak3 metadata column arrays of shots [lo,hi]
+        """
+        return self._ring.range(lo, hi)
 
     @property
     def data(self):
         """Get FasTrak3 metadata
+           (dataframe view cached until next append)
         """
-        return self._data
+        return self._ring.frame
     
     @data.setter
     def data(self, val):
         """Set FasTrak3 metadata
         """
         # TODO ... proposed data assignment validation
-        self._data = val
+        self._ring.clear()
+        self._ring.append(val)
 
     @property
     def type(self):
@@ -76,17 +104,41 @@ class FT3MetaAccessor(object):
         self.type = val
 
     @property
-    def cb(self):
-        """Get FasTrak3 metadata callback
+    def bus(self):
+        """Get FasTrak3 metadata event bus
         """
-        return self._cb
+        return self._bus
     
-    @cb.setter
-    def cb(self, val):
-        """Set FasTrak3 metadata callback
+    @bus.setter
+    def bus(self, val):
+        """Set FasTrak3 metadata event bus
+           (publishes appended data to data-type topic)
         """
-        # TODO ... proposed callback validation
-        self._cb = val
+        self._bus = val
+
+    @property
+    def index(self):
+        """Get shot-number index
+        """
+        return self._ring.index
+
+    @index.setter
+    def index(self, val):
+        """Set (shared) shot-number index
+        """
+        self._ring.index = val
+
+    @property
+    def archive(self):
+        """Get archive of evicted shots
+        """
+        return self._ring.archive
+
+    @archive.setter
+    def archive(self, val):
+        """Set archive of evicted shots (None disables archiving)
+        """
+        self._ring.archive = val
 
 
 @pd.api.extensions.register_series_accessor("ft3shot")
@@ -94,47 +146,69 @@ class FT3ShotAccessor(object):
     def __init__(self, pd_obj, maxlen=cfgd._FT3_DATA_MAX_LEN):
         """Initialize FasTrak3 shot data
         """
-        self._data = pd.Series(data=None, name='shot_df')
-        self._name = self._data.name
+        self._store = store.FT3TrajectoryStore(columns=cfgd._FT3_DATA_SHOT_DATAFRAME_VARIABLES,
+                                               dtypes=cfgd._FT3_DATA_SHOT_DTYPES,
+                                               maxlen=cfgd._FT3_DATA_RING_LEN(maxlen),
+                                               samples=cfgd._FT3_DATA_SHOT_SAMPLES_NUM,
+                                               name='shot_df',
+                                               key=FT3DataType.shot)
+        self._name = self._store.name
         self._type = FT3DataType.shot
         self._maxlen = maxlen
-        self._cb = lambda new: None
+        self._bus = None # Publish/subscribe event bus
 
     def __iadd__(self, new):
         """FasTrak3 shot data overloaded (+=) assignment operator
            to append shot-data dataframe as new element of series
         """
-        self._drop()
+        if new.empty:
+            return self
 
-        # NB: Shot data representation as pandas series with elements
-        #     that are per-shot position- and time- sample dataframes
-        #     to enable efficient operations to retain / access many
-        #     historical shots. (2019-AUG-23)
-        wrap_df = pd.Series(data=[new], name=self._name, index=[new.shot[0]])
-
-        self._data = pd.concat((self._data, wrap_df))
-        self._cb(new)
+        # NB: Shot data retained as contiguous per-shot spans of preallocated
+        #     per-column arrays with a per-shot offset table to enable
+        #     constant-time append / eviction of historical shots.
+        self._store.append(new)
+        if self._bus is not None:
+            self._bus.publish(self._type, new)
 
         return self
 
-    def _drop(self):
-        """Drop too-old FasTrak3 shot data
+    def __len__(self):
+        return len(self._store)
+
+    def get(self, shot):
+        """Get FasTrak3 shot data dataframe by shot number
         """
-        self._data = cfgd._FT3_DATA_DROP(self)
+        return self._store.get(shot)
+
+    def slices(self, shot):
+        """Get zero-copy FasTrak3 shot data arrays by shot number
+        """
+        return self._store.slices(shot)
+
+    def range(self, lo, hi, copy=False):
+        """Get FasTrak3 shot data arrays of shots [lo,hi]
+           (zero-copy, else copied consistent with concurrent appends)
+        """
+        return self._store.range(lo, hi, copy=copy)
 
     @property
     def data(self):
         """Get FasTrak3 shot data
+           (trajectory store indexed by shot number)
         """
-        return self._data
+        return self._store
     
     @data.setter
     def data(self, val):
         """Set FasTrak3 shot data
+           (series of per-shot dataframes)
         """
         # TODO ... proposed data assignment validation
         #          e.g. cfgd._FT3_DATA_SHOT_DATAFRAME_VARIABLES
-        self._data = val
+        self._store.clear()
+        for df in val:
+            self._store.append(df)
 
     @property
     def type(self):
@@ -150,17 +224,41 @@ class FT3ShotAccessor(object):
         self.type = val
 
     @property
-    def cb(self):
-        """Get FasTrak3 shot data callback
+    def bus(self):
+        """Get FasTrak3 shot data event bus
         """
-        return self._cb
+        return self._bus
     
-    @cb.setter
-    def cb(self, val):
-        """Set FasTrak3 shot data callback
+    @bus.setter
+    def bus(self, val):
+        """Set FasTrak3 shot data event bus
+           (publishes appended data to data-type topic)
+        """
+        self._bus = val
+
+    @property
+    def index(self):
+        """Get shot-number index
         """
-        # TODO ... proposed callback validation
-        self._cb = val
+        return self._store.index
+
+    @index.setter
+    def index(self, val):
+        """Set (shared) shot-number index
+        """
+        self._store.index = val
+
+    @property
+    def archive(self):
+        """Get archive of evicted shots
+        """
+        return self._store.archive
+
+    @archive.setter
+    def archive(self, val):
+        """Set archive of evicted shots (None disables archiving)
+        """
+        self._store.archive = val
 
 
 @pd.api.extensions.register_dataframe_accessor("ft3ref")
@@ -171,14 +269,15 @@ class FT3RefAccessor(object):
         self._data = pd.DataFrame(data=None, columns=cfgd._FT3_DATA_REF_DATAFRAME_VARIABLES)
         self._type = FT3DataType.ref
         self._maxlen = maxlen
-        self._cb = lambda new: None
+        self._bus = None # Publish/subscribe event bus
 
     def __iadd__(self, new):
         """FasTrak3 reference shot data overloaded (+=) assignment operator
         """
         self._drop()
         self._data = pd.concat((self._data, new), ignore_index=True)
-        self._cb(new)
+        if self._bus is not None:
+            self._bus.publish(self._type, new)
 
         return self
 
@@ -214,17 +313,17 @@ class FT3RefAccessor(object):
         self.type = val
 
     @property
-    def cb(self):
-        """Get FasTrak3 reference shot data callback
+    def bus(self):
+        """Get FasTrak3 reference shot data event bus
         """
-        return self._cb
+        return self._bus
     
-    @cb.setter
-    def cb(self, val):
-        """Set FasTrak3 reference shot data callback
+    @bus.setter
+    def bus(self, val):
+        """Set FasTrak3 reference shot data event bus
+           (publishes appended data to data-type topic)
         """
-        # TODO ... proposed callback validation
-        self._cb = val
+        self._bus = val
 
 
 @pd.api.extensions.register_dataframe_accessor("ft3param")
@@ -232,37 +331,94 @@ class FT3ParamAccessor(object):
     def __init__(self, pd_obj, maxlen=cfgd._FT3_DATA_MAX_LEN):
         """Initialize FasTrak3 derived parameters
         """
-        self._data = pd.DataFrame(data=None, columns=cfgd._FT3_DATA_PARAM_DATAFRAME_VARIABLES)
         self._type = FT3DataType.param
+        self._ring = ring.FT3RingBuffer(columns=cfgd._FT3_DATA_PARAM_DATAFRAME_VARIABLES,
+                                        maxlen=cfgd._FT3_DATA_RING_LEN(maxlen),
+                                        key=self._type)
         self._maxlen = maxlen
-        self._cb = lambda new: None
+        self._bus = None # Publish/subscribe event bus
 
     def __iadd__(self, new):
         """FasTrak3 derived parameters overloaded (+=) assignment operator
+           (O(1) append and eviction of oldest rows)
         """
-        self._drop()
-        self._data = pd.concat((self._data, new), ignore_index=True)
-        self._cb(new)
+        self._ring.append(new)
+        if self._bus is not None:
+            self._bus.publish(self._type, new)
 
         return self
 
-    def _drop(self):
-        """Drop too-old FasTrak3 derived parameters
+    def __len__(self):
+        return len(self._ring)
+
+    def tail(self, n=1):
+        """Get newest n rows of FasTrak3 derived parameters
         """
-        self._data = cfgd._FT3_DATA_DROP(self)
+        return self._ring.tail(n)
+
+    def get(self, shot):
+        """Get FasTrak3 derived parameters row by shot number
+           (single-row dataframe, empty if not retained)
+        """
+        return self._ring.get(shot)
+
+    def value(self, shot, column):
+        """Get FasTrak3 derived parameters value by shot number
+           (None if not retained)
+        """
+        return self._ring.value(shot, column)
+
+    def range(self, lo, hi):
+        """Get zero-copy FasTrak3 derived parameters column arrays of shots [lo,hi]
+        """
+        return self._ring.range(lo, hi)
+
+    def view(self, start=0, stop=None):
+        """Get zero-copy FasTrak3 derived parameters column arrays of rows [start,stop)
+        """
+        return self._ring.view(start, stop)
 
     @property
     def data(self):
         """Get FasTrak3 derived parameters data
+           (dataframe view cached until next append)
         """
-        return self._data
+        return self._ring.frame
     
     @data.setter
     def data(self, val):
         """Set FasTrak3 derived parameters data
         """
         # TODO ... proposed data assignment validation
-        self._data = val
+        self._ring.clear()
+        self._ring.append(val)
+
+    def replace(self, val, generation=None):
+        """Replace FasTrak3 derived parameters data (e.g. recalculated),
+           retaining newer shots appended meanwhile (atomic)
+           Returns replaced data, None if replaced since generation
+        """
+        return self._ring.replace(val, generation=generation)
+
+    def merge(self, val, generation=None):
+        """Replace FasTrak3 derived parameters of shots of data (e.g.
+           recalculated), retaining older and newer shots (atomic)
+           Returns merged data, None if replaced since generation
+        """
+        return self._ring.merge(val, generation=generation)
+
+    @property
+    def generation(self):
+        """Get FasTrak3 derived parameters generation
+           (incremented when data replaced, e.g. recalculated)
+        """
+        return self._ring.generation
+
+    @property
+    def capacity(self):
+        """Get FasTrak3 derived parameters retained rows capacity
+        """
+        return self._ring.capacity
 
     @property
     def type(self):
@@ -278,17 +434,41 @@ class FT3ParamAccessor(object):
         self.type = val
 
     @property
-    def cb(self):
-        """Get FasTrak3 derived parameters callback
+    def bus(self):
+        """Get FasTrak3 derived parameters event bus
         """
-        return self._cb
+        return self._bus
     
-    @cb.setter
-    def cb(self, val):
-        """Set FasTrak3 derived parameters callback
+    @bus.setter
+    def bus(self, val):
+        """Set FasTrak3 derived parameters event bus
+           (publishes appended data to data-type topic)
+        """
+        self._bus = val
+
+    @property
+    def index(self):
+        """Get shot-number index
+        """
+        return self._ring.index
+
+    @index.setter
+    def index(self, val):
+        """Set (shared) shot-number index
+        """
+        self._ring.index = val
+
+    @property
+    def archive(self):
+        """Get archive of evicted shots
+        """
+        return self._ring.archive
+
+    @archive.setter
+    def archive(self, val):
+        """Set archive of evicted shots (None disables archiving)
         """
-        # TODO ... proposed callback validation
-        self._cb = val
+        self._ring.archive = val
 
 
 @pd.api.extensions.register_series_accessor("ft3events")
@@ -296,46 +476,68 @@ class FT3EventsAccessor(object):
     def __init__(self, pd_obj, maxlen=cfgd._FT3_DATA_MAX_LEN):
         """Initialize FasTrak3 events
         """
-        self._data = pd.Series(data=None, name='events_df')
-        self._name = self._data.name
+        self._store = store.FT3TrajectoryStore(columns=cfgd._FT3_DATA_EVENTS_DATAFRAME_VARIABLES,
+                                               dtypes=cfgd._FT3_DATA_EVENTS_DTYPES,
+                                               maxlen=cfgd._FT3_DATA_RING_LEN(maxlen),
+                                               samples=cfgd._FT3_DATA_EVENTS_SAMPLES_NUM,
+                                               name='events_df',
+                                               key=FT3DataType.events)
+        self._name = self._store.name
         self._type = FT3DataType.events
         self._maxlen = maxlen
-        self._cb = lambda new: None
+        self._bus = None # Publish/subscribe event bus
 
     def __iadd__(self, new):
         """FasTrak3 events overloaded (+=) assignment operator
         """
-        self._drop()
+        if new.empty:
+            return self
 
-        # NB: Shot events representation as pandas series with elements
-        #     that are per-shot events dataframes to enable efficient
-        #     operations to retain / access events associated with many
-        #     historical shots. (2019-AUG-23)
-        wrap_df = pd.Series(data=[new], name=self._name, index=[new.shot[0]])
-
-        self._data = pd.concat((self._data, wrap_df))
-        self._cb(new)
+        # NB: Shot events retained as contiguous per-shot spans of preallocated
+        #     per-column arrays with a per-shot offset table to enable
+        #     constant-time append / eviction of historical shots.
+        self._store.append(new)
+        if self._bus is not None:
+            self._bus.publish(self._type, new)
 
         return self
 
-    def _drop(self):
-        """Drop too-old FasTrak3 events
+    def __len__(self):
+        return len(self._store)
+
+    def get(self, shot):
+        """Get FasTrak3 events dataframe by shot number
         """
-        self._data = cfgd._FT3_DATA_DROP(self)
+        return self._store.get(shot)
+
+    def slices(self, shot):
+        """Get zero-copy FasTrak3 events arrays by shot number
+        """
+        return self._store.slices(shot)
+
+    def range(self, lo, hi, copy=False):
+        """Get FasTrak3 events arrays of shots [lo,hi]
+           (zero-copy, else copied consistent with concurrent appends)
+        """
+        return self._store.range(lo, hi, copy=copy)
 
     @property
     def data(self):
         """Get FasTrak3 events data
+           (trajectory store indexed by shot number)
         """
-        return self._data
+        return self._store
     
     @data.setter
     def data(self, val):
         """Set FasTrak3 events data
+           (series of per-shot dataframes)
         """
         # TODO ... proposed data assignment validation
         #          e.g. cfgd._FT3_DATA_EVENTS_DATAFRAME_VARIABLES
-        self._data = val
+        self._store.clear()
+        for df in val:
+            self._store.append(df)
 
     @property
     def type(self):
@@ -351,17 +553,41 @@ class FT3EventsAccessor(object):
         self.type = val
 
     @property
-    def cb(self):
-        """Get FasTrak3 events callback
+    def bus(self):
+        """Get FasTrak3 events event bus
         """
-        return self._cb
+        return self._bus
     
-    @cb.setter
-    def cb(self, val):
-        """Set FasTrak3 events callback
+    @bus.setter
+    def bus(self, val):
+        """Set FasTrak3 events event bus
+           (publishes appended data to data-type topic)
+        """
+        self._bus = val
+
+    @property
+    def index(self):
+        """Get shot-number index
+        """
+        return self._store.index
+
+    @index.setter
+    def index(self, val):
+        """Set (shared) shot-number index
         """
-        # TODO ... proposed callback validation
-        self._cb = val
+        self._store.index = val
+
+    @property
+    def archive(self):
+        """Get archive of evicted shots
+        """
+        return self._store.archive
+
+    @archive.setter
+    def archive(self, val):
+        """Set archive of evicted shots (None disables archiving)
+        """
+        self._store.archive = val
 
 
 @pd.api.extensions.register_series_accessor("ft3ad")
@@ -369,47 +595,69 @@ class FT3AdAccessor(object):
     def __init__(self, pd_obj, maxlen=cfgd._FT3_DATA_AD_MAX_LEN):
         """Initialize FasTrak3 shot A/D measurements
         """
-        self._data = pd.Series(data=None, name='ad_df')
-        self._name = self._data.name
+        self._store = store.FT3TrajectoryStore(columns=cfgd._FT3_DATA_AD_DATAFRAME_VARIABLES,
+                                               dtypes=cfgd._FT3_DATA_AD_DTYPES,
+                                               maxlen=cfgd._FT3_DATA_RING_LEN(maxlen),
+                                               samples=cfgd._FT3_DATA_SHOT_SAMPLES_NUM,
+                                               name='ad_df',
+                                               key=FT3DataType.ad)
+        self._name = self._store.name
         self._type = FT3DataType.ad
         self._maxlen = maxlen
-        self._cb = lambda new: None
+        self._bus = None # Publish/subscribe event bus
 
     def __iadd__(self, new):
         """FasTrak3 shot data overloaded (+=) assignment operator
            to append shot-data dataframe as new element of series
         """
-        self._drop()
+        if new.empty:
+            return self
 
-        # NB: Shot A/Ds representation as pandas series with elements
-        #     that are per-shot position- and time- sample dataframes
-        #     to enable efficient operations to retain / access many
-        #     historical shots. (2019-AUG-23)
-        wrap_df = pd.Series(data=[new], name=self._name, index=[new.shot[0]])
-
-        self._data = pd.concat((self._data, wrap_df))
-        self._cb(new)
+        # NB: Shot A/Ds retained as contiguous per-shot spans of preallocated
+        #     per-column arrays with a per-shot offset table to enable
+        #     constant-time append / eviction of historical shots.
+        self._store.append(new)
+        if self._bus is not None:
+            self._bus.publish(self._type, new)
 
         return self
 
-    def _drop(self):
-        """Drop too-old FasTrak3 shot A/D measurements
+    def __len__(self):
+        return len(self._store)
+
+    def get(self, shot):
+        """Get FasTrak3 shot A/D measurements dataframe by shot number
         """
-        self._data = cfgd._FT3_DATA_DROP(self)
+        return self._store.get(shot)
+
+    def slices(self, shot):
+        """Get zero-copy FasTrak3 shot A/D measurements arrays by shot number
+        """
+        return self._store.slices(shot)
+
+    def range(self, lo, hi, copy=False):
+        """Get FasTrak3 shot A/D measurements arrays of shots [lo,hi]
+           (zero-copy, else copied consistent with concurrent appends)
+        """
+        return self._store.range(lo, hi, copy=copy)
 
     @property
     def data(self):
         """Get FasTrak3 shot A/D measurements
+           (trajectory store indexed by shot number)
         """
-        return self._data
+        return self._store
     
     @data.setter
     def data(self, val):
         """Set FasTrak3 shot A/D measurements
+           (series of per-shot dataframes)
         """
         # TODO ... proposed data assignment validation
         #          e.g. cfgd._FT3_DATA_AD_DATAFRAME_VARIABLES
-        self._data = val
+        self._store.clear()
+        for df in val:
+            self._store.append(df)
 
     @property
     def type(self):
@@ -425,14 +673,38 @@ class FT3AdAccessor(object):
         self.type = val
 
     @property
-    def cb(self):
-        """Get FasTrak3 shot A/D measurement callback
+    def bus(self):
+        """Get FasTrak3 shot A/D measurement event bus
         """
-        return self._cb
+        return self._bus
     
-    @cb.setter
-    def cb(self, val):
-        """Set FasTrak3 shot A/D measurement callback
+    @bus.setter
+    def bus(self, val):
+        """Set FasTrak3 shot A/D measurement event bus
+           (publishes appended data to data-type topic)
+        """
+        self._bus = val
+
+    @property
+    def index(self):
+        """Get shot-number index
+        """
+        return self._store.index
+
+    @index.setter
+    def index(self, val):
+        """Set (shared) shot-number index
+        """
+        self._store.index = val
+
+    @property
+    def archive(self):
+        """Get archive of evicted shots
+        """
+        return self._store.archive
+
+    @archive.setter
+    def archive(self, val):
+        """Set archive of evicted shots (None disables archiving)
         """
-        # TODO ... proposed callback validation
-        self._cb = val
+        self._store.archive = val
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 shot-number index
+"""
+from threading import Lock
+
+
+class FT3ShotIndex(object):
+    def __init__(self):
+        """Initialize shot-number to storage-slot index
+           (shared by board data accessors, keyed by data type)
+        """
+        self._slots = {}
+        self._mutex = Lock()
+
+    def add(self, key, shot, slot):
+        """Index shot stored at slot
+           NB: Repeated shot numbers (e.g. after reconnect) index newest slot
+        """
+        with self._mutex:
+            self._slots.setdefault(key, {})[int(shot)] = slot
+
+    def remove(self, key, shot, slot):
+        """Remove shot evicted from slot
+           (No-op if shot number since re-indexed to another slot)
+        """
+        with self._mutex:
+            _s = self._slots.get(key)
+            if _s is not None and _s.get(int(shot)) == slot:
+                del _s[int(shot)]
+
+    def clear(self, key):
+        """Clear index of data type
+        """
+        with self._mutex:
+            self._slots.pop(key, None)
+
+    def get(self, key, shot, default=None):
+        """Get slot of shot, default if not retained
+        """
+        _s = self._slots.get(key)
+        if _s is None:
+            return default
+        return _s.get(int(shot), default)
+
+    def has(self, key, shot):
+        """Shot retained for data type
+        """
+        return self.get(key, shot) is not None
+
+    def __len__(self):
+        return sum(len(s) for s in self._slots.values())
+
+
+def bisect(get, n, x, right=False):
+    """Binary search of x in nondecreasing sequence get(0..n-1)
+       (left- or right- insertion point, as numpy searchsorted)
+    """
+    lo,hi = 0,n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        v = get(mid)
+        if v < x or (right and v == x):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 fixed-capacity columnar ring buffer
+"""
+import numpy as np
+import pandas as pd
+
+from threading import Lock
+
+import data.index as index
+
+
+class FT3RingBuffer(object):
+    def __init__(self, columns, maxlen, key=None, key_column='shot'):
+        """Initialize fixed-capacity columnar ring buffer
+           (NumPy column arrays allocated on first append)
+        """
+        self._columns = list(columns)
+        self._capacity = max(int(maxlen), 1)
+
+        # NB: Rows written twice, at r and r + capacity, so any window of
+        #     retained rows is a contiguous (zero-copy) slice of columns
+        self._arrays = None
+        self._head = 0 # Physical row of oldest element
+        self._size = 0
+
+        # Shot-number index
+        self.key = key
+        self.key_column = key_column
+        self._index = index.FT3ShotIndex()
+
+        # Archive of evicted rows (optional)
+        self.archive = None
+
+        self._frame = None # Cached dataframe view
+        self._generation = 0 # Clears (i.e. rows replaced) count
+        self._mutex = Lock()
+
+    def __len__(self):
+        return self._size
+
+    def append(self, df):
+        """Append dataframe rows, evicting oldest rows beyond capacity
+           Returns number of evicted rows
+        """
+        with self._mutex:
+            return self._append(df)
+
+    def clear(self):
+        """Clear ring buffer (retaining allocated columns)
+        """
+        with self._mutex:
+            self._clear()
+
+    def replace(self, df, generation=None):
+        """Replace retained rows by dataframe rows, retaining rows of
+           newer keys (e.g. appended meanwhile) in one atomic step
+           Returns retained rows dataframe, None if generation given and
+           rows replaced since (nothing replaced)
+        """
+        with self._mutex:
+            if generation is not None and generation != self._generation:
+                return None
+
+            if self._arrays is not None and self._size and len(df):
+                _k = self._arrays[self.key_column][self._head:self._head+self._size]
+                _i = np.searchsorted(_k, df[self.key_column].to_numpy()[-1], side='right')
+                if _i < self._size:
+                    _new = self._make_frame(self._head + _i, self._head + self._size)
+                    df = pd.concat((df, _new), ignore_index=True)
+
+            self._clear()
+            self._append(df)
+            return df
+
+    def merge(self, df, generation=None):
+        """Replace retained rows of dataframe key range by dataframe rows,
+           retaining rows of older and newer keys in one atomic step
+           Returns retained rows dataframe, None if generation given and
+           rows replaced since (nothing replaced)
+        """
+        with self._mutex:
+            if generation is not None and generation != self._generation:
+                return None
+
+            if self._arrays is not None and self._size and len(df):
+                _k = self._arrays[self.key_column][self._head:self._head+self._size]
+                _kk = df[self.key_column].to_numpy()
+                i0 = np.searchsorted(_k, _kk[0], side='left')
+                i1 = np.searchsorted(_k, _kk[-1], side='right')
+                _old = self._make_frame(self._head, self._head + i0)
+                _new = self._make_frame(self._head + i1, self._head + self._size)
+                df = pd.concat((_old, df, _new), ignore_index=True)
+
+            self._clear()
+            self._append(df)
+            return self._make_frame(self._head, self._head + self._size)
+
+    def view(self, start=0, stop=None):
+        """Get zero-copy column views of logical rows [start,stop)
+           NB: Views are valid until rows are evicted
+        """
+        _start,_stop,_ = slice(start, stop).indices(self._size)
+        _stop = max(_stop, _start)
+        if self._arrays is None:
+            return {c: np.array([]) for c in self._columns}
+        i0 = self._head + _start
+        i1 = self._head + _stop
+        return {c: self._arrays[c][i0:i1] for c in self._columns}
+
+    def row(self, key):
+        """Get physical row of shot number, None if not retained
+        """
+        return self._index.get(self.key, key)
+
+    def value(self, key, column):
+        """Get column value of shot number, None if not retained
+           (nor archived)
+        """
+        r = self.row(key)
+        if r is None:
+            v = self._archived(key)
+            return v[column][0] if v is not None else None
+        return self._arrays[column][r]
+
+    def get(self, key):
+        """Get (single-row) dataframe of shot number
+           (read from archive if evicted)
+        """
+        r = self.row(key)
+        if r is None:
+            v = self._archived(key)
+            if v is None:
+                return pd.DataFrame(data=None, columns=self._columns)
+            return pd.DataFrame(data={c: np.array(v[c]) for c in self._columns if c in v},
+                                columns=self._columns)
+        return self._make_frame(r, r + 1)
+
+    def range(self, lo, hi):
+        """Get zero-copy column views of shot numbers [lo,hi]
+           NB: Binary search assumes nondecreasing shot numbers
+        """
+        if self._arrays is None:
+            return self.view(0, 0)
+        _k = self._arrays[self.key_column][self._head:self._head+self._size]
+        i0 = np.searchsorted(_k, lo, side='left')
+        i1 = np.searchsorted(_k, hi, side='right')
+        return self.view(i0, i1)
+
+    def column(self, name):
+        """Get column in chronological order (copy)
+        """
+        with self._mutex:
+            if self._arrays is None:
+                return np.array([])
+            return self._arrays[name][self._head:self._head+self._size].copy()
+
+    def tail(self, n=1):
+        """Get newest n rows as dataframe
+        """
+        with self._mutex:
+            r = self._head + self._size
+            return self._make_frame(max(r - n, self._head), r)
+
+    @property
+    def frame(self):
+        """Get dataframe view (built lazily and cached until next append)
+        """
+        _frame = self._frame
+        if _frame is None:
+            with self._mutex:
+                _frame = self._frame = self._make_frame(self._head, self._head + self._size)
+        return _frame
+
+    @property
+    def index(self):
+        return self._index
+
+    @index.setter
+    def index(self, val):
+        """Set (shared) shot-number index, indexing retained rows
+        """
+        with self._mutex:
+            self._index = val
+            if self._arrays is not None and self.key_column in self._arrays:
+                _k = self._arrays[self.key_column]
+                for r in (self._head + np.arange(self._size)) % self._capacity:
+                    val.add(self.key, _k[r], r)
+
+    @property
+    def generation(self):
+        """Get generation, i.e. count of clears (retained rows replaced
+           rather than appended, e.g. recalculated)
+        """
+        return self._generation
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def columns(self):
+        return self._columns
+
+    def _make_frame(self, i0, i1):
+        """Make dataframe of physical rows [i0,i1)
+        """
+        if self._arrays is None:
+            return pd.DataFrame(data=None, columns=self._columns)
+
+        return pd.DataFrame(data={c: self._arrays[c][i0:i1].copy() for c in self._columns},
+                            columns=self._columns)
+
+    def _append(self, df):
+        """Append dataframe rows (mutex held)
+           Returns number of evicted rows
+        """
+        n = len(df)
+        if n == 0:
+            return 0
+
+        if self._arrays is None:
+            self._alloc(df)
+
+        # Evicted rows (archived and unindexed before overwrite)
+        evicted = max(self._size + n - self._capacity, 0)
+        _k = self._arrays.get(self.key_column)
+        if _k is not None:
+            for r in (self._head + np.arange(min(evicted, self._size))) % self._capacity:
+                if self.archive is not None:
+                    self.archive.append(_k[r], {c: a[r:r+1] for c,a in self._arrays.items()})
+                self._index.remove(self.key, _k[r], r)
+
+        # Rows beyond capacity overwrite one another
+        k = min(n, self._capacity)
+        rows = (self._head + self._size + np.arange(n - k, n)) % self._capacity
+
+        for c in self._columns:
+            v = df[c].to_numpy()[n-k:] if c in df.columns else np.full(k, np.nan)
+            a = self._arrays[c]
+            if not np.can_cast(v.dtype, a.dtype, casting='same_kind') or \
+               (a.dtype.kind in 'iu' and v.dtype.kind == 'f'):
+                a = self._arrays[c] = self._promote(a, v.dtype)
+            a[rows] = v
+            a[rows + self._capacity] = v
+
+        _k = self._arrays.get(self.key_column)
+        if _k is not None:
+            for r in rows:
+                self._index.add(self.key, _k[r], r)
+
+        self._head = (self._head + evicted) % self._capacity
+        self._size = min(self._size + n, self._capacity)
+        self._frame = None
+
+        return evicted
+
+    def _clear(self):
+        """Clear ring buffer (mutex held)
+        """
+        self._index.clear(self.key)
+        self._head = 0
+        self._size = 0
+        self._frame = None
+        self._generation += 1
+
+    def _archived(self, key):
+        """Get archived column arrays of shot number, None if not archived
+        """
+        if self.archive is None:
+            return None
+        return self.archive.get(key)
+
+    def _alloc(self, df):
+        """Allocate column arrays with dtypes of first appended dataframe
+        """
+        self._arrays = {}
+        for c in self._columns:
+            dt = df[c].to_numpy().dtype if c in df.columns else np.dtype(float)
+            self._arrays[c] = np.empty(2 * self._capacity, dtype=dt)
+
+    def _promote(self, a, dtype):
+        """Promote column array to hold incoming dtype
+        """
+        try:
+            dt = np.result_type(a.dtype, dtype)
+        except TypeError:
+            dt = np.dtype(object)
+        return a.astype(dt)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 contiguous per-shot trajectory store
+"""
+import numpy as np
+import pandas as pd
+
+from threading import Lock
+
+import data.index as index
+
+
+class FT3TrajectoryStore(object):
+    def __init__(self, columns, dtypes, maxlen, samples, name=None, key=None):
+        """Initialize per-shot trajectory store
+           (Preallocated per-column sample arena and a ring of per-shot
+            offsets into the arena; each shot occupies a contiguous span)
+        """
+        self._columns = list(columns) # Dataframe columns, incl. shot number
+        self._dtypes = dict(dtypes)   # Per-sample column dtypes
+        self._name = name
+
+        self._capacity = max(int(maxlen), 1)
+        _len = self._capacity * max(int(samples), 1)
+
+        self._arrays = {c: np.zeros(_len, dtype=dt) for c,dt in self._dtypes.items()}
+        self._cursor = 0 # Arena write position
+
+        # Per-shot offset table (ring of shot slots)
+        self._shot  = np.zeros(self._capacity, dtype=np.int64)
+        self._start = np.zeros(self._capacity, dtype=np.int64)
+        self._count = np.zeros(self._capacity, dtype=np.int64)
+        self._head = 0 # Slot of oldest shot
+        self._size = 0
+
+        # Shot-number index
+        self.key = key
+        self._index = index.FT3ShotIndex()
+
+        # Archive of evicted shots (optional)
+        self.archive = None
+
+        self._mutex = Lock()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, shot):
+        return self._slot(shot) is not None
+
+    def __getitem__(self, shot):
+        """Get shot dataframe by shot number
+        """
+        return self.get(shot)
+
+    def append(self, df, shot=None):
+        """Append per-shot dataframe as contiguous span of arena
+           Returns list of (shot,slot) evicted from store
+        """
+        if shot is None:
+            shot = df.shot.values[0]
+        n = len(df)
+
+        evicted = []
+        with self._mutex:
+            if n > self._arena_len:
+                self._grow(n)
+
+            # Wrap arena, first evicting (oldest) shots in skipped arena tail
+            if self._cursor + n > self._arena_len:
+                while self._size and self._start[self._head] >= self._cursor:
+                    evicted += [self._evict()]
+                self._cursor = 0
+
+            # Evict oldest shots overlapping write span or beyond capacity
+            while self._size and ((self._size == self._capacity) or self._overlaps(self._head, n)):
+                evicted += [self._evict()]
+
+            i0,i1 = self._cursor, self._cursor + n
+            for c,a in self._arrays.items():
+                a[i0:i1] = df[c].to_numpy() if c in df.columns else 0
+
+            k = (self._head + self._size) % self._capacity
+            self._shot[k] = shot
+            self._start[k] = i0
+            self._count[k] = n
+            self._size += 1
+            self._cursor = i1
+
+            self._index.add(self.key, shot, k)
+
+        return evicted
+
+    def clear(self):
+        """Clear trajectory store (retaining allocated arena)
+        """
+        with self._mutex:
+            self._index.clear(self.key)
+            self._head = 0
+            self._size = 0
+            self._cursor = 0
+
+    def slices(self, shot):
+        """Get zero-copy per-column array views of shot samples
+           (memory-mapped if evicted to archive)
+           NB: Views are valid until shot is evicted from store
+        """
+        k = self._slot(shot)
+        if k is None:
+            v = self._archived(shot)
+            if v is None:
+                raise KeyError(shot)
+            return v
+        return self.slot_slices(k)
+
+    def range(self, lo, hi, copy=False):
+        """Get per-column array views of shot numbers [lo,hi] as list of
+           (shot,views), oldest to newest
+           (zero-copy, else views of samples copied under store mutex,
+            i.e. consistent with concurrent appends)
+           NB: Binary search assumes nondecreasing shot numbers. Zero-
+               copy views are overwritten by appends wrapping arena
+               (single-threaded callers only)
+        """
+        with self._mutex:
+            _k = lambda i: self._shot[(self._head + i) % self._capacity]
+            i0 = index.bisect(_k, self._size, lo)
+            i1 = index.bisect(_k, self._size, hi, right=True)
+            ii = (self._head + np.arange(i0, max(i1, i0))) % self._capacity
+            if not copy:
+                return [(self._shot[k], self.slot_slices(k)) for k in ii]
+
+            # Samples of all shots gathered (one copy per column)
+            _s = self._shot[ii].copy()
+            _n = self._count[ii]
+            _off = np.cumsum(_n) - _n
+            _jj = np.repeat(self._start[ii] - _off, _n) + np.arange(_n.sum())
+            _arrays = {c: a[_jj] for c,a in self._arrays.items()}
+
+        return [(s, {c: a[o:o+n] for c,a in _arrays.items()}) for s,o,n in zip(_s, _off, _n)]
+
+    def slot_slices(self, k):
+        """Get zero-copy per-column array views of slot samples
+        """
+        i0 = self._start[k]
+        i1 = i0 + self._count[k]
+        return {c: a[i0:i1] for c,a in self._arrays.items()}
+
+    def get(self, shot):
+        """Get shot dataframe (copy) by shot number
+           (read from archive if evicted)
+        """
+        k = self._slot(shot)
+        if k is None:
+            v = self._archived(shot)
+            if v is None:
+                raise KeyError(shot)
+            return self._make_frame(v, shot)
+        return self._make_frame(self.slot_slices(k), self._shot[k])
+
+    def last(self):
+        """Get newest shot dataframe (copy)
+        """
+        if not self._size:
+            return pd.DataFrame(data=None, columns=self._columns)
+        k = (self._head + self._size - 1) % self._capacity
+        return self._make_frame(self.slot_slices(k), self._shot[k])
+
+    @property
+    def shots(self):
+        """Get retained shot numbers, oldest to newest
+        """
+        ii = (self._head + np.arange(self._size)) % self._capacity
+        return self._shot[ii]
+
+    @property
+    def index(self):
+        return self._index
+
+    @index.setter
+    def index(self, val):
+        """Set (shared) shot-number index, indexing retained shots
+        """
+        with self._mutex:
+            self._index = val
+            for k in (self._head + np.arange(self._size)) % self._capacity:
+                val.add(self.key, self._shot[k], k)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self._arrays.values())
+
+    @property
+    def _arena_len(self):
+        return len(next(iter(self._arrays.values())))
+
+    def _slot(self, shot):
+        """Slot of (newest) shot number, None if not retained
+        """
+        return self._index.get(self.key, shot)
+
+    def _overlaps(self, k, n):
+        """Slot k arena span overlaps write span [cursor,cursor+n)
+        """
+        s0 = self._start[k]
+        s1 = s0 + self._count[k]
+        return (s0 < self._cursor + n) and (self._cursor < s1)
+
+    def _archived(self, shot):
+        """Get archived per-column arrays of shot, None if not archived
+        """
+        if self.archive is None:
+            return None
+        return self.archive.get(shot)
+
+    def _evict(self):
+        """Evict oldest shot (archived before arena span is overwritten)
+        """
+        k = self._head
+        if self.archive is not None:
+            self.archive.append(self._shot[k], self.slot_slices(k))
+        self._head = (self._head + 1) % self._capacity
+        self._size -= 1
+        self._index.remove(self.key, self._shot[k], k)
+        return (self._shot[k], k)
+
+    def _grow(self, n):
+        """Grow arena to hold n-sample shot, compacting retained shots
+        """
+        _len = max(2 * self._arena_len, n + self._arena_len)
+        ii = (self._head + np.arange(self._size)) % self._capacity
+
+        _arrays = {c: np.zeros(_len, dtype=a.dtype) for c,a in self._arrays.items()}
+        i0 = 0
+        for k in ii:
+            s0,m = self._start[k], self._count[k]
+            for c,a in self._arrays.items():
+                _arrays[c][i0:i0+m] = a[s0:s0+m]
+            self._start[k] = i0
+            i0 += m
+
+        self._arrays = _arrays
+        self._cursor = i0
+
+    def _make_frame(self, v, shot):
+        """Make dataframe of per-column sample arrays of shot
+        """
+        n = len(next(iter(v.values())))
+        data = {}
+        for c in self._columns:
+            if c in v:
+                data[c] = np.array(v[c])
+            else:
+                data[c] = np.full(n, shot)
+        return pd.DataFrame(data=data, columns=self._columns)
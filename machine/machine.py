@@ -98,6 +98,16 @@ class Machine(object):
         """
         self.session = None
 
+    def update(self, machine):
+        """Update machine settings from machine (e.g. board settings)
+           (session reference unchanged)
+        """
+        self._name = machine.name
+        self.rod = copy.deepcopy(machine.rod)
+        self.geom = copy.deepcopy(machine.geom)
+        self._qdiv = machine.qdiv
+        self.timeouts = copy.deepcopy(machine.timeouts)
+
     def copy(self):
         """Copy machine
         """
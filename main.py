@@ -78,7 +78,9 @@ if lo:
     names = [cfgb._FT3_BOARD_NAME_LOCALHOST]
     ips = [cfgb._FT3_BOARD_IP_LOCALHOST]
 else:
+    # One board hub per board IP (unnamed boards named by index)
     names = [n.strip() for n in names]
+    names += [cfgb._FT3_BOARD_NAME_GENERATOR(i+1) for i in range(len(names), len(ips))]
 
 
 util._FT3_UTIL_VERBOSE_INFO_WITH_TS("main")
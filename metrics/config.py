@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"""
+
+_FT3_METRICS_LATENCY_WINDOW = 1024 # Latency samples retained for percentiles
+
+_FT3_METRICS_PERCENTILES = (50, 95, 99)
+
+_FT3_METRICS_RATE_WINDOW_S = 10 # Trailing window of per-second rates
+
+# Named latency statistics (see metrics.timed)
+_FT3_METRICS_CONVERT_AD = 'convert_ad'  # A/D conversion
+_FT3_METRICS_CALC       = 'calc'        # Derived-parameter calculation
+_FT3_METRICS_RECALC     = 'recalc'      # Derived-parameter batch recalculation (all shots)
+_FT3_METRICS_CLASSIFY   = 'classify'    # Alarm-state classification
+_FT3_METRICS_PREVIEW    = 'preview'     # Part settings what-if preview
+_FT3_METRICS_UI         = 'ui_schedule' # UI update scheduling
+_FT3_METRICS_SQL_WRITE  = 'sql_write'   # SQL database write
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 runtime metrics
+"""
+import time
+
+import numpy as np
+
+from functools import wraps
+from threading import Lock
+
+import metrics.config as cfgm
+
+
+class LatencyStats(object):
+    def __init__(self, maxlen=cfgm._FT3_METRICS_LATENCY_WINDOW):
+        """Initialize latency statistics
+           (window of most recent samples, seconds)
+        """
+        self._samples = np.zeros(max(int(maxlen), 1), dtype=np.float64)
+        self._n = 0 # Samples recorded (total)
+
+        self._mutex = Lock()
+
+    def __len__(self):
+        return min(self._n, len(self._samples))
+
+    def add(self, dt):
+        """Record latency sample
+        """
+        with self._mutex:
+            self._samples[self._n % len(self._samples)] = dt
+            self._n += 1
+
+    def percentiles(self, q=cfgm._FT3_METRICS_PERCENTILES):
+        """Get latency percentiles of retained samples
+           (dict keyed by percentile, NaN if no samples)
+        """
+        with self._mutex:
+            v = self._samples[:len(self)].copy()
+        if not len(v):
+            return {p: np.nan for p in q}
+        return dict(zip(q, np.percentile(v, q)))
+
+    def summary(self):
+        """Get latency summary (count, mean, max and percentiles)
+        """
+        with self._mutex:
+            v = self._samples[:len(self)].copy()
+            n = self._n
+        rv = {'count': n,
+              'mean' : v.mean() if len(v) else np.nan,
+              'max'  : v.max() if len(v) else np.nan}
+        rv.update({'p{:d}'.format(p): x for p,x in self.percentiles().items()})
+        return rv
+
+    def clear(self):
+        with self._mutex:
+            self._n = 0
+
+
+class Histogram(object):
+    def __init__(self, edges):
+        """Initialize histogram of fixed bucket edges
+           (bucket i counts edges[i-1] <= x < edges[i], open-ended
+            first and last buckets)
+        """
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self._counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+
+        self._mutex = Lock()
+
+    def __len__(self):
+        return int(self._counts.sum())
+
+    def add(self, x):
+        """Record sample
+        """
+        i = np.searchsorted(self.edges, x, side='right')
+        with self._mutex:
+            self._counts[i] += 1
+
+    @property
+    def counts(self):
+        with self._mutex:
+            return self._counts.copy()
+
+    def summary(self):
+        """Get histogram (bucket upper edges and counts)
+        """
+        return {'edges' : self.edges.tolist() + [np.inf],
+                'counts': self.counts.tolist()}
+
+    def clear(self):
+        with self._mutex:
+            self._counts[:] = 0
+
+
+class RateCounter(object):
+    def __init__(self, window=cfgm._FT3_METRICS_RATE_WINDOW_S):
+        """Initialize rate counter
+           (total and per-second rate over trailing window, s)
+        """
+        self.window = max(int(window), 1)
+        self._buckets = np.zeros(self.window + 1, dtype=np.int64) # Per-second counts (ring)
+        self._sec = None # Second of newest bucket
+        self.total = 0
+
+        self._mutex = Lock()
+
+    def add(self, n=1):
+        """Record count
+        """
+        with self._mutex:
+            self._advance(int(time.monotonic()))
+            self._buckets[self._sec % len(self._buckets)] += n
+            self.total += n
+
+    def rate(self):
+        """Get per-second rate over trailing window (excl. current second)
+        """
+        with self._mutex:
+            _sec = int(time.monotonic())
+            self._advance(_sec)
+            return (self._buckets.sum() - self._buckets[_sec % len(self._buckets)]) / self.window
+
+    def clear(self):
+        with self._mutex:
+            self._buckets[:] = 0
+            self._sec = None
+            self.total = 0
+
+    def _advance(self, sec):
+        """Advance ring to second, clearing elapsed buckets
+        """
+        if self._sec is None:
+            self._sec = sec
+        n = min(sec - self._sec, len(self._buckets))
+        for k in range(1, n + 1):
+            self._buckets[(self._sec + k) % len(self._buckets)] = 0
+        self._sec = max(sec, self._sec)
+
+
+_registry = {} # Named latency statistics (process-wide)
+_mutex = Lock()
+
+def stats(name):
+    """Get named latency statistics (created on first use)
+    """
+    with _mutex:
+        S = _registry.get(name)
+        if S is None:
+            S = _registry[name] = LatencyStats()
+    return S
+
+def registry():
+    """Get named latency statistics (keyed by name)
+    """
+    with _mutex:
+        return dict(_registry)
+
+def clear():
+    """Clear named latency statistics
+    """
+    for S in registry().values():
+        S.clear()
+
+
+class timer(object):
+    def __init__(self, name):
+        """Record elapsed time of with-block to named latency statistics
+        """
+        self.stats = stats(name)
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add(time.perf_counter() - self._t0)
+        return False
+
+def timed(name):
+    """Record call latency of decorated function to named latency statistics
+    """
+    def _timed(fn):
+        @wraps(fn)
+        def _fn(*args, **kwargs):
+            with timer(name):
+                return fn(*args, **kwargs)
+        return _fn
+    return _timed
@@ -19,6 +19,8 @@ from bokeh.models import DataTable, TableColumn, HTMLTemplateFormatter
 from bokeh.models import Div, RadioGroup, RangeSlider, Select, TextInput, Button
 from bokeh.layouts import row, column
 
+import param.tuning as tuning
+
 import param.uiprop as uipp
 import param.config as cfgp
 
@@ -72,6 +74,8 @@ class Models:
     wire_alarm_high  : Select = None
     wire_sep         : Div = None
 
+    projection       : Div = None
+
     revert_param     : Button = None
     apply_param      : Button = None
 
@@ -113,14 +117,17 @@ class LimitUIID(IntEnum):
 
 
 class Param(object):
-    def __init__(self, session=None, verbose=util.VerboseLevel.info):
+    def __init__(self, session=None, unitsys=None, verbose=util.VerboseLevel.info):
         """Initialize FasTrak3 alarm parameters
+           (unit system of session, else unitsys, else default)
         """        
         self.session = session
         self.verbose = verbose
 
         if session is not None:
             self.unitsys = session.unitsys
+        elif unitsys is not None:
+            self.unitsys = unitsys
         else:
             self.unitsys = units._FT3_UNITS_SYSTEM_DEFAULT
 
@@ -154,6 +161,9 @@ class Param(object):
         self.sel_param = None
         self.models = Models()
 
+        # Projected alarm states of limits over retained shots
+        self.tuning = tuning.Tuning(unitsys=self.unitsys, verbose=verbose)
+
         self._make_data()
         self._make_models()
 
@@ -195,6 +205,9 @@ class Param(object):
             _uir += [row(self.models.wire_alarm_low, self.models.wire_warn_low, self.models.wire_sep,
                          self.models.wire_warn_high, self.models.wire_alarm_high, self.models.apply_param)]
 
+            # Selected-parameter projected alarm states
+            _uir += [self.models.projection]
+
             self.models.layout = column(_uir)
         else:
             if self.verbose >= util.VerboseLevel.error:
@@ -203,6 +216,14 @@ class Param(object):
                 sys.stdout.flush()
             return
             
+    def update(self, param):
+        """Update targets/limits/wires (and sources) from param
+           (e.g. board settings)
+        """
+        self.data.limits_wires = param.data.limits_wires.copy()
+        self.data.profile = param.data.profile
+        self.sources.limits_wires.data = ColumnDataSource.from_df(self.data.limits_wires)
+
     def _make_data(self):
         """Make parameter datasets and sources.
         """
@@ -367,6 +388,12 @@ class Param(object):
             self.models.limits_high.on_change('value',
                 lambda attr,old,new,ui=LimitUIID.both_high: self._limits_cb(attr, old, new, ui))
 
+        # NB: Projected alarm states as limits are dragged (unthrottled)
+        self.models.limits_low.on_change('value',
+            lambda attr,old,new,ui=LimitUIID.both_low: self._projection_cb(attr, old, new, ui))
+        self.models.limits_high.on_change('value',
+            lambda attr,old,new,ui=LimitUIID.both_high: self._projection_cb(attr, old, new, ui))
+
 
         #  Warn/alarm limits via alternate UIs
         mdl = TextInput(value=uipp._FT3_ALARM_PARAMETER_LIMIT_WARN_LOW_TEXT_INPUT_VALUE,
@@ -476,6 +503,15 @@ class Param(object):
                   name=uipp._FT3_ALARM_PARAMETER_WIRE_SEP_DIV_NAME)
         self.models.wire_sep = mdl
 
+        # Selected-parameter projected alarm states
+        mdl = Div(text=uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_TEXT_NONE,
+                  style=uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_STYLE,
+                  width=uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_PX_W,
+                  height=uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_PX_H,
+                  margin=uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_MARGIN,
+                  name=uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_NAME)
+        self.models.projection = mdl
+
         # Revert selected-parameter limits/wires
         b = Button(label=uipp._FT3_ALARM_PARAMETER_REVERT_BUTTON_LABEL,
                    button_type=uipp._FT3_ALARM_PARAMETER_REVERT_BUTTON_TYPE_DISABLED,
@@ -706,6 +742,9 @@ class Param(object):
         self.models.wire_alarm_low.tags = [cb]
         self.models.wire_alarm_high.tags = [cb]
 
+        # Selected-parameter projected alarm states
+        self._projection_update()
+
     def _target_cb(self, attr, old, new):
         """Selected-parameter target
         """
@@ -1021,6 +1060,10 @@ class Param(object):
         # Parameter limits/wires data table update
         self.data.limits_wires = self.sources.limits_wires.to_df()
         self.data.limits_wires.drop(columns="index", inplace=True)
+        self.data.profile = pd.Timestamp.now()
+
+        # Board part targets/limits/wires (alarm states, see board.hub)
+        self.session.board.apply(part=self.session.part)
 
         self.models.apply_param.disabled = True
         self.models.apply_param.button_type = uipp._FT3_ALARM_PARAMETER_APPLY_BUTTON_TYPE_DISABLED
@@ -1033,11 +1076,68 @@ class Param(object):
 
         # Alarm state
         self.session.state.update()
+        self._projection_update()
 
         # SQL database
-        self.data.profile = pd.Timestamp.now()
         self.session.alarm.sql_write()
 
+    def _projection_cb(self, attr, old, new, ui):
+        """Selected-parameter projected alarm states of dragged low
+           warn/alarm or high warn/alarm limits
+        """
+        p = self.sel_param
+
+        if p is None:
+            return
+
+        _df = self.sources.limits_wires.data
+        if ui == LimitUIID.both_low:
+            _aL,_wL = new
+            _wH,_aH = _df['limit_warn_high'][p],_df['limit_alarm_high'][p]
+        else:
+            _aL,_wL = _df['limit_alarm_low'][p],_df['limit_warn_low'][p]
+            _wH,_aH = new
+
+        self._projection_update(limits=(_aL,_wL,_wH,_aH))
+
+    def _projection_update(self, limits=None):
+        """Selected-parameter projected alarm states over retained
+           shots of limits (pending limits if None) relative to applied
+           limits (engineering units)
+        """
+        _methodname = self._projection_update.__name__
+
+        # Selected parameter
+        p = self.sel_param
+
+        if p is None or getattr(self.session, "board", None) is None:
+            return
+
+        _lw = self.data.limits_wires
+        current = (_lw.limit_alarm_low[p], _lw.limit_warn_low[p], _lw.limit_warn_high[p], _lw.limit_alarm_high[p])
+        if limits is None:
+            _df = self.sources.limits_wires.data
+            limits = (_df['limit_alarm_low'][p], _df['limit_warn_low'][p],
+                      _df['limit_warn_high'][p], _df['limit_alarm_high'][p])
+
+        try:
+            self.tuning.sync(self.session.board.data.param)
+            P = self.tuning.project(p, limits, current)
+        except ValueError as e:
+            self.models.projection.text = uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_TEXT_INVALID(e)
+            return
+
+        if not P.num:
+            self.models.projection.text = uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_TEXT_NONE
+            return
+
+        self.models.projection.text = uipp._FT3_ALARM_PARAMETER_PROJECTION_DIV_TEXT(P.counts, P.num, P.shots.tolist())
+
+        if self.verbose >= util.VerboseLevel.debug:
+            util._FT3_UTIL_VERBOSE_DEBUG_WITH_TS(_methodname)
+            print("projected alarm states {} changed shots {}".format(P.counts, len(P.shots)))
+            sys.stdout.flush()
+
     def _limit_ratio_cb(self, attr, old, new, ui):
         """Global parameter warn/alarm limits as percentage of targets
         """
@@ -1118,7 +1218,7 @@ class Param(object):
         rv = cls.__new__(cls)
 
         memo[id(self)] = rv
-        llex = ['sources','models','sel_param']
+        llex = ['sources','models','sel_param','tuning']
 
         for k, v in self.__dict__.items():
             if k in llex:
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 alarm parameter limits what-if tuning
+"""
+import numpy as np
+
+from dataclasses import dataclass
+from threading import Lock
+
+import param.config as cfgp
+import state.config as cfgss
+import state.data as datas
+
+import util.util as util
+import units.units as units
+
+
+# NB: Parameter histories are kept sorted (engineering units, undefined
+#     parameters excluded), so alarm-state counts of candidate limits
+#     are four searchsorted() ranks, and shots changing state between
+#     limits are the sorted ranges between old and new ranks, i.e.
+#     O(log n) per limit edit (plus changed shots). Histories synced
+#     per appended (or evicted) shot, sync otherwise O(1)
+
+
+# Alarm states of classification bins (low to high)
+_LABELS = ["alarm_low","warn_low","none","warn_high","alarm_high"]
+_STATES = np.array([cfgss._FT3_ALARM_STATE_MAP[l] for l in _LABELS], dtype=np.uint8)
+
+
+def edges(limits):
+    """Get alarm-state classification bin edges of (alarm low, warn
+       low, warn high, alarm high) limits (right-inclusive bins; limits
+       scalars or per-parameter arrays, edges along last axis)
+    """
+    _res = cfgss._FT3_ALARM_STATE_RESOLUTION
+    _resh = cfgss._FT3_ALARM_STATE_RESOLUTION_H
+
+    aL,wL,wH,aH = [np.asarray(l, dtype=np.float64) for l in limits]
+    rv = np.stack((aL - _res, wL - _resh, wH + _resh, aH + _res), axis=-1)
+    _bad = np.any(np.diff(rv, axis=-1) < 0, axis=-1)
+    if np.any(_bad):
+        if rv.ndim > 1:
+            raise ValueError("parameter {} limits must increase monotonically".format(np.flatnonzero(_bad).tolist()))
+        raise ValueError("limits ({}) must increase monotonically".format(", ".join("{:g}".format(l) for l in limits)))
+    return rv
+
+def classify(x, e):
+    """Get alarm states (uint8) of parameter values x (engineering
+       units, shots x parameters) of per-parameter bin edges e
+       (parameters x 4, see edges), undefined values unknown
+    """
+    x = np.asarray(x, dtype=np.float64)
+    rv = _STATES[(x[...,None] > e).sum(axis=-1)]
+    rv[np.isnan(x)] = datas.AlarmState.unknown
+    return rv
+
+
+@dataclass
+class Projection:
+    counts: dict       # Projected shots per alarm state (keyed alarm_low ... alarm_high)
+    shots : np.ndarray # Shots changing alarm state (ascending)
+    states: np.ndarray # Projected alarm states of changing shots
+    num   : int        # Classified (defined parameter) shots
+
+
+class Tuning(object):
+    def __init__(self, unitsys=units._FT3_UNITS_SYSTEM_DEFAULT, verbose=util.VerboseLevel.info):
+        """Initialize alarm parameter limits what-if tuning
+           (sorted parameter histories of derived parameters, see sync)
+        """
+        self.verbose = verbose
+
+        self.num = cfgp._FT3_ALARM_PARAMETERS_NUM
+        self._Eu = cfgp._FT3_ALARM_PARAMETER_UNIT_CONVERSIONS[:,unitsys]
+
+        self._src = None        # Synced derived parameters accessor
+        self._generation = None # Synced derived parameters generation
+        self._first = None      # Synced shots [first, last]
+        self._last = None
+
+        self.values = [np.zeros(0)] * self.num                 # Sorted parameter values
+        self.shots = [np.zeros(0, dtype=np.int64)] * self.num  # Shots of sorted values
+
+        self._mutex = Lock()
+
+    def sync(self, param):
+        """Sync sorted histories with derived parameters accessor
+           (appended shots inserted, evicted shots removed, rebuilt if
+            data replaced)
+           NB: O(1) if unchanged (e.g. limit edits between shots), only
+               appended rows read (zero-copy column views)
+        """
+        _k = cfgss._FT3_ALARM_STATE_SHOT_VARIABLE
+
+        with self._mutex:
+            if not len(param):
+                self._reset(param)
+                return
+
+            _s0 = int(param.view(0, 1)[_k][0])
+            _s1 = int(param.view(-1)[_k][0])
+            if param is not self._src or param.generation != self._generation or self._last is None or \
+               _s0 < self._first or _s1 < self._last:
+                self._build(param, param.view())
+                return
+
+            if _s0 == self._first and _s1 == self._last:
+                return
+
+            # Evicted shots
+            if _s0 > self._first:
+                for i in range(self.num):
+                    _ok = self.shots[i] >= _s0
+                    self.values[i], self.shots[i] = self.values[i][_ok], self.shots[i][_ok]
+
+            # Appended shots
+            V = param.range(self._last + 1, np.inf)
+            _s = np.asarray(V[_k], dtype=np.int64)
+            if len(_s):
+                for i,n in enumerate(cfgp._FT3_ALARM_PARAMETER_NAMES):
+                    _v = np.asarray(V[n], dtype=np.float64) * self._Eu[i]
+                    _ok = ~np.isnan(_v)
+                    _v,_sh = _v[_ok], _s[_ok]
+                    _o = np.argsort(_v, kind='stable')
+                    _r = np.searchsorted(self.values[i], _v[_o], side='right')
+                    self.values[i] = np.insert(self.values[i], _r, _v[_o])
+                    self.shots[i] = np.insert(self.shots[i], _r, _sh[_o])
+
+            self._first, self._last = _s0, _s1
+
+    def counts(self, i, limits):
+        """Get projected shots per alarm state of parameter i limits
+           (alarm low, warn low, warn high, alarm high; engineering units)
+        """
+        _k = np.searchsorted(self.values[i], edges(limits), side='right')
+        _n = np.diff(np.concatenate(([0], _k, [len(self.values[i])])))
+        return dict(zip(_LABELS, _n.tolist()))
+
+    def project(self, i, limits, current):
+        """Get projection of parameter i limits relative to current
+           limits (alarm low, warn low, warn high, alarm high;
+           engineering units)
+        """
+        _v = self.values[i]
+        _k0 = np.searchsorted(_v, edges(current), side='right')
+        _k1 = np.searchsorted(_v, edges(limits), side='right')
+
+        # Sorted ranks between current and projected bin edges
+        _r = [np.arange(min(a, b), max(a, b)) for a,b in zip(_k0, _k1) if a != b]
+        _r = np.unique(np.concatenate(_r)) if _r else np.zeros(0, dtype=np.int64)
+
+        _n = np.diff(np.concatenate(([0], _k1, [len(_v)])))
+        _st = _STATES[np.searchsorted(_k1, _r, side='right')]
+
+        _o = np.argsort(self.shots[i][_r], kind='stable')
+        return Projection(counts=dict(zip(_LABELS, _n.tolist())),
+                          shots=self.shots[i][_r][_o],
+                          states=_st[_o],
+                          num=len(_v))
+
+    def _build(self, param, V):
+        """Rebuild sorted histories of derived-parameter column arrays V
+        """
+        _s = np.asarray(V[cfgss._FT3_ALARM_STATE_SHOT_VARIABLE], dtype=np.int64)
+        for i,n in enumerate(cfgp._FT3_ALARM_PARAMETER_NAMES):
+            _v = np.asarray(V[n], dtype=np.float64) * self._Eu[i]
+            _k = ~np.isnan(_v)
+            _o = np.argsort(_v[_k], kind='stable')
+            self.values[i] = _v[_k][_o]
+            self.shots[i] = _s[_k][_o]
+
+        self._src, self._generation = param, param.generation
+        self._first, self._last = _s[0], _s[-1]
+
+    def _reset(self, param):
+        self.values = [np.zeros(0)] * self.num
+        self.shots = [np.zeros(0, dtype=np.int64)] * self.num
+        self._src, self._generation = param, param.generation
+        self._first = self._last = None
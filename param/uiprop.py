@@ -236,6 +236,30 @@ _FT3_ALARM_PARAMETER_WIRE_SEP_DIV_MARGIN = [40, 5, 5, 10]
 _FT3_ALARM_PARAMETER_WIRE_SEP_DIV_NAME   = "ft3_alarm_parameter_wire_sep_div"
 
 
+# Selected-parameter projected alarm states of (pending) limits over
+# retained shots (counts low to high, cf. param.tuning)
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_TEXT_NONE    = '<b>Projection</b> &nbsp; no retained shots'
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_TEXT_INVALID = lambda e: '<b>Projection</b> &nbsp; <span style="color:#D62728">{}</span>'.format(e)
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_TEXT         = lambda c,n,s: ('<b>Projection</b> ({:d} shots) &nbsp; '
+                                                                  'alarm low <b>{alarm_low:d}</b> &nbsp; '
+                                                                  'warn low <b>{warn_low:d}</b> &nbsp; '
+                                                                  'none <b>{none:d}</b> &nbsp; '
+                                                                  'warn high <b>{warn_high:d}</b> &nbsp; '
+                                                                  'alarm high <b>{alarm_high:d}</b> &nbsp; '
+                                                                  '&mdash; <b>{:d}</b> shots change state{}'.format(n, len(s),
+                                                                  _FT3_ALARM_PARAMETER_PROJECTION_DIV_SHOTS(s), **c))
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_SHOTS_NUM    = 10 # Changing shots listed
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_SHOTS        = lambda s: (' ({}{})'.format(', '.join(map(str, s[:_FT3_ALARM_PARAMETER_PROJECTION_DIV_SHOTS_NUM])),
+                                                                               ', &hellip;' if len(s) > _FT3_ALARM_PARAMETER_PROJECTION_DIV_SHOTS_NUM else '')
+                                                              if len(s) else '')
+
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_STYLE  = {"text-align":"left", "font-size":"100%", "color":"#333333"}
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_PX_W   = 1200
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_PX_H   = 30
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_MARGIN = [15, 5, 5, 15]
+_FT3_ALARM_PARAMETER_PROJECTION_DIV_NAME   = "ft3_alarm_parameter_projection_div"
+
+
 _FT3_ALARM_PARAMETER_REVERT_BUTTON_LABEL = u"\u21BA" + " " + "Revert"
 
 _FT3_ALARM_PARAMETER_REVERT_BUTTON_TYPE_ENABLED  = "primary"
@@ -53,7 +53,7 @@ class SlowShotVariation:
 
 
 class Part(object):
-    def __init__(self, session=None, name=cfgpt._FT3_PART_NAME_DEFAULT, verbose=util.VerboseLevel.info):
+    def __init__(self, session=None, name=cfgpt._FT3_PART_NAME_DEFAULT, unitsys=None, verbose=util.VerboseLevel.info):
         _methodname = self.__init__.__name__
 
         self.session = session
@@ -61,7 +61,7 @@ class Part(object):
 
         self._name = name
 
-        self.param = param.Param(session, verbose=verbose) # Monitored parameter alarm limits/wires
+        self.param = param.Param(session, unitsys=unitsys, verbose=verbose) # Monitored parameter alarm limits/wires
 
         self.stroke = Stroke(minimum=cfgpt._FT3_PART_MINIMUM_STROKE_LENGTH_MM,
                              total=cfgpt._FT3_PART_TOTAL_STROKE_LENGTH_MM)
@@ -97,6 +97,18 @@ class Part(object):
         """
         self.session = self.param.session = None
 
+    def update(self, part):
+        """Update part settings from part (e.g. board settings)
+           (session reference unchanged)
+        """
+        self._name = part.name
+        self.stroke = copy.deepcopy(part.stroke)
+        self.plunger = copy.deepcopy(part.plunger)
+        self.csfs = copy.deepcopy(part.csfs)
+        self.intens = copy.deepcopy(part.intens)
+        self.ss_var = copy.deepcopy(part.ss_var)
+        self.param.update(part.param)
+
     def copy(self):
         """Copy part
         """
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 part settings what-if preview UI
+"""
+import sys
+import time
+
+import numpy as np
+
+from functools import reduce
+from dataclasses import dataclass
+
+from bokeh.models import ColumnDataSource
+from bokeh.models import DataTable, TableColumn, HTMLTemplateFormatter
+
+from bokeh.models import Div, Slider, Button
+from bokeh.layouts import row, column
+
+import calc.preview as preview
+import metrics.metrics as metrics
+
+import part.uiprop as uipt
+import calc.config as cfgc
+import param.config as cfgp
+import metrics.config as cfgm
+
+import util.util as util
+import units.units as units
+
+
+@dataclass
+class Sources:
+    """Bokeh model column data source interfaces to data for UIs
+    """
+    table: ColumnDataSource
+
+
+@dataclass
+class Models:
+    layout : column = None
+
+    header : Div = None
+    status : Div = None
+
+    sliders: dict = None # Previewed settings sliders keyed by setting
+    table  : DataTable = None
+
+    refresh: Button = None
+    reset  : Button = None
+    apply  : Button = None
+
+
+class Preview(object):
+    def __init__(self, session=None, verbose=util.VerboseLevel.info):
+        """Initialize part settings what-if preview
+           (parameters of last retained shots re-derived as settings
+            sliders move, part settings unchanged)
+        """
+        self.session = session
+        self.verbose = verbose
+
+        if session is not None:
+            self.unitsys = session.unitsys
+        else:
+            self.unitsys = units._FT3_UNITS_SYSTEM_DEFAULT
+
+        self.keys = cfgc._FT3_CALC_PREVIEW_SETTINGS
+
+        self.preview = None # Preview of last retained shots (see refresh)
+        self.settings = {}  # Previewed settings (SI units)
+        self._reset = False # Sliders reset (setting callbacks suppressed)
+
+        self.models = Models()
+
+        self._make_data()
+        self._make_models()
+
+    def layout(self):
+        """UI layout
+        """
+        _n = uipt._FT3_PART_PREVIEW_SLIDER_COLS
+        _s = [self.models.sliders[k] for k in self.keys]
+
+        _uir = []
+        _uir += [self.models.header]
+        _uir += [row(_s[i:i+_n]) for i in range(0, len(_s), _n)]
+        _uir += [row(self.models.status, self.models.refresh, self.models.reset, self.models.apply)]
+        _uir += [self.models.table]
+
+        self.models.layout = column(_uir)
+
+    def refresh(self):
+        """Rebuild preview of last retained shots of session board
+           (e.g. newer shots or board selected)
+        """
+        _methodname = self.refresh.__name__
+
+        S = self.session
+        try:
+            self.preview = S.board.preview(S.machine, S.part)
+        except Exception as e:
+            self.preview = None
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("preview exception e {}".format(e))
+                sys.stdout.flush()
+
+        self.reset()
+
+    def reset(self):
+        """Reset previewed settings to part settings
+        """
+        self.settings = preview.settings(self.session.part)
+
+        # NB: Slider range symmetric about setting, [v-|v|,v+|v|]
+        #     (unit range about zero settings)
+        _Eu = uipt._FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS[:,self.unitsys]
+        for i,k in enumerate(self.keys):
+            _v = self.settings[k] * _Eu[i]
+            _dv = abs(_v) if _v != 0.0 else uipt._FT3_PART_PREVIEW_SLIDER_RANGE_MIN
+
+            self._reset = True
+            self.models.sliders[k].update(start=_v - _dv, end=_v + _dv,
+                                          step=2.0 * _dv / uipt._FT3_PART_PREVIEW_SLIDER_STEPS, value=_v)
+            self._reset = False
+
+        self.update()
+
+    def apply(self):
+        """Apply previewed settings to part settings (session and board,
+           board derived parameters recalculated)
+        """
+        _methodname = self.apply.__name__
+
+        S = self.session
+        for k,v in self.settings.items():
+            _k = k.split('.')
+            setattr(reduce(getattr, _k[:-1], S.part), _k[-1], v)
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("apply previewed part settings")
+            sys.stdout.flush()
+
+        S.board.apply(part=S.part)
+        self.refresh()
+
+    @metrics.timed(cfgm._FT3_METRICS_PREVIEW)
+    def update(self):
+        """Update previewed parameters of previewed settings
+        """
+        P = self.preview
+        if P is None:
+            self.models.status.text = uipt._FT3_PART_PREVIEW_STATUS_DIV_TEXT_NONE
+            self.sources.table.data = self._table(None, None)
+            return
+
+        t0 = time.perf_counter()
+        _p = P.calc(self.settings)
+        dt = time.perf_counter() - t0
+
+        self.sources.table.data = self._table(P.params, _p)
+        self.models.status.text = uipt._FT3_PART_PREVIEW_STATUS_DIV_TEXT(len(_p), int(_p.shot.iloc[0]),
+                                                                         int(_p.shot.iloc[-1]), dt)
+
+    def _table(self, p0, p1):
+        """Previewed parameters table of current (p0) and previewed
+           (p1) parameters (engineering units)
+        """
+        _names = uipt._FT3_PART_PREVIEW_TABLE_PARAMETERS
+        _ii = [cfgp._FT3_ALARM_PARAMETER_NAMES.index(n) for n in _names]
+        _Eu = cfgp._FT3_ALARM_PARAMETER_UNIT_CONVERSIONS[_ii,self.unitsys]
+
+        _F = uipt._FT3_PART_PREVIEW_TABLE_FIELDS
+        rv = {_F[0]: [cfgp._FT3_ALARM_PARAMETER_DESCR[i] for i in _ii],
+              _F[1]: cfgp._FT3_ALARM_PARAMETER_UNITS[_ii,self.unitsys].tolist()}
+        if p0 is None:
+            rv.update({f: [np.nan] * len(_names) for f in _F[2:]})
+            return rv
+
+        _a = p0[_names].to_numpy(dtype=np.float64)
+        _b = p1[_names].to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            _ma = np.nansum(_a, axis=0) / np.sum(~np.isnan(_a), axis=0)
+            _mb = np.nansum(_b, axis=0) / np.sum(~np.isnan(_b), axis=0)
+            rv[_F[2]] = (_ma * _Eu).tolist()
+            rv[_F[3]] = (_mb * _Eu).tolist()
+            rv[_F[4]] = (100.0 * (_mb - _ma) / np.abs(_ma)).tolist()
+        rv[_F[5]] = (~np.isclose(_a, _b, rtol=uipt._FT3_PART_PREVIEW_CHANGED_RTOL, equal_nan=True)).sum(axis=0).tolist()
+        return rv
+
+    def _make_data(self):
+        """Make previewed parameters table source
+        """
+        self.sources = Sources(table=ColumnDataSource(self._table(None, None)))
+
+    def _make_models(self):
+        """Make Bokeh models
+        """
+        mdl = Div(text=uipt._FT3_PART_PREVIEW_HEADER_DIV_TEXT,
+                  style=uipt._FT3_PART_PREVIEW_HEADER_DIV_STYLE,
+                  width=uipt._FT3_PART_PREVIEW_HEADER_DIV_PX_W,
+                  height=uipt._FT3_PART_PREVIEW_HEADER_DIV_PX_H,
+                  margin=uipt._FT3_PART_PREVIEW_HEADER_DIV_MARGIN,
+                  name=uipt._FT3_PART_PREVIEW_HEADER_DIV_NAME)
+        self.models.header = mdl
+
+        # Previewed settings sliders
+        # NB: Unthrottled (value) callbacks, i.e. preview as slider moves
+        self.models.sliders = {}
+        for i,k in enumerate(self.keys):
+            _t = uipt._FT3_PART_PREVIEW_SLIDER_TITLE(uipt._FT3_PART_PREVIEW_SLIDER_TITLES[i],
+                                                     uipt._FT3_PART_PREVIEW_SLIDER_UNITS[i,self.unitsys])
+            mdl = Slider(start=0.0, end=1.0, step=0.01, value=0.0,
+                         title=_t,
+                         format=uipt._FT3_PART_PREVIEW_SLIDER_FORMAT,
+                         width=uipt._FT3_PART_PREVIEW_SLIDER_PX_W,
+                         height=uipt._FT3_PART_PREVIEW_SLIDER_PX_H,
+                         margin=uipt._FT3_PART_PREVIEW_SLIDER_MARGIN,
+                         name=uipt._FT3_PART_PREVIEW_SLIDER_NAME(k))
+            mdl.on_change('value', lambda attr,old,new,k=k,i=i: self._setting_cb(attr, old, new, k, i))
+            self.models.sliders[k] = mdl
+
+        # Previewed parameters table
+        _fields = uipt._FT3_PART_PREVIEW_TABLE_FIELDS
+        _titles = uipt._FT3_PART_PREVIEW_TABLE_TITLES
+        _widths = uipt._FT3_PART_PREVIEW_TABLE_WIDTHS
+        _format = uipt._FT3_PART_PREVIEW_TABLE_FORMAT
+
+        _columns = [TableColumn(field=f, title=_titles[k], width=_widths[k]) for k,f in enumerate(_fields)]
+        for k,fmt in enumerate(_format):
+            if fmt is not None:
+                _columns[k].formatter = HTMLTemplateFormatter(template=fmt)
+
+        mdl = DataTable(source=self.sources.table, columns=_columns,
+                        reorderable=False,
+                        sortable=False,
+                        width=uipt._FT3_PART_PREVIEW_TABLE_PX_W,
+                        height=uipt._FT3_PART_PREVIEW_TABLE_PX_H,
+                        margin=uipt._FT3_PART_PREVIEW_TABLE_MARGIN,
+                        row_height=uipt._FT3_PART_PREVIEW_TABLE_PX_ROW,
+                        index_position=None,
+                        name=uipt._FT3_PART_PREVIEW_TABLE_NAME)
+        self.models.table = mdl
+
+        mdl = Div(text=uipt._FT3_PART_PREVIEW_STATUS_DIV_TEXT_NONE,
+                  width=uipt._FT3_PART_PREVIEW_STATUS_DIV_PX_W,
+                  height=uipt._FT3_PART_PREVIEW_STATUS_DIV_PX_H,
+                  margin=uipt._FT3_PART_PREVIEW_STATUS_DIV_MARGIN,
+                  name=uipt._FT3_PART_PREVIEW_STATUS_DIV_NAME)
+        self.models.status = mdl
+
+        b = Button(label=uipt._FT3_PART_PREVIEW_REFRESH_BUTTON_LABEL,
+                   button_type=uipt._FT3_PART_PREVIEW_REFRESH_BUTTON_TYPE,
+                   width=uipt._FT3_PART_PREVIEW_REFRESH_BUTTON_PX_W,
+                   height=uipt._FT3_PART_PREVIEW_REFRESH_BUTTON_PX_H,
+                   margin=uipt._FT3_PART_PREVIEW_REFRESH_BUTTON_MARGIN,
+                   name=uipt._FT3_PART_PREVIEW_REFRESH_BUTTON_NAME)
+        b.on_click(self.refresh)
+        self.models.refresh = b
+
+        b = Button(label=uipt._FT3_PART_PREVIEW_RESET_BUTTON_LABEL,
+                   button_type=uipt._FT3_PART_PREVIEW_RESET_BUTTON_TYPE,
+                   width=uipt._FT3_PART_PREVIEW_RESET_BUTTON_PX_W,
+                   height=uipt._FT3_PART_PREVIEW_RESET_BUTTON_PX_H,
+                   margin=uipt._FT3_PART_PREVIEW_RESET_BUTTON_MARGIN,
+                   name=uipt._FT3_PART_PREVIEW_RESET_BUTTON_NAME)
+        b.on_click(self.reset)
+        self.models.reset = b
+
+        b = Button(label=uipt._FT3_PART_PREVIEW_APPLY_BUTTON_LABEL,
+                   button_type=uipt._FT3_PART_PREVIEW_APPLY_BUTTON_TYPE,
+                   width=uipt._FT3_PART_PREVIEW_APPLY_BUTTON_PX_W,
+                   height=uipt._FT3_PART_PREVIEW_APPLY_BUTTON_PX_H,
+                   margin=uipt._FT3_PART_PREVIEW_APPLY_BUTTON_MARGIN,
+                   name=uipt._FT3_PART_PREVIEW_APPLY_BUTTON_NAME)
+        b.on_click(self.apply)
+        self.models.apply = b
+
+    def _setting_cb(self, attr, old, new, k, i):
+        """Previewed setting slider callback
+        """
+        if self._reset:
+            return
+
+        self.settings[k] = new / uipt._FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS[i,self.unitsys]
+        self.update()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+
+import calc.config as cfgc
+import units.units as units
+
+
+_FT3_PART_PREVIEW_HEADER_DIV_TEXT   = '<b>Part Settings What-If Preview</b>'
+_FT3_PART_PREVIEW_HEADER_DIV_STYLE  = {"text-align":"left", "font-size":"115%", "color":"#1F77B4"}
+_FT3_PART_PREVIEW_HEADER_DIV_PX_W   = 1200
+_FT3_PART_PREVIEW_HEADER_DIV_PX_H   = 30
+_FT3_PART_PREVIEW_HEADER_DIV_MARGIN = [15, 5, 5, 5]
+_FT3_PART_PREVIEW_HEADER_DIV_NAME   = "ft3_part_preview_header_div"
+
+
+# Previewed part settings sliders (cf. _FT3_CALC_PREVIEW_SETTINGS)
+_FT3_PART_PREVIEW_SLIDER_TITLES = []
+_FT3_PART_PREVIEW_SLIDER_TITLES += ["CSFS Minimum Position"]
+_FT3_PART_PREVIEW_SLIDER_TITLES += ["Slow Shot Start Position (User)"]
+_FT3_PART_PREVIEW_SLIDER_TITLES += ["Slow Shot End Position (User)"]
+_FT3_PART_PREVIEW_SLIDER_TITLES += ["Slow Shot Variation Start Position"]
+_FT3_PART_PREVIEW_SLIDER_TITLES += ["Slow Shot Variation Start Bias"]
+_FT3_PART_PREVIEW_SLIDER_TITLES += ["Slow Shot Variation Start Gain"]
+_FT3_PART_PREVIEW_SLIDER_TITLES += ["Slow Shot Variation End Bias"]
+_FT3_PART_PREVIEW_SLIDER_TITLES += ["Intensification Target Pressure"]
+
+_FT3_PART_PREVIEW_SLIDER_UNITS = []
+_FT3_PART_PREVIEW_SLIDER_UNITS += [("mm","in")]
+_FT3_PART_PREVIEW_SLIDER_UNITS += [("mm","in")]
+_FT3_PART_PREVIEW_SLIDER_UNITS += [("mm","in")]
+_FT3_PART_PREVIEW_SLIDER_UNITS += [("mm","in")]
+_FT3_PART_PREVIEW_SLIDER_UNITS += [("mm","in")]
+_FT3_PART_PREVIEW_SLIDER_UNITS += [("---","---")]
+_FT3_PART_PREVIEW_SLIDER_UNITS += [("mm","in")]
+_FT3_PART_PREVIEW_SLIDER_UNITS += [("MPa","psi")]
+_FT3_PART_PREVIEW_SLIDER_UNITS = np.array(_FT3_PART_PREVIEW_SLIDER_UNITS)
+
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS = []
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS += [(1.00,units._FT3_UNITS_MM_TO_IN)]
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS += [(1.00,units._FT3_UNITS_MM_TO_IN)]
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS += [(1.00,units._FT3_UNITS_MM_TO_IN)]
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS += [(1.00,units._FT3_UNITS_MM_TO_IN)]
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS += [(1.00,units._FT3_UNITS_MM_TO_IN)]
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS += [(1.00,1.00)]
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS += [(1.00,units._FT3_UNITS_MM_TO_IN)]
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS += [(1.00,units._FT3_UNITS_MPA_TO_PSI)]
+_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS = np.array(_FT3_PART_PREVIEW_SLIDER_UNIT_CONVERSIONS)
+
+# Slider range symmetric about setting, i.e. [v-|v|, v+|v|]
+_FT3_PART_PREVIEW_SLIDER_RANGE_MIN = 1.0 # Slider half-range of zero settings (else |setting|)
+_FT3_PART_PREVIEW_SLIDER_STEPS = 200
+
+_FT3_PART_PREVIEW_SLIDER_TITLE  = lambda t,u: "{} ({})".format(t, u)
+_FT3_PART_PREVIEW_SLIDER_FORMAT = "0[.]000"
+
+_FT3_PART_PREVIEW_SLIDER_PX_W   = 290
+_FT3_PART_PREVIEW_SLIDER_PX_H   = 40
+_FT3_PART_PREVIEW_SLIDER_MARGIN = [5, 15, 5, 5]
+_FT3_PART_PREVIEW_SLIDER_COLS   = 4
+
+_FT3_PART_PREVIEW_SLIDER_NAME   = lambda k: "ft3_part_preview_slider_{}".format(k.replace('.','_'))
+
+assert(len(_FT3_PART_PREVIEW_SLIDER_TITLES) == len(cfgc._FT3_CALC_PREVIEW_SETTINGS))
+
+
+# Previewed parameters table
+_FT3_PART_PREVIEW_TABLE_FIELDS = ["parameter","units","current","preview","change","shots"]
+_FT3_PART_PREVIEW_TABLE_TITLES = ["Parameter","Units","Current (Mean)","Preview (Mean)","Change (%)","Shots Changed"]
+
+_FT3_PART_PREVIEW_TABLE_PARAMETERS = ["ss_vel_avg","fs_vel_avg","intens_rise_time","csfs","ss_var_rate"]
+
+_FT3_PART_PREVIEW_TABLE_WIDTHS = [250] + [120] * (len(_FT3_PART_PREVIEW_TABLE_FIELDS) - 1)
+_FT3_PART_PREVIEW_TABLE_PX_ROW = 30
+_FT3_PART_PREVIEW_TABLE_MARGIN = [5, 5, 5, 5]
+
+_FT3_PART_PREVIEW_TABLE_PX_W = np.sum(_FT3_PART_PREVIEW_TABLE_WIDTHS)
+_FT3_PART_PREVIEW_TABLE_PX_H = _FT3_PART_PREVIEW_TABLE_PX_ROW * (len(_FT3_PART_PREVIEW_TABLE_PARAMETERS) + 1)
+
+_TEMPL = """
+<b><div><%= (value).toFixed({0:}) %></div></b>
+"""
+_FCN = lambda x:_TEMPL.format(x) if x is not None else None
+_FT3_PART_PREVIEW_TABLE_PRECISION = [None, None, 3, 3, 1, 0]
+_FT3_PART_PREVIEW_TABLE_FORMAT = [_FCN(p) for p in _FT3_PART_PREVIEW_TABLE_PRECISION]
+
+_FT3_PART_PREVIEW_TABLE_NAME = "ft3_part_preview_table"
+
+_FT3_PART_PREVIEW_CHANGED_RTOL = 1.0E-6 # Shot parameter changed (relative tolerance)
+
+
+_FT3_PART_PREVIEW_STATUS_DIV_TEXT_NONE = '<b>No retained shots</b>'
+_FT3_PART_PREVIEW_STATUS_DIV_TEXT      = lambda n,s0,s1,dt: ('<b>{:d} shots</b> ({:d}&ndash;{:d}) &nbsp; '
+                                                              'preview {:.1f} ms'.format(n, s0, s1, 1000.0 * dt))
+_FT3_PART_PREVIEW_STATUS_DIV_PX_W   = 600
+_FT3_PART_PREVIEW_STATUS_DIV_PX_H   = 30
+_FT3_PART_PREVIEW_STATUS_DIV_MARGIN = [15, 5, 5, 5]
+_FT3_PART_PREVIEW_STATUS_DIV_NAME   = "ft3_part_preview_status_div"
+
+
+_FT3_PART_PREVIEW_REFRESH_BUTTON_LABEL  = "Refresh"
+_FT3_PART_PREVIEW_REFRESH_BUTTON_TYPE   = "primary"
+_FT3_PART_PREVIEW_REFRESH_BUTTON_PX_W   = 100
+_FT3_PART_PREVIEW_REFRESH_BUTTON_PX_H   = 30
+_FT3_PART_PREVIEW_REFRESH_BUTTON_MARGIN = [15, 5, 5, 5]
+_FT3_PART_PREVIEW_REFRESH_BUTTON_NAME   = "ft3_part_preview_refresh_button"
+
+_FT3_PART_PREVIEW_RESET_BUTTON_LABEL  = "Reset"
+_FT3_PART_PREVIEW_RESET_BUTTON_TYPE   = "default"
+_FT3_PART_PREVIEW_RESET_BUTTON_PX_W   = 100
+_FT3_PART_PREVIEW_RESET_BUTTON_PX_H   = 30
+_FT3_PART_PREVIEW_RESET_BUTTON_MARGIN = [15, 5, 5, 5]
+_FT3_PART_PREVIEW_RESET_BUTTON_NAME   = "ft3_part_preview_reset_button"
+
+_FT3_PART_PREVIEW_APPLY_BUTTON_LABEL  = "Apply"
+_FT3_PART_PREVIEW_APPLY_BUTTON_TYPE   = "success"
+_FT3_PART_PREVIEW_APPLY_BUTTON_PX_W   = 100
+_FT3_PART_PREVIEW_APPLY_BUTTON_PX_H   = 30
+_FT3_PART_PREVIEW_APPLY_BUTTON_MARGIN = [15, 5, 5, 5]
+_FT3_PART_PREVIEW_APPLY_BUTTON_NAME   = "ft3_part_preview_apply_button"
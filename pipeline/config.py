@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"""
+
+_FT3_PIPELINE_QUEUE_MAX_LEN = 64 # Default stage queue bound
+
+_FT3_PIPELINE_PUT_TIMEOUT_S   = 2.00 # Blocking-stage producer wait (item dropped after)
+_FT3_PIPELINE_CLOSE_TIMEOUT_S = 5.00 # Stage worker drain wait on close
+
+# Shot ingest pipeline stages (queue bound, back-pressure policy name)
+# NB: Reassembly queue holds packets (not shots), dropped packets
+#     drop their shot (see Callbacks) so packet stages block (bounded
+#     by put timeout). Persist (SQL) queues shot numbers, and blocks
+#     likewise, shots not queued within put timeout spilled and
+#     retried by persist stage (shot data retained by board data and
+#     archive) rather than dropped
+_FT3_PIPELINE_INGEST_STAGES = {}
+_FT3_PIPELINE_INGEST_STAGES.update(reassemble = (4096, 'block'))
+_FT3_PIPELINE_INGEST_STAGES.update(decode     = (  16, 'block'))
+_FT3_PIPELINE_INGEST_STAGES.update(convert    = (  16, 'block'))
+_FT3_PIPELINE_INGEST_STAGES.update(publish    = (  16, 'block'))
+_FT3_PIPELINE_INGEST_STAGES.update(persist    = (  64, 'block'))
+
+# Ingest stages of shots (failed or dropped items are lost shots)
+_FT3_PIPELINE_INGEST_SHOT_STAGES = ('decode', 'convert', 'publish', 'persist')
+
+_FT3_PIPELINE_THREAD_NAME_PREFIX = lambda name: 'ft3-stage-' + name
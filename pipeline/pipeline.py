@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 staged pipeline with bounded queues
+"""
+import sys
+import time
+
+from collections import deque
+from enum import IntEnum,unique
+
+from threading import Thread, Condition
+
+import metrics.metrics as metrics
+import pipeline.config as cfgpl
+
+import util.util as util
+
+
+@unique
+class Policy(IntEnum):
+    block       = 0 # Producer blocks while queue full (back-pressure upstream)
+    drop_oldest = 1 # Oldest queued item dropped when full
+    drop_newest = 2 # Incoming item dropped when full
+
+
+class Stage(object):
+    def __init__(self, name, fn, maxlen=cfgpl._FT3_PIPELINE_QUEUE_MAX_LEN, policy=Policy.block, on_drop=None, verbose=util.VerboseLevel.info):
+        """Initialize pipeline stage
+           (bounded queue and worker thread per stage; fn result, if not
+            None, is passed to next stage; on_drop of items not queued,
+            returns True iff item retained, e.g. spilled for retry)
+        """
+        self.name = name
+        self.fn = fn
+        self.policy = policy
+        self.on_drop = on_drop
+        self.verbose = verbose
+
+        self.next = None # Downstream stage
+
+        self._maxlen = max(int(maxlen), 1)
+        self._queue = deque()
+        self._cv = Condition()
+        self._closed = False
+
+        self.wait = metrics.LatencyStats()    # Queue wait (put to start)
+        self.latency = metrics.LatencyStats() # Stage service time (start to done)
+
+        self.num_done = 0
+        self.num_failed = 0
+        self.num_dropped = 0 # Items dropped (not queued nor retained)
+
+        self.thread = Thread(target=self._work, name=cfgpl._FT3_PIPELINE_THREAD_NAME_PREFIX(name), daemon=True)
+        self.thread.start()
+
+    def put(self, item, timeout=cfgpl._FT3_PIPELINE_PUT_TIMEOUT_S):
+        """Queue item per stage back-pressure policy
+           (blocking policy waits at most timeout s)
+           Returns False if item not queued (closed, dropped, spilled or timeout)
+        """
+        _methodname = self.put.__name__
+
+        _queued,_dropped,_drop = True,False,None
+        with self._cv:
+            if self._closed:
+                return False
+
+            if len(self._queue) >= self._maxlen:
+                if self.policy == Policy.drop_newest:
+                    _queued,_dropped,_drop = False,True,item
+                elif self.policy == Policy.drop_oldest:
+                    _dropped,_drop = True,self._queue.popleft()[1]
+                else:
+                    ok = self._cv.wait_for(lambda: self._closed or len(self._queue) < self._maxlen,
+                                           timeout=timeout)
+                    if not ok or self._closed:
+                        _queued,_dropped,_drop = False,True,item
+                        if not ok and timeout and self.verbose >= util.VerboseLevel.error:
+                            util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                            print("stage {} queue full {:.2f}s, item not queued".format(self.name, timeout))
+                            sys.stdout.flush()
+
+            if _queued:
+                self._queue.append((time.perf_counter(), item))
+                self._cv.notify_all()
+
+        # NB: Drop callback outside lock (e.g. spill, logging)
+        if _dropped:
+            if not (self.on_drop is not None and self.on_drop(_drop)):
+                with self._cv:
+                    self.num_dropped += 1
+        return _queued
+
+    def put_nowait(self, item):
+        """Queue item without waiting (dropped, and counted, when full)
+           Returns False if item not queued
+        """
+        return self.put(item, timeout=0.0)
+
+    def close(self, drain=True, timeout=cfgpl._FT3_PIPELINE_CLOSE_TIMEOUT_S):
+        """Close stage, optionally processing queued items
+        """
+        with self._cv:
+            self._closed = True
+            if not drain:
+                self.num_dropped += len(self._queue)
+                self._queue.clear()
+            self._cv.notify_all()
+        self.thread.join(timeout)
+
+    @property
+    def depth(self):
+        """Get queue depth (items not yet started)
+        """
+        return len(self._queue)
+
+    def stats(self):
+        """Get stage metrics
+        """
+        return {'name'   : self.name,
+                'policy' : self.policy.name,
+                'maxlen' : self._maxlen,
+                'depth'  : len(self._queue),
+                'done'   : self.num_done,
+                'failed' : self.num_failed,
+                'dropped': self.num_dropped,
+                'wait'   : self.wait.summary(),
+                'latency': self.latency.summary()}
+
+    def _work(self):
+        """Stage worker thread
+        """
+        _methodname = self._work.__name__
+
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: self._closed or self._queue)
+                if not self._queue:
+                    return
+                t0,item = self._queue.popleft()
+                self._cv.notify_all()
+
+            t1 = time.perf_counter()
+            self.wait.add(t1 - t0)
+
+            try:
+                rv = self.fn(item)
+            except Exception as e:
+                rv = None
+                self.num_failed += 1
+                if self.verbose >= util.VerboseLevel.error:
+                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                    print("stage {} exception e {}".format(self.name, e))
+                    sys.stdout.flush()
+
+            self.num_done += 1
+            self.latency.add(time.perf_counter() - t1)
+
+            if rv is not None and self.next is not None:
+                self.next.put(rv)
+
+
+class FT3Pipeline(object):
+    def __init__(self, stages, config=None, on_drop=None, verbose=util.VerboseLevel.info):
+        """Initialize staged pipeline
+           (stages as ordered (name, fn) pairs, config of
+            (queue bound, policy name) and drop callbacks keyed by
+            stage name)
+        """
+        self.verbose = verbose
+
+        config = config if config is not None else {}
+        on_drop = on_drop if on_drop is not None else {}
+
+        self._stages = {}
+        _prev = None
+        for n,fn in stages:
+            maxlen,policy = config.get(n, (cfgpl._FT3_PIPELINE_QUEUE_MAX_LEN, Policy.block.name))
+            S = Stage(n, fn, maxlen=maxlen, policy=Policy[policy], on_drop=on_drop.get(n), verbose=verbose)
+            if _prev is not None:
+                _prev.next = S
+            self._stages[n] = _prev = S
+
+    def __getattr__(self, name):
+        _stages = self.__dict__.get('_stages', {})
+        if name in _stages:
+            return _stages[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, name):
+        return self._stages[name]
+
+    def __iter__(self):
+        return iter(self._stages.values())
+
+    def put(self, item):
+        """Queue item to first stage
+        """
+        return next(iter(self._stages.values())).put(item)
+
+    def put_nowait(self, item):
+        """Queue item to first stage without waiting (e.g. event loop)
+        """
+        return next(iter(self._stages.values())).put_nowait(item)
+
+    @property
+    def depth(self):
+        """Get queue depth of all stages
+        """
+        return sum(S.depth for S in self._stages.values())
+
+    def stats(self):
+        """Get metrics of all stages (keyed by stage name)
+        """
+        return {n: S.stats() for n,S in self._stages.items()}
+
+    def close(self, drain=True):
+        """Close pipeline, in stage order so drained items reach downstream stages
+        """
+        _methodname = self.close.__name__
+
+        for S in self._stages.values():
+            S.close(drain=drain)
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("pipeline closed")
+            sys.stdout.flush()
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"""
+
+# Named worker pools (workers per pool)
+# NB: Single-worker pools execute tasks in submission order. Per-shot
+#     parameter evaluation (calc) separate from recalculation and
+#     previews (compute), so lossless shot calculation never waits on
+#     a (long) recalculation
+_FT3_POOL_WORKERS = {}
+_FT3_POOL_WORKERS.update(ui = 2)
+_FT3_POOL_WORKERS.update(sql = 1)
+_FT3_POOL_WORKERS.update(alerts = 1)
+_FT3_POOL_WORKERS.update(compute = 1)
+_FT3_POOL_WORKERS.update(calc = 2)
+
+_FT3_POOL_THREAD_NAME_PREFIX = lambda name: 'ft3-' + name
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 named persistent worker pools
+"""
+import sys
+import time
+
+import concurrent.futures
+
+from threading import Lock
+
+import metrics.metrics as metrics
+import pool.config as cfgpool
+
+import util.util as util
+
+
+class FT3Pool(object):
+    def __init__(self, name, workers=1, verbose=util.VerboseLevel.info):
+        """Initialize named persistent worker pool
+           (queue-depth and task-latency metrics)
+        """
+        self.name = name
+        self.verbose = verbose
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(int(workers), 1),
+                                                               thread_name_prefix=cfgpool._FT3_POOL_THREAD_NAME_PREFIX(name))
+        self.workers = max(int(workers), 1)
+
+        self._pending = 0 # Submitted tasks not yet started
+        self._running = 0
+        self._latest = {} # Coalesced tasks keyed (None while running, see submit_latest)
+        self._mutex = Lock()
+
+        self.wait = metrics.LatencyStats()    # Queue wait (submit to start)
+        self.latency = metrics.LatencyStats() # Task latency (submit to done)
+
+        self.num_done = 0
+        self.num_failed = 0
+        self.num_coalesced = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit task to pool (returns future without waiting)
+        """
+        t0 = time.perf_counter()
+        with self._mutex:
+            self._pending += 1
+        try:
+            return self._executor.submit(self._run, t0, fn, *args, **kwargs)
+        except RuntimeError:
+            with self._mutex:
+                self._pending -= 1
+            raise
+
+    def submit_latest(self, key, fn, *args, **kwargs):
+        """Submit keyed task coalesced with pending task of key
+           (at most one pending or running task per key, pending task
+            replaced by newest, e.g. UI updates of slow sessions)
+           Returns True if task queued, False if coalesced
+        """
+        with self._mutex:
+            _busy = key in self._latest
+            self._latest[key] = (fn, args, kwargs)
+            if _busy:
+                self.num_coalesced += 1
+                return False
+        try:
+            self.submit(self._run_latest, key)
+        except RuntimeError:
+            with self._mutex:
+                self._latest.pop(key, None)
+            raise
+        return True
+
+    def shutdown(self, wait=True, cancel=False):
+        """Shut down pool, draining queued tasks unless canceled
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=cancel)
+
+    @property
+    def depth(self):
+        """Get queue depth (submitted tasks not yet started)
+        """
+        return self._pending
+
+    @property
+    def running(self):
+        return self._running
+
+    def stats(self):
+        """Get pool metrics
+        """
+        return {'name'   : self.name,
+                'workers': self.workers,
+                'depth'  : self._pending,
+                'running': self._running,
+                'done'   : self.num_done,
+                'failed' : self.num_failed,
+                'coalesced': self.num_coalesced,
+                'wait'   : self.wait.summary(),
+                'latency': self.latency.summary()}
+
+    def _run(self, t0, fn, *args, **kwargs):
+        """Run task, recording metrics
+        """
+        _methodname = self._run.__name__
+
+        t1 = time.perf_counter()
+        with self._mutex:
+            self._pending -= 1
+            self._running += 1
+        self.wait.add(t1 - t0)
+
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            self.num_failed += 1
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("pool {} task {} exception e {}".format(self.name, getattr(fn, '__name__', fn), e))
+                sys.stdout.flush()
+            raise
+        finally:
+            with self._mutex:
+                self._running -= 1
+            self.num_done += 1
+            self.latency.add(time.perf_counter() - t0)
+
+
+    def _run_latest(self, key):
+        """Run keyed task (and tasks of key submitted meanwhile)
+        """
+        _methodname = self._run_latest.__name__
+
+        while True:
+            with self._mutex:
+                fn,args,kwargs = self._latest[key]
+                self._latest[key] = None
+
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                self.num_failed += 1
+                if self.verbose >= util.VerboseLevel.error:
+                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                    print("pool {} task {} exception e {}".format(self.name, getattr(fn, '__name__', fn), e))
+                    sys.stdout.flush()
+
+            with self._mutex:
+                if self._latest[key] is None:
+                    del self._latest[key]
+                    return
+
+
+class FT3Pools(object):
+    def __init__(self, workers=cfgpool._FT3_POOL_WORKERS, verbose=util.VerboseLevel.info):
+        """Initialize named worker pools (ui, sql, alerts, compute, calc)
+        """
+        self.verbose = verbose
+        self._pools = {n: FT3Pool(n, w, verbose=verbose) for n,w in workers.items()}
+
+    def __getattr__(self, name):
+        _pools = self.__dict__.get('_pools', {})
+        if name in _pools:
+            return _pools[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, name):
+        return self._pools[name]
+
+    def __iter__(self):
+        return iter(self._pools.values())
+
+    def stats(self):
+        """Get metrics of all pools (keyed by pool name)
+        """
+        return {n: p.stats() for n,p in self._pools.items()}
+
+    def shutdown(self, wait=True, cancel=False):
+        """Shut down pools, draining queued tasks unless canceled
+        """
+        _methodname = self.shutdown.__name__
+
+        for p in self._pools.values():
+            p.shutdown(wait=wait, cancel=cancel)
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("worker pools shut down")
+            sys.stdout.flush()
@@ -5,15 +5,19 @@ ABSTRACT: Visi-Trak FasTrak3 web interface application
 """
 import sys
 
+import ipaddress
+
 from dataclasses import dataclass
+from functools import partial
 
 from bokeh.plotting import curdoc
-from bokeh.models import Toggle, Spacer, Div, Panel, Tabs
+from bokeh.models import Toggle, Select, Spacer, Div, Panel, Tabs
 
 from bokeh.layouts import row, column
 
 import machine.machine as machine
 import part.part as part
+import part.preview as ppreview
 
 import ad.ad as ad
 
@@ -22,9 +26,9 @@ import ref.ref as ref
 
 import state.state as state
 import alarm.alarm as alarm
-import alert.alert as alert
 
-import board.board as board
+import board.hub as hub
+import bus.bus as bus
 
 import server.uiprop as uips
 import tcpip.config as cfgt
@@ -34,40 +38,52 @@ import units.units as units
 
 @dataclass
 class Models:
+    board : Select
     stream: Toggle
+    conn  : Div
+    health: Div
     spacer: Spacer
     logo  : Div
 
 class Session():
-    def __init__(self, names=None, ips=None, unitsys=units.UnitSystem.bg, verbose=util.VerboseLevel.info):
+    def __init__(self, names=None, ips=None, unitsys=units.UnitSystem.bg, document=None, verbose=util.VerboseLevel.info):
         """Initialize FasTrak3 web interface application
-           (as a bokeh server session)
+           (as a bokeh server session, or of given document
+            e.g. headless benchmark sessions)
         """
         self.unitsys = unitsys
         self.verbose = verbose
 
+        self.stream = True # Session data stream (UI updates) enabled
+
         # Server session document
-        D = self.document = curdoc()
+        D = self.document = document if document is not None else curdoc()
         D.title = uips._FT3_SERVER_APP_TITLE
 
-        # TODO ... Vectorize to support multiple FasTrak3 boards per FasTrak3 web server
+        # Process-wide board hubs (shared by sessions, keyed by board IP)
+        # NB: One selected board per session, switched without reconnect
         if names is not None and ips is not None:
-            self.board = D.session_context.board = board.Board(session=self, name=names[0], ip=ips[0], unitsys=unitsys, verbose=verbose)
+            self.hubs = [hub.get(name=n, ip=ip, unitsys=unitsys, verbose=verbose) for n,ip in zip(names, ips)]
         else:
-            self.board = D.session_context.board = board.Board(session=self, unitsys=unitsys, verbose=verbose)
-
-        # TCP/IP heartbeat
-        self.heartbeat_cb = D.add_periodic_callback(callback=self.board.client._heartbeat,
-                                                    period_milliseconds=cfgt._FT3_TCPIP_HEARTBEAT_PERIOD_MS)
-
+            self.hubs = [hub.get(unitsys=unitsys, verbose=verbose)]
+        self.hub = self.hubs[0]
+        self.board = self.hub.board
+        if D.session_context is not None:
+            D.session_context.board = self.board
+
+        # Session machine and part settings (copies of board settings,
+        # applied to board by board.apply)
         self.machine = machine.Machine(session=self, verbose=verbose)
         self.part = part.Part(session=self, verbose=verbose)
+        self.machine.update(self.board.machine)
+        self.part.update(self.board.part)
+        self.preview = ppreview.Preview(session=self, verbose=verbose) # Part settings what-if preview
 
         self.shot  = shot.Shot(session=self, verbose=verbose)   # FasTrak3 shots
         self.ref   = ref.Ref(session=self, verbose=verbose)     # FasTrak3 reference shot
         self.state = state.State(session=self, verbose=verbose) # Alarm-states
         self.alarm = alarm.Alarm(session=self, verbose=verbose) # Alarm database
-        self.alert = alert.Alert(session=self, verbose=verbose) # E-mail/SMS alerts
+        self.alert = self.hub.alert                             # E-mail/SMS alerts (board hub)
 
         # Session UI models
         self._make_ui_models()
@@ -82,10 +98,14 @@ class Session():
         P = self.part.param
         P.layout()
 
-        _ch = [SS.models.layout, P.models.layout]
+        PP = self.preview
+        PP.layout()
+        PP.refresh()
+
+        _ch = [SS.models.layout, P.models.layout, PP.models.layout]
         _pl = [Panel(child=_ch[i], title=t) for i,t in enumerate(uips._FT3_SERVER_PANEL_TITLES)]
 
-        m0 = row(S.models.layout.ui_info, S.models.layout.ui_ref, self.models.stream)
+        m0 = row(S.models.layout.ui_info, S.models.layout.ui_ref, self.models.board, self.models.stream, self.models.conn, self.models.health)
         m1 = column(self.models.spacer, m0)
         m2 = self.models.logo
 
@@ -93,14 +113,87 @@ class Session():
         D.add_root(row(S.models.layout.ui_events, S.models.layout.ui_shot))
         D.add_root(Tabs(tabs=_pl))
 
-        # Activate board
+        # Subscribe to board
         # NB: Begins data flow to UIs
-        self.board.active = True
+        self._subscribe()
+
+        # Board connection health (periodic, document thread)
+        D.add_periodic_callback(self._health_cb, uips._FT3_SERVER_HEALTH_DIV_PERIOD_MS)
+
+    def select(self, ip):
+        """Select session board by board IP
+           (board hubs, i.e. connections and data stores, unchanged)
+        """
+        _methodname = self.select.__name__
+
+        _ip = ipaddress.ip_address(ip)
+        H = next((H for H in self.hubs if H.ip == _ip), None)
+        if H is None:
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("board IP {} is not a session board".format(ip))
+                sys.stdout.flush()
+            return
+        if H is self.hub:
+            return
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("select board {} ({})".format(H.board.name, H.ip))
+            sys.stdout.flush()
+
+        self.hub.unsubscribe(self)
+
+        self.hub = H
+        self.board = H.board
+        if self.document.session_context is not None:
+            self.document.session_context.board = self.board
+
+        # Board machine and part settings
+        self.machine.update(self.board.machine)
+        self.part.update(self.board.part)
+        self.state.param_limits_update()
+
+        # Board reference shot, alarm database and alerts
+        self.ref = ref.Ref(session=self, verbose=self.verbose)
+        self.alarm = alarm.Alarm(session=self, verbose=self.verbose)
+        self.alert = H.alert
+
+        # Newest shot of selected board
+        self.shot.sel_shot = None
+        self.state.uii.sel_shot = max(len(self.board.data.param.data) - 1, 0)
+
+        self._subscribe()
+        self.board._update_session(self)
+        self.preview.refresh()
+
+    def _subscribe(self):
+        """Subscribe to selected board (data and connection state)
+        """
+        self.hub.subscribe(self)
+
+        self._conn_sub = self.board.bus.subscribe(cfgt._FT3_TCPIP_CONN_TOPIC, self._conn_cb,
+                                                  policy=bus.Policy.latest)
+        if self.board.connection is not None:
+            self._conn_ui_cb(self.board.connection.state.name)
+        else:
+            self.models.conn.text = uips._FT3_SERVER_CONN_DIV_TEXT_NONE
 
     def _make_ui_models(self):
         """Make server UI models
         """
-        self.models = Models(stream=None, spacer=None, logo=None)
+        self.models = Models(board=None, stream=None, conn=None, health=None, spacer=None, logo=None)
+
+        _opts = [(str(H.ip), uips._FT3_SERVER_BOARD_SELECT_LABEL(H.board.name, H.ip)) for H in self.hubs]
+        bs = Select(options=_opts,
+                    value=str(self.hub.ip),
+                    disabled=len(self.hubs) < 2,
+                    width=uips._FT3_SERVER_BOARD_SELECT_PX_W,
+                    height=uips._FT3_SERVER_BOARD_SELECT_PX_H,
+                    margin=uips._FT3_SERVER_BOARD_SELECT_MARGIN,
+                    name=uips._FT3_SERVER_BOARD_SELECT_NAME)
+        bs.on_change('value', self._board_cb)
+        self.models.board = bs
 
         b = Toggle(label=uips._FT3_SERVER_STREAM_BUTTON_ACTIVE_LABEL,
                    button_type=uips._FT3_SERVER_STREAM_BUTTON_ACTIVE_TYPE,
@@ -112,6 +205,20 @@ class Session():
         b.on_click(self._stream_cb)
         self.models.stream = b
 
+        c = Div(text=uips._FT3_SERVER_CONN_DIV_TEXT_NONE,
+                width=uips._FT3_SERVER_CONN_DIV_PX_W,
+                height=uips._FT3_SERVER_CONN_DIV_PX_H,
+                margin=uips._FT3_SERVER_CONN_DIV_MARGIN,
+                name=uips._FT3_SERVER_CONN_DIV_NAME)
+        self.models.conn = c
+
+        t = Div(text="",
+                width=uips._FT3_SERVER_HEALTH_DIV_PX_W,
+                height=uips._FT3_SERVER_HEALTH_DIV_PX_H,
+                margin=uips._FT3_SERVER_HEALTH_DIV_MARGIN,
+                name=uips._FT3_SERVER_HEALTH_DIV_NAME)
+        self.models.health = t
+
         h = Spacer(width=uips._FT3_SERVER_BANNER_SPACER_PX_W,
                    height=uips._FT3_SERVER_BANNER_SPACER_PX_H,
                    margin=uips._FT3_SERVER_BANNER_SPACER_MARGIN,
@@ -135,11 +242,37 @@ class Session():
             print("data stream callback [{:}]".format(en))
             sys.stdout.flush()
 
+        # NB: Pauses this session's UI updates only (board data
+        #     acquisition shared by sessions continues)
+        self.stream = en
         if en:
-            self.board.active = True
             self.models.stream.label = uips._FT3_SERVER_STREAM_BUTTON_ACTIVE_LABEL
             self.models.stream.button_type = uips._FT3_SERVER_STREAM_BUTTON_ACTIVE_TYPE
         else:
-            self.board.active = False
             self.models.stream.label = uips._FT3_SERVER_STREAM_BUTTON_INACTIVE_LABEL
             self.models.stream.button_type = uips._FT3_SERVER_STREAM_BUTTON_INACTIVE_TYPE
+
+    def _board_cb(self, attr, old, new):
+        """Board selection callback
+        """
+        self.select(new)
+
+    def _conn_cb(self, ev):
+        """Board connection state-change callback
+           (bus dispatch thread, UI update deferred to document)
+        """
+        self.document.add_next_tick_callback(partial(self._conn_ui_cb, ev.state.name))
+
+    def _conn_ui_cb(self, state):
+        """Threadsafe board connection state UI update
+        """
+        # NB: Stale event of previously selected board
+        if self.board.connection is None or self.board.connection.state.name != state:
+            return
+        self.models.conn.text = uips._FT3_SERVER_CONN_DIV_TEXT(self.board.ip, state)
+
+    def _health_cb(self):
+        """Board connection health (telemetry) periodic UI update
+        """
+        if self.stream:
+            self.models.health.text = uips._FT3_SERVER_HEALTH_DIV_TEXT(self.hub.telemetry())
@@ -13,7 +13,7 @@ _FT3_SERVER_VERSION = _FT3_SERVER_VERSION_MAJOR + '.' + _FT3_SERVER_VERSION_MINO
 
 _FT3_SERVER_APP_TITLE = "Visi-Trak FasTrak3 Web Server" + " " + _FT3_SERVER_VERSION
 
-_FT3_SERVER_PANEL_TITLES = ["Alarm State", "Parameters"]
+_FT3_SERVER_PANEL_TITLES = ["Alarm State", "Parameters", "Part Preview"]
 
 
 _FT3_SERVER_STREAM_BUTTON_ACTIVE_SYMBOL   = "\N{BLACK RIGHT-POINTING TRIANGLE}"
@@ -31,6 +31,39 @@ _FT3_SERVER_STREAM_BUTTON_MARGIN = [30, 5, 5, 20]
 _FT3_SERVER_STREAM_BUTTON_NAME = "ft3_server_stream_button"
 
 
+_FT3_SERVER_BOARD_SELECT_LABEL = lambda name, ip: "{:} ({:})".format(name, ip)
+
+_FT3_SERVER_BOARD_SELECT_PX_W = 200
+_FT3_SERVER_BOARD_SELECT_PX_H = 30
+_FT3_SERVER_BOARD_SELECT_MARGIN = [30, 5, 5, 20]
+
+_FT3_SERVER_BOARD_SELECT_NAME = "ft3_server_board_select"
+
+
+_FT3_SERVER_CONN_DIV_TEXT = lambda ip, state: "<b>{:}</b> {:}".format(ip, state)
+_FT3_SERVER_CONN_DIV_TEXT_NONE = "local"
+
+_FT3_SERVER_CONN_DIV_PX_W = 200
+_FT3_SERVER_CONN_DIV_PX_H = 30
+_FT3_SERVER_CONN_DIV_MARGIN = [35, 5, 5, 20]
+
+_FT3_SERVER_CONN_DIV_NAME = "ft3_server_conn_div"
+
+
+_FT3_SERVER_HEALTH_DIV_TEXT = lambda t: ("RTT p50 {:.1f} p95 {:.1f} ms | rx {:.1f} kB/s {:.0f} frames/s<br>"
+                                         "{:.1f} packets/shot | {:d} reconnects | {:d} lost shots | last frame {:.1f} s").format(
+                                         t['rtt']['p50'], t['rtt']['p95'], t['rx_bytes_per_s'] / 1000.0, t['rx_frames_per_s'],
+                                         t['packets_per_shot']['mean'], t['reconnects'], t['lost_shots'], t['since_last_frame'])
+
+_FT3_SERVER_HEALTH_DIV_PERIOD_MS = 1000
+
+_FT3_SERVER_HEALTH_DIV_PX_W = 400
+_FT3_SERVER_HEALTH_DIV_PX_H = 40
+_FT3_SERVER_HEALTH_DIV_MARGIN = [30, 5, 5, 20]
+
+_FT3_SERVER_HEALTH_DIV_NAME = "ft3_server_health_div"
+
+
 _FT3_SERVER_BANNER_SPACER_PX_W = 100
 _FT3_SERVER_BANNER_SPACER_PX_H = 75
 _FT3_SERVER_BANNER_SPACER_MARGIN = [5, 5, 5, 5]
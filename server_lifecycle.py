@@ -20,6 +20,7 @@ import ipaddress
 
 import util.util as util
 import board.config as cfgb
+import board.hub as hub
 import data.config as cfgd
 
 
@@ -91,6 +92,9 @@ class FT3_Server(object):
                 print("")
                 sys.stdout.flush()
 
+            # Boards shared by sessions (board hub) simulated once per board
+            _boards = set()
+
             for i,ss in enumerate(self.server.sessions):
                 try:
                     # FasTrak3 board data reference
@@ -101,6 +105,10 @@ class FT3_Server(object):
                     if ipaddress.ip_address(B.ip) != cfgb._FT3_BOARD_IP_LOCALHOST:
                         continue
 
+                    if id(B) in _boards:
+                        continue
+                    _boards.add(id(B))
+
                 except Exception as e:
                     if self.verbose >= util.VerboseLevel.error:
                         util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -195,8 +203,8 @@ class FT3_Server(object):
                 # Simulated shot data (2)
                 Bd.shot += df
 
-                # SQL database
-                _cx.board.sql_write()
+                # SQL database (queued to board sql pool)
+                _cx.board.pools.sql.submit(_cx.board.sql_write, shot=s)
 
                 # Profile/debug
                 if self.verbose >= util.VerboseLevel.debug:
@@ -232,3 +240,9 @@ def on_session_created(session_context):
     """
     setattr(session_context, 'board', None)
     setattr(session_context, 'shot', 0)
+
+def on_session_destroyed(session_context):
+    """Finalize FasTrak3 web interface application server session
+       (unsubscribes session from shared board hubs)
+    """
+    hub.release(session_context)
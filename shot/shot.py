@@ -227,9 +227,7 @@ class Shot(object):
         # Active-shot metadata
         self.mutexes.meta.acquire()
         try:
-            data = Bd.meta.data
-            dfmeta = data[data.shot==ii]
-            dfmeta.reset_index(drop=True, inplace=True)
+            dfmeta = Bd.meta.get(ii)
             self.data.ui_meta = dfmeta
         except Exception as e:
             self.data.ui_meta = pd.DataFrame()
@@ -243,7 +241,7 @@ class Shot(object):
         # Active-shot shot data
         self.mutexes.shot.acquire()
         try:
-            data = Bd.shot.data[ii]
+            data = Bd.shot.get(ii)
             dfp = data[(data.type=='P')]
             dft = data[(data.type=='T')]
 
@@ -283,9 +281,7 @@ class Shot(object):
         # Active-shot events
         self.mutexes.events.acquire()
         try:
-            data = Bd.events.data
-            dfev = data[ii]
-            dfev.reset_index(drop=True, inplace=True)
+            dfev = Bd.events.get(ii)
             self.data.ui_events = dfev
         except Exception as e:
             self.data.ui_events = pd.DataFrame()
@@ -801,8 +797,7 @@ class Shot(object):
         # Selected-shot metadata
         self.mutexes.meta.acquire()
         try:
-            data = Bd.meta.data
-            _R._data.meta = data[data.shot==ii]
+            _R._data.meta = Bd.meta.get(ii)
         except Exception as e:
             if self.verbose >= util.VerboseLevel.error:
                 util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -813,8 +808,7 @@ class Shot(object):
         # Selected-shot shot data
         self.mutexes.shot.acquire()
         try:
-            data = Bd.shot.data
-            _R._data.shot = data[ii]
+            _R._data.shot = Bd.shot.get(ii)
         except Exception as e:
             if self.verbose >= util.VerboseLevel.error:
                 util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -825,8 +819,7 @@ class Shot(object):
         # Active-shot events
         self.mutexes.events.acquire()
         try:
-            data = Bd.events.data
-            _R._data.events = data[ii]
+            _R._data.events = Bd.events.get(ii)
         except Exception as e:
             if self.verbose >= util.VerboseLevel.error:
                 util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
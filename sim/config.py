@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"""
+import os
+
+from pathlib import Path
+import inspect
+
+import board.config as cfgb
+import tcpip.config as cfgt
+
+
+# Simulated shot (engineering-units trajectories)
+f = inspect.getfile(inspect.currentframe())
+_FT3_SIM_DATA_RELPATH = 'data'
+_FT3_SIM_DATA_ABSPATH = os.path.join(Path(f).resolve().parent, _FT3_SIM_DATA_RELPATH)
+
+_FT3_SIM_SHOT_FILENAME = 'sim_shot.pkl'
+
+# NB: Simulated shot position in native units of 1/20" pitch rod
+_FT3_SIM_ROD_PITCH = 1.0/20.0
+_FT3_SIM_VEL_MIN   = 1.0e-3 # Velocity of stationary rod (encoded quadrature count)
+
+
+# Board emulator
+_FT3_SIM_EMULATOR_PORT = cfgt._FT3_TCPIP_CLIENT_PORT_DEFAULT
+
+# NB: Emulated boards listen on distinct loopback addresses (not
+#     board localhost, i.e. served by board TCP/IP client)
+_FT3_SIM_EMULATOR_HOST = lambda i: '127.0.1.{:d}'.format(i+1)
+_FT3_SIM_EMULATOR_NAME = lambda i: cfgb._FT3_BOARD_NAME_PREFIX + ' Emulator ' + '{:03d}'.format(i+1)
+
+_FT3_SIM_EMULATOR_NUM_BOARDS = 1
+
+_FT3_SIM_EMULATOR_SHOT_RATE_HZ    = 1.00 # Shots per second (per board)
+_FT3_SIM_EMULATOR_SHOT_JITTER     = 0.10 # Fractional (+/-) shot period jitter
+_FT3_SIM_EMULATOR_PACKET_LOSS     = 0.00 # Probability of dropped shot-data packet
+
+_FT3_SIM_EMULATOR_BIN_ID = ord('B') # Async header frame byte (async bit set on send)
+
+_FT3_SIM_EMULATOR_SELECT_S = 0.05 # Command poll wait between shots
+_FT3_SIM_EMULATOR_BACKLOG  = 8
+
+_FT3_SIM_EMULATOR_EVENTS = []
+_FT3_SIM_EMULATOR_EVENTS += ["R:19 #Cycle start timeout"]
+_FT3_SIM_EMULATOR_EVENTS += ["R:20 #Cycle start detected!"]
+_FT3_SIM_EMULATOR_EVENTS += ["R_AXIS1_AUTO_NULL_SUCCESS:25 #-310"]
+_FT3_SIM_EMULATOR_EVENTS += ["RETRACT_VALVE_SET"]
+_FT3_SIM_EMULATOR_EVENTS += ["R_POS1EOS"]
+_FT3_SIM_EMULATOR_EVENTS += ["R_At home detected:27"]
+
+_FT3_SIM_EMULATOR_EVENTS_PROB = 0.50 # Probability of each event per shot
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 board emulator (binary TCP/IP protocol)
+"""
+import os
+import sys
+import time
+import struct
+import random
+
+import dill
+
+import numpy as np
+
+from threading import Thread, Event, Lock
+import select
+
+import socket
+
+import ad.config as cfgad
+import board.config as cfgb
+import tcpip.config as cfgt
+import tcpip.msgdata as msg
+import sim.config as cfgsim
+
+import util.util as util
+
+
+_Hs = struct.Struct(msg._FT3_TCPIP_ASYNC_HEADER_FORMAT)
+
+
+def load_shot(path=None):
+    """Load simulated shot (engineering-units trajectories)
+    """
+    f = path if path is not None else os.path.join(cfgsim._FT3_SIM_DATA_ABSPATH, cfgsim._FT3_SIM_SHOT_FILENAME)
+    with open(f, 'rb') as fid:
+        return dill.load(fid)
+
+def encode_shot(df):
+    """Encode simulated shot as position- and time- sampled
+       shot data records (inverse of Board.convert_ad)
+       NB: Default (unsigned) A/D calibration of pressure channels
+    """
+    _type = np.asarray(df['type'])
+    rec = np.zeros(len(df), dtype=msg._FT3_TCPIP_ASYNC_SHOT_DATA_DTYPE)
+
+    _ip = np.flatnonzero(_type == 'P')
+    _it = np.flatnonzero(_type == 'T')
+
+    # Time-sampled data timer continues from last position sample
+    _t = np.asarray(df['t'], dtype=np.float64).copy()
+    if len(_ip):
+        _t[_it] += _t[_ip[-1]]
+    rec['one_ms_timer'] = np.rint(_t).astype(np.uint32)
+
+    rec['position'] = np.rint(np.asarray(df['pos']) * 4.0 / cfgsim._FT3_SIM_ROD_PITCH).astype(np.int32)
+
+    # Quadrature clock counts between position samples
+    _vel = np.maximum(np.asarray(df['vel'], dtype=np.float64)[_ip], cfgsim._FT3_SIM_VEL_MIN)
+    _dq = np.rint(cfgb._FT3_BOARD_QUAD_COUNTS_PER_SEC * cfgsim._FT3_SIM_ROD_PITCH / _vel).astype(np.uint64)
+    _dq[0] = 0
+    rec['vel_count_q1'][_ip] = (np.cumsum(_dq) & 0xFFFFFFFF).astype(np.uint32)
+
+    for c,n,p0,pb in ((cfgad._FT3_AD_PRESSURE_HEAD_CHANNEL_DEFAULT, 'press_head',
+                       cfgad._FT3_AD_PRESSURE_HEAD_PSI_MIN_DEFAULT, cfgad._FT3_AD_PRESSURE_HEAD_PSI_PER_BIT),
+                      (cfgad._FT3_AD_PRESSURE_ROD_CHANNEL_DEFAULT, 'press_rod',
+                       cfgad._FT3_AD_PRESSURE_ROD_PSI_MIN_DEFAULT, cfgad._FT3_AD_PRESSURE_ROD_PSI_PER_BIT)):
+        _ad = np.rint((np.asarray(df[n], dtype=np.float64) - p0) / pb)
+        rec[cfgad._FT3_AD_CHANNEL_NAME(c)] = np.clip(_ad, 0, cfgad._FT3_AD_DATA_RESOLUTION - 1).astype(np.uint16)
+
+    rec['sample_num'][_ip] = np.arange(len(_ip))
+    rec['sample_num'][_it] = np.arange(len(_it))
+
+    return rec[_ip], rec[_it]
+
+def frame(type, data, dataset_num=0, packet_num=0, num_packets=1):
+    """Make async frame (header and data)
+    """
+    hdr = _Hs.pack(cfgsim._FT3_SIM_EMULATOR_BIN_ID | msg._FT3_TCPIP_ASYNC_BIT, type, 0,
+                   dataset_num & 0xFFFF, packet_num, num_packets, len(data))
+    return hdr + bytes(data)
+
+
+class Emulator(object):
+    def __init__(self, host=cfgsim._FT3_SIM_EMULATOR_HOST(0), port=cfgsim._FT3_SIM_EMULATOR_PORT, shot=None,
+                 rate=cfgsim._FT3_SIM_EMULATOR_SHOT_RATE_HZ,
+                 jitter=cfgsim._FT3_SIM_EMULATOR_SHOT_JITTER,
+                 loss=cfgsim._FT3_SIM_EMULATOR_PACKET_LOSS,
+                 verbose=util.VerboseLevel.info):
+        """Initialize FasTrak3 board emulator
+           (command/response and async shot data streamed to each
+            connected client at configured shot rate)
+        """
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+
+        self.rate = rate
+        self.jitter = jitter
+        self.loss = loss
+
+        _df = shot if shot is not None else load_shot()
+        self._recp,self._rect = encode_shot(_df)
+
+        self._socket = None
+        self._stop = Event()
+        self._threads = []
+
+        self.num_clients = 0
+        self.num_shots = 0
+        self.num_packets = 0
+        self.num_dropped = 0
+        self.num_commands = 0
+        self._mutex = Lock()
+
+    def start(self):
+        """Start listening (returns immediately)
+        """
+        _methodname = self.start.__name__
+
+        s = self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind((self.host, self.port))
+        s.listen(cfgsim._FT3_SIM_EMULATOR_BACKLOG)
+
+        t = Thread(target=self._accept, daemon=True)
+        t.start()
+        self._threads += [t]
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("emulator listening {}:{} [{:.2f} shots/s]".format(self.host, self.port, self.rate))
+            sys.stdout.flush()
+
+    def stop(self):
+        """Stop emulator (closing client connections)
+        """
+        self._stop.set()
+        if self._socket is not None:
+            self._socket.close()
+        for t in self._threads:
+            t.join(1.0)
+
+    def stats(self):
+        """Get emulator counters
+        """
+        return {'host'    : self.host,
+                'clients' : self.num_clients,
+                'shots'   : self.num_shots,
+                'packets' : self.num_packets,
+                'dropped' : self.num_dropped,
+                'commands': self.num_commands}
+
+    def shot_frames(self, shot):
+        """Make async frames of shot (shot data, events, shot complete)
+           Returns frames (bytes) and dropped packet count
+           NB: Shot-data packets full length but final packet (as
+               board), i.e. samples split across packets
+        """
+        b = []
+        n = 0
+        _L = msg._FT3_TCPIP_ASYNC_DATA_LEN
+        for _type,_rec in ((msg.AsyncDataType.shot_pos, self._recp),
+                           (msg.AsyncDataType.shot_time, self._rect)):
+            _mv = memoryview(_rec.tobytes())
+            _num = max(-(-len(_mv) // _L), 1)
+            for k in range(_num):
+                if self.loss and random.random() < self.loss:
+                    n += 1
+                    continue
+                b += [frame(_type, _mv[k*_L:(k+1)*_L], dataset_num=shot,
+                            packet_num=k + cfgt._FT3_TCPIP_ASYNC_PACKET_NUM_BASE, num_packets=_num)]
+
+        for e in cfgsim._FT3_SIM_EMULATOR_EVENTS:
+            if random.random() < cfgsim._FT3_SIM_EMULATOR_EVENTS_PROB:
+                b += [frame(msg.AsyncDataType.string, e.encode())]
+
+        b += [frame(msg.AsyncDataType.shot_comp, b'', dataset_num=shot)]
+        return b, n
+
+    def _accept(self):
+        """Accept client connections (one thread per client)
+        """
+        _methodname = self._accept.__name__
+
+        while not self._stop.is_set():
+            try:
+                c,addr = self._socket.accept()
+            except OSError:
+                return
+
+            if self.verbose >= util.VerboseLevel.info:
+                util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+                print("emulator {} client {}:{}".format(self.host, addr[0], addr[1]))
+                sys.stdout.flush()
+
+            t = Thread(target=self._serve, args=(c,), daemon=True)
+            t.start()
+            self._threads += [t]
+
+    def _serve(self, c):
+        """Serve client (command responses and paced shot stream)
+        """
+        _methodname = self._serve.__name__
+
+        with self._mutex:
+            self.num_clients += 1
+
+        cmd = b''
+        shot = 0
+        t_next = time.perf_counter() + self._period()
+        try:
+            while not self._stop.is_set():
+                # Commands until next shot
+                dt = min(max(t_next - time.perf_counter(), 0.0), cfgsim._FT3_SIM_EMULATOR_SELECT_S)
+                r,_,_ = select.select([c], [], [], dt)
+                if r:
+                    b = c.recv(msg._FT3_TCPIP_RESP_LEN)
+                    if not b:
+                        break
+                    cmd += b
+                    while b'\r' in cmd:
+                        m,cmd = cmd.split(b'\r', 1)
+                        c.sendall(self._response(m))
+
+                if time.perf_counter() < t_next:
+                    continue
+
+                # NB: Shots behind schedule sent without delay (catch up)
+                shot += 1
+                b,n = self.shot_frames(shot)
+                c.sendall(b''.join(b))
+                t_next += self._period()
+
+                with self._mutex:
+                    self.num_shots += 1
+                    self.num_packets += len(b)
+                    self.num_dropped += n
+        except OSError as e:
+            if self.verbose >= util.VerboseLevel.warn:
+                util._FT3_UTIL_VERBOSE_WARN_WITH_TS(_methodname)
+                print("emulator {} client e {}".format(self.host, e))
+                sys.stdout.flush()
+        finally:
+            c.close()
+            with self._mutex:
+                self.num_clients -= 1
+
+    def _response(self, m):
+        """Command response frame (command echo, fixed length)
+        """
+        with self._mutex:
+            self.num_commands += 1
+        return (m + b'\r')[:msg._FT3_TCPIP_RESP_LEN].ljust(msg._FT3_TCPIP_RESP_LEN, b'\0')
+
+    def _period(self):
+        """Jittered shot period
+        """
+        return (1.0 + self.jitter * random.uniform(-1.0, 1.0)) / self.rate
+
+
+class Emulators(object):
+    def __init__(self, num=cfgsim._FT3_SIM_EMULATOR_NUM_BOARDS, verbose=util.VerboseLevel.info, **kwargs):
+        """Initialize emulated boards
+           (one emulator per loopback address, shot shared)
+        """
+        kwargs.setdefault('shot', load_shot())
+        self.emulators = [Emulator(host=cfgsim._FT3_SIM_EMULATOR_HOST(i), verbose=verbose, **kwargs) for i in range(num)]
+
+    def __iter__(self):
+        return iter(self.emulators)
+
+    def start(self):
+        for E in self.emulators:
+            E.start()
+
+    def stop(self):
+        for E in self.emulators:
+            E.stop()
+
+    def stats(self):
+        return [E.stats() for E in self.emulators]
+
+
+if __name__ == '__main__':
+    # Usage: python -m sim.emulator [boards [shots/s]]
+    _num = int(sys.argv[1]) if len(sys.argv) > 1 else cfgsim._FT3_SIM_EMULATOR_NUM_BOARDS
+    _rate = float(sys.argv[2]) if len(sys.argv) > 2 else cfgsim._FT3_SIM_EMULATOR_SHOT_RATE_HZ
+
+    E = Emulators(num=_num, rate=_rate)
+    E.start()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        E.stop()
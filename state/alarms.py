@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 board alarm-state classification and alerts
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from threading import Lock
+
+import state.config as cfgss
+import state.data as datas
+
+import param.tuning as tuning
+import param.config as cfgp
+
+import data.ring as ring
+import data.config as cfgd
+
+import metrics.metrics as metrics
+import metrics.config as cfgm
+
+import util.util as util
+
+
+# NB: Alarm states are classified incrementally (appended shots only),
+#     and reclassified in full only if limits (i.e. bin edges) change,
+#     parameters are replaced (e.g. recalculated), or shots are
+#     otherwise discontiguous. Alerts are pushed once per newly
+#     classified shot (never on reclassification)
+
+
+class AlarmStates(object):
+    def __init__(self, board, alert=None, verbose=util.VerboseLevel.info):
+        """Initialize board alarm states
+           (derived parameters of every shot classified by board part
+            limits, independent of sessions, see board.hub)
+        """
+        self.board = board
+        self.alert = alert
+        self.verbose = verbose
+
+        self.unitsys = board.unitsys
+
+        self._src = None        # Classified derived parameters accessor
+        self._generation = None # Classified derived parameters generation
+        self._edges = None      # Classification bin edges (parameters x 4)
+        self._shot = None       # Newest shot evaluated for alerts
+
+        self.data = ring.FT3RingBuffer(columns=cfgd._FT3_DATA_PARAM_DATAFRAME_VARIABLES,
+                                       maxlen=1, key_column=None)
+
+        self._mutex = Lock()
+
+    def __len__(self):
+        return len(self.data)
+
+    def update(self):
+        """Classify alarm states of board derived parameters, pushing
+           alerts of low/high alarms of newly classified shots
+        """
+        _methodname = self.update.__name__
+
+        _A = self.board.data.param
+        _L = self.board.part.param.data.limits_wires
+
+        with self._mutex:
+            with metrics.timer(cfgm._FT3_METRICS_CLASSIFY):
+                # Classification bin edges (engineering units)
+                _e = tuning.edges((_L.limit_alarm_low.to_numpy(), _L.limit_warn_low.to_numpy(),
+                                   _L.limit_warn_high.to_numpy(), _L.limit_alarm_high.to_numpy()))
+
+                if _A is not self._src or _A.generation != self._generation or not np.array_equal(_e, self._edges):
+                    self._classify(_A, _e)
+                elif len(_A) and not self._append(_A):
+                    self._classify(_A, _e)
+
+            _err = self._alarms()
+
+        # E-mail/SMS alerts
+        if _err and self.alert is not None:
+            try:
+                for e in _err:
+                    self.board.pools.alerts.submit(self.alert.push, e)
+            except Exception as e:
+                if self.verbose >= util.VerboseLevel.error:
+                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                    print("email/SMS exception e {:}".format(e))
+                    sys.stdout.flush()
+
+    def states(self, start=0, stop=None):
+        """Get alarm states (uint8, shots x parameters) of classified
+           shots [start,stop)
+        """
+        with self._mutex:
+            return self._states(self.data.view(start, stop))
+
+    def _classify(self, A, e):
+        """Classify alarm states of all retained shots of derived
+           parameters accessor A (bin edges e)
+        """
+        V = A.view()
+        S = self.data
+        if S.capacity != A.capacity:
+            S = self.data = ring.FT3RingBuffer(columns=cfgd._FT3_DATA_PARAM_DATAFRAME_VARIABLES,
+                                               maxlen=A.capacity, key_column=None)
+        S.clear()
+        if len(A):
+            S.append(self._frame(V, e))
+
+        self._src, self._generation, self._edges = A, A.generation, e
+
+    def _append(self, A):
+        """Classify alarm states of shots appended to derived parameters
+           accessor A since last classified shot
+           Returns False if classified shots not contiguous with A
+        """
+        S = self.data
+        _k = cfgss._FT3_ALARM_STATE_SHOT_VARIABLE
+
+        if len(S):
+            V = A.range(S.view(-1)[_k][0] + 1, np.inf)
+        else:
+            V = A.view()
+
+        if len(V[_k]):
+            S.append(self._frame(V, self._edges))
+
+        # Classified shots consistency (same retained rows)
+        return len(S) == len(A) and S.view(0, 1)[_k][0] == A.view(0, 1)[_k][0] and \
+               S.view(-1)[_k][0] == A.view(-1)[_k][0]
+
+    def _alarms(self):
+        """Alert messages (one per shot) of low/high alarms of shots
+           classified since last evaluated shot (newest shot only, if
+           none evaluated)
+        """
+        S = self.data
+        if not len(S):
+            return []
+
+        _k = cfgss._FT3_ALARM_STATE_SHOT_VARIABLE
+        V = S.view(-1) if self._shot is None else S.view()
+        _s = V[_k]
+        _ii = np.flatnonzero(_s > self._shot) if self._shot is not None else np.arange(len(_s))
+        if not len(_ii):
+            return []
+        self._shot = _s[_ii[-1]]
+
+        _cat = self._states(V)[_ii]
+        rv = []
+        for s,c in zip(_s[_ii], _cat):
+            _errL = ['<{:}>: low alarm'.format(cfgp._FT3_ALARM_PARAMETER_DESCR[i]) for i in np.flatnonzero(c == datas.AlarmState.alarm_low)]
+            _errH = ['<{:}>: high alarm'.format(cfgp._FT3_ALARM_PARAMETER_DESCR[i]) for i in np.flatnonzero(c == datas.AlarmState.alarm_high)]
+            if _errL or _errH:
+                rv += [['Shot      : {:}'.format(s)] + _errL + _errH]
+        return rv
+
+    def _frame(self, V, e):
+        """Alarm-state dataframe of derived-parameter column arrays V
+           (bin edges e)
+        """
+        _Eu = cfgp._FT3_ALARM_PARAMETER_UNIT_CONVERSIONS[:,self.unitsys]
+        _x = np.column_stack([V[n] for n in cfgp._FT3_ALARM_PARAMETER_NAMES]) * _Eu
+        _c = tuning.classify(_x, e)
+
+        rv = {cfgss._FT3_ALARM_STATE_SHOT_VARIABLE: V[cfgss._FT3_ALARM_STATE_SHOT_VARIABLE]}
+        rv.update({n: _c[:,i] for i,n in enumerate(cfgp._FT3_ALARM_PARAMETER_NAMES)})
+        return pd.DataFrame(rv)
+
+    def _states(self, V):
+        """Alarm states (uint8, shots x parameters) of alarm-state
+           column arrays V
+        """
+        return np.column_stack([V[n] for n in cfgp._FT3_ALARM_PARAMETER_NAMES]).astype(np.uint8)
@@ -23,7 +23,6 @@ from bokeh.plotting import figure
 from bokeh.layouts import row, column
 
 import state.config as cfgss
-import state.data as datas
 import state.uiprop as uipss
 
 import param.config as cfgp
@@ -45,8 +44,6 @@ class UIIndexes:
 class Data:
     """Data for UIs
     """
-    alarm_state : pd.DataFrame
-    alarm_hist  : pd.Series
     ui_sel_state: pd.DataFrame
     ui_sel_param: pd.DataFrame
     ui_shot_info: pd.DataFrame
@@ -81,9 +78,10 @@ class State(object):
 
         self.unitsys = session.unitsys
 
-        self.data = Data(alarm_state=pd.DataFrame(),
-                         alarm_hist=pd.Series(),
-                         ui_sel_state=pd.DataFrame(),
+        # Alarm-state colors lookup table
+        self._cmap = np.array(uipss._FT3_ALARM_STATE_STATUS_RECT_COLOR_MAP)
+
+        self.data = Data(ui_sel_state=pd.DataFrame(),
                          ui_sel_param=pd.DataFrame(),
                          ui_shot_info=pd.DataFrame())
 
@@ -138,92 +136,23 @@ class State(object):
             print("alarm state data, sources, and UIs (init={})".format(init))
             sys.stdout.flush()
 
-        # Shot parameter data
-        _spdf = self.session.board.data.param.data
-
-        _s = _spdf.shot.copy()
-        _S = _spdf.drop(columns=cfgss._FT3_ALARM_STATE_SHOT_VARIABLE)
-
-        _P = self.session.part.param
-        _L = _P.data.limits_wires
-
-        # Machine resolution (to guarantee unique bin edges for alarm-state classification)
-        _res = cfgss._FT3_ALARM_STATE_RESOLUTION
-        _resh = cfgss._FT3_ALARM_STATE_RESOLUTION_H
-
-        # Engineering units conversions
-        _Eu = cfgp._FT3_ALARM_PARAMETER_UNIT_CONVERSIONS[:,self.unitsys]
-
-
         # Profile/debug
         if self.verbose >= util.VerboseLevel.profile:
             t0 = util._FT3_UTIL_NOW_TS()
 
-        
-        lbls = ["alarm_low","warn_low","none","warn_high","alarm_high"]
-        p = []
-        for i in range(_P.num):
-            lw = _L.loc[i]
-            bins = [-np.inf,lw.limit_alarm_low-_res,lw.limit_warn_low-_resh,lw.limit_warn_high+_resh,lw.limit_alarm_high+_res,np.inf]
-            p += [pd.cut(_S.iloc[:,i] * _Eu[i], bins=bins, labels=lbls, precision=cfgss._FT3_ALARM_STATE_PRECISION)]
-
-
-        # Profile/debug
-        if self.verbose >= util.VerboseLevel.profile:
-            tf = util._FT3_UTIL_NOW_TS()
-            util._FT3_UTIL_VERBOSE_PROFILE_WITH_TS(_methodname)
-            print("alarm-parameter classification profile {:.3f}s".format((tf-t0).total_seconds()))
-            sys.stdout.flush()
-            t1 = tf
-
-
-        _alarm_state = pd.concat(p, axis=1)
-        _alarm_state = _alarm_state.replace(cfgss._FT3_ALARM_STATE_MAP, inplace=False)
 
-        # E-mail/SMS alerts
-        try:
-            if not _alarm_state.empty:
-                _cat = _alarm_state.iloc[-1].values
-                _oobL = _cat == datas.AlarmState.alarm_low
-                _oobH = _cat == datas.AlarmState.alarm_high
-
-                _errL = ['<{:}>: low alarm'.format(cfgp._FT3_ALARM_PARAMETER_DESCR[i]) for i in range(_P.num) if _oobL[i]]
-                _errH = ['<{:}>: high alarm'.format(cfgp._FT3_ALARM_PARAMETER_DESCR[i]) for i in range(_P.num) if _oobH[i]]
-                _err = _errL + _errH
-
-                if _err:
-                    self.session.alert.push(_err)
-        except Exception as e:
-            if self.verbose >= util.VerboseLevel.error:
-                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                print("email/SMS exception e {:}".format(e))
-                print("")
-                sys.stdout.flush()
-
-        # Alarm state, all shots
-        cmap = uipss._FT3_ALARM_STATE_STATUS_RECT_COLOR_MAP
-        _c = list(map(lambda x: cmap[x], _alarm_state.values.flatten()))
-        _c += [uipss._FT3_ALARM_STATE_STATUS_RECT_COLOR_EMPTY] * (uipss._FT3_ALARM_STATE_STATUS_PLOT_NUMEL - len(_c))
-        c = pd.Series(data=_c, name="color")
+        # Board alarm states (classified and alerted by board hub)
+        self.session.hub.state.update()
 
 
         # Profile/debug
         if self.verbose >= util.VerboseLevel.profile:
             tf = util._FT3_UTIL_NOW_TS()
             util._FT3_UTIL_VERBOSE_PROFILE_WITH_TS(_methodname)
-            print("alarm-state buildup profile            {:.3f}s".format((tf-t1).total_seconds()))
+            print("alarm-parameter classification profile {:.3f}s".format((tf-t0).total_seconds()))
             sys.stdout.flush()
             t1 = tf
 
-
-        uiid = pd.Series(data=_s.index, name="uiid").repeat(10).reset_index(drop=True)
-        shot = _s.repeat(cfgp._FT3_ALARM_PARAMETERS_NUM).reset_index(drop=True)
-        _alarm_hist = pd.concat((uiid,shot,c), axis=1)
-
-        # Alarm state data
-        self.data.alarm_state = pd.concat((_s,_alarm_state), axis=1)
-        self.data.alarm_hist = _alarm_hist
-
         if init:
             # Alarm state, UI shot window view
             _x,_y = np.meshgrid(range(0,uipss._FT3_ALARM_STATE_STATUS_PLOT_ROWS),
@@ -231,9 +160,12 @@ class State(object):
             x = pd.Series(data=_x.flatten(order='C'), name="parameter")
             y = pd.Series(data=_y.flatten(order='C'), name="shot")
 
-            _alarm_view = pd.concat(
-                              (x,y,c[-(uipss._FT3_ALARM_STATE_STATUS_PLOT_NUMEL):].reset_index(drop=True)),
-                              axis=1)
+            # Alarm state, last shots
+            _c = self._colors(-(uipss._FT3_ALARM_STATE_STATUS_PLOT_COLS)).tolist()
+            _c += [uipss._FT3_ALARM_STATE_STATUS_RECT_COLOR_EMPTY] * (uipss._FT3_ALARM_STATE_STATUS_PLOT_NUMEL - len(_c))
+            c = pd.Series(data=_c, name="color")
+
+            _alarm_view = pd.concat((x,y,c), axis=1)
             self.sources.alarm_view = ColumnDataSource(_alarm_view)
         else:
             # Schedule UI updates
@@ -246,12 +178,18 @@ class State(object):
         if self.verbose >= util.VerboseLevel.profile:
             tf = util._FT3_UTIL_NOW_TS()
             util._FT3_UTIL_VERBOSE_PROFILE_WITH_TS(_methodname)
-            print("alarm history and cb scheduler profile {:.3f}s".format((tf-t1).total_seconds()))
+            print("alarm-state cb scheduler profile       {:.3f}s".format((tf-t1).total_seconds()))
             util._FT3_UTIL_VERBOSE_PROFILE_WITH_TS(_methodname)
             print("state-module total profile             {:.3f}s".format((tf-t0).total_seconds()))
             print("")
             sys.stdout.flush()
 
+    def _colors(self, start=0, stop=None):
+        """Alarm-state colors of classified shots [start,stop)
+           (flattened shot-major)
+        """
+        return self._cmap[self.session.hub.state.states(start, stop)].ravel()
+
     @gen.coroutine
     def _threadsafe_update_cb(self):
         """Threadsafe alarm-state callback
@@ -610,15 +548,14 @@ class State(object):
         V = _S.values[s] * cfgp._FT3_ALARM_PARAMETER_UNIT_CONVERSIONS[:,self.unitsys]
         p_data = [uipss._FT3_ALARM_STATE_ACTIVE_SHOT_PARAM_DATA_LABELSET_FORMAT.format(v) for v in V]
 
-        A = self.data.alarm_hist
-        p_color = list(A.color[A.uiid == s])
+        p_color = self._colors(s, s + 1).tolist()
 
         s = self.sources.ui_sel_param
         s.patch({"p_data": [(slice(cfgp._FT3_ALARM_PARAMETERS_NUM), p_data)],
                  "p_color": [(slice(cfgp._FT3_ALARM_PARAMETERS_NUM), p_color)]})
 
         # Alarm state UI window
-        c = A.color[(A.uiid >= self.uii.min_shot) & (A.uiid <= self.uii.max_shot)]
+        c = self._colors(self.uii.min_shot, self.uii.max_shot + 1).tolist()
         self.sources.alarm_view.patch({"color": [(slice(len(c)),c)]})
 
         # Active shot selector
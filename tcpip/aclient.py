@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 asyncio TCP/IP client
+"""
+import sys
+import time
+
+import asyncio
+from collections import deque
+from functools import partial
+from threading import Thread, Lock
+
+import ipaddress
+
+import tcpip.config as cfgt
+import tcpip.msgdata as msg
+import tcpip.callbacks as cb
+import tcpip.reader as reader
+import tcpip.capture as capture
+import tcpip.telemetry as telemetry
+import tcpip.connection as connection
+
+import util.util as util
+
+
+class _Protocol(asyncio.Protocol):
+    def __init__(self, client):
+        """Initialize FasTrak3 asyncio protocol (forwards to client)
+        """
+        self.client = client
+
+    def connection_made(self, transport):
+        self.client._connection_made(transport)
+
+    def data_received(self, data):
+        self.client._data_received(data)
+
+    def connection_lost(self, exc):
+        self.client._connection_lost(exc)
+
+
+class AsyncClient(object):
+    def __init__(self, board=None, ip=None, port=cfgt._FT3_TCPIP_CLIENT_PORT_DEFAULT, verbose=util.VerboseLevel.info):
+        """Initialize FasTrak3 asyncio TCP/IP client
+           (many clients per event loop, see EventLoop)
+        """
+        self.board = board # FasTrak3 board reference
+
+        self.ip = ipaddress.ip_address(ip if ip is not None else board.ip)
+        self.port = port
+
+        self._verbose = verbose
+
+        self._loop = None
+        self._transport = None
+        self._reader = reader.FrameReader()
+
+        # Wire capture (optional, see tcpip.capture)
+        self.capture = None
+
+        # Connection health (see tcpip.telemetry)
+        self.telemetry = telemetry.Telemetry()
+
+        # Connection manager (see AsyncConnectionManager), time of last received data
+        self.connection = None
+        self.last_rx = time.monotonic()
+        self.num_late = 0 # Late responses of timed-out requests (dropped)
+
+        self._pending = deque() # Response futures (FIFO)
+        self._expired = set()   # Response futures of timed-out requests (response not yet received)
+        self._frames = None     # Async frames queue (iteration)
+
+        # NB: No supervisor thread (connection served by event loop)
+        self.super_thread = None
+        self.heartbeat_task = None
+
+        # NB: Receive callback runs in event loop (never blocks)
+        self.cb = cb.Callbacks(board=board, nowait=True, verbose=verbose) if board is not None else None
+
+    def __aiter__(self):
+        return self.frames()
+
+    async def connect(self, retry=cfgt._FT3_TCPIP_CLIENT_CONNECT_RETRY_NUM, delay=cfgt._FT3_TCPIP_CLIENT_CONNECT_RETRY_S):
+        """Connect to host
+           Returns True iff connected
+        """
+        _methodname = self.connect.__name__
+
+        self._loop = asyncio.get_running_loop()
+
+        while retry:
+            try:
+                await asyncio.wait_for(self._loop.create_connection(lambda: _Protocol(self), str(self.ip), self.port),
+                                       timeout=cfgt._FT3_TCPIP_ACLIENT_CONNECT_TIMEOUT_S)
+                return True
+            except (OSError, asyncio.TimeoutError) as e:
+                retry -= 1
+                if self._verbose >= util.VerboseLevel.error:
+                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                    print("connect {} exception e {}".format(self.ip, e))
+                    sys.stdout.flush()
+                await asyncio.sleep(delay)
+
+        return False
+
+    async def send(self, m):
+        """Send message
+        """
+        _methodname = self.send.__name__
+
+        if self._transport is None:
+            raise ConnectionError("FasTrak3 {} not connected".format(self.ip))
+
+        if self._verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("send data (N={:5d}) to {}:{}".format(len(m), self.ip, self.port))
+            sys.stdout.flush()
+
+        b = m.encode() if isinstance(m, str) else bytes(m)
+        self._transport.write(b)
+
+        if self.capture is not None:
+            self.capture.write(capture.Direction.tx, b)
+
+        if self.cb is not None and self.cb.fcn.send_cmd is not None:
+            self.cb.fcn.send_cmd(msg.CmdData(data=b))
+
+    async def request(self, m, timeout=cfgt._FT3_TCPIP_ACLIENT_REQUEST_TIMEOUT_S):
+        """Send command and await its response
+           NB: Responses resolve requests in FIFO order, so a timed-out
+               request slot expires and consumes (discards) its late
+               response. Connection reset iff late response not received
+               within grace (response lost, later responses otherwise
+               resolve wrong requests)
+        """
+        _loop = asyncio.get_running_loop()
+        fut = _loop.create_future()
+        self._pending.append(fut)
+        try:
+            await self.send(m)
+        except Exception:
+            self._pending.remove(fut)
+            raise
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            if fut in self._pending:
+                self._expired.add(fut)
+                _loop.call_later(cfgt._FT3_TCPIP_ACLIENT_LATE_RESPONSE_S, self._lost, fut)
+            raise
+
+    async def frames(self):
+        """Iterate over received async frames (copies)
+        """
+        if self._frames is None:
+            self._frames = deque(maxlen=cfgt._FT3_TCPIP_ACLIENT_FRAMES_MAX_LEN)
+            self._frames_ev = asyncio.Event()
+
+        while True:
+            while not self._frames:
+                self._frames_ev.clear()
+                await self._frames_ev.wait()
+            m = self._frames.popleft()
+            if m is None:
+                return
+            yield m
+
+    async def heartbeat(self, period=cfgt._FT3_TCPIP_HEARTBEAT_PERIOD_MS / 1000.0):
+        """FasTrak3 TCP/IP heartbeat (echo-request) periodic transmit
+        """
+        _methodname = self.heartbeat.__name__
+
+        while True:
+            await asyncio.sleep(period)
+            # NB: Heartbeat response consumes its request future (FIFO), RTT
+            #     recorded on response (or failure on timeout)
+            try:
+                fut = asyncio.ensure_future(self.request(cfgt._FT3_TCPIP_HEARTBEAT_MSG))
+                fut.add_done_callback(partial(self.telemetry.heartbeat, time.perf_counter()))
+            except Exception as e:
+                if self._verbose >= util.VerboseLevel.error:
+                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                    print("TCP/IP heartbeat transmit exception e {}".format(e))
+                    sys.stdout.flush()
+
+    def close(self):
+        """Close FasTrak3 TCP/IP client (threadsafe)
+           NB: Connection manager stopped first (no reconnect on close)
+        """
+        if self.connection is not None:
+            self.connection.stop()
+        if self._loop is not None and self.heartbeat_task is not None:
+            self._loop.call_soon_threadsafe(self.heartbeat_task.cancel)
+        if self._loop is not None and self._transport is not None:
+            self._loop.call_soon_threadsafe(self._transport.close)
+        if self.capture is not None:
+            self.capture.close()
+
+    def reset(self):
+        """Reset FasTrak3 TCP/IP client (threadsafe)
+           (Close connection, reconnected by connection manager)
+        """
+        _methodname = self.reset.__name__
+
+        if self._verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("connection {} reset".format(self.ip))
+            sys.stdout.flush()
+
+        if self._loop is not None and self._transport is not None:
+            self._loop.call_soon_threadsafe(self._transport.close)
+
+    @property
+    def connected(self):
+        return self._transport is not None
+
+    @property
+    def verbose(self):
+        return self._verbose
+
+    @verbose.setter
+    def verbose(self, val):
+        self._verbose = val
+
+    def _connection_made(self, transport):
+        _methodname = self._connection_made.__name__
+
+        self._transport = transport
+        self._reader.clear()
+        self.telemetry.connected()
+
+        if self._verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("socket server {}:{}".format(self.ip, self.port))
+            sys.stdout.flush()
+
+    def _data_received(self, data):
+        """Dispatch complete frames of received data
+        """
+        if self.capture is not None:
+            self.capture.write(capture.Direction.rx, data)
+
+        self.last_rx = time.monotonic()
+        self.telemetry.rx(len(data))
+        if self.connection is not None:
+            self.connection.alive()
+        self._reader.feed(data)
+
+        for hdr,rv in self._reader.frames():
+            self.telemetry.frame(hdr)
+            if hdr is None:
+                _m = msg.RespData(data=bytes(rv))
+                if self._pending:
+                    # NB: Late response of expired (timed-out) request dropped
+                    fut = self._pending.popleft()
+                    if fut in self._expired:
+                        self._expired.discard(fut)
+                        self.num_late += 1
+                    elif not fut.done():
+                        fut.set_result(_m)
+                if self.cb is not None and self.cb.fcn.recv_resp is not None:
+                    self.cb.fcn.recv_resp(_m)
+            else:
+                if self.cb is not None and self.cb.fcn.recv_async is not None:
+                    self.cb.fcn.recv_async(msg.AsyncData(header=hdr, data=rv))
+                if self._frames is not None:
+                    self._put(msg.AsyncData(header=hdr, data=bytes(rv)))
+
+    def _connection_lost(self, exc):
+        _methodname = self._connection_lost.__name__
+
+        self._transport = None
+
+        if self._verbose >= util.VerboseLevel.error:
+            util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+            print("connection {} lost e {}".format(self.ip, exc))
+            sys.stdout.flush()
+
+        while self._pending:
+            fut = self._pending.popleft()
+            if not fut.done():
+                fut.set_exception(ConnectionError("FasTrak3 {} connection lost".format(self.ip)))
+        self._expired.clear()
+
+        if self._frames is not None:
+            self._put(None)
+
+        if self.connection is not None:
+            # Reconnect (with backoff) by connection manager
+            self.connection.lost()
+
+    def _lost(self, fut):
+        """Expired request response not received within grace (lost),
+           reset connection (resynchronize responses)
+        """
+        _methodname = self._lost.__name__
+
+        if fut not in self._expired:
+            return
+        self._expired.discard(fut)
+
+        if self._verbose >= util.VerboseLevel.error:
+            util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+            print("connection {} response lost".format(self.ip))
+            sys.stdout.flush()
+
+        self.reset()
+
+    def _put(self, m):
+        """Queue async frame for iteration (oldest dropped when full)
+        """
+        self._frames.append(m)
+        self._frames_ev.set()
+
+
+class AsyncConnectionManager(connection.ConnectionManager):
+    def __init__(self, client, bus=None, verbose=util.VerboseLevel.info):
+        """Initialize FasTrak3 asyncio connection manager
+           (connect and reconnect with backoff and state events of
+            ConnectionManager, served by client event loop rather than
+            connections thread)
+        """
+        super().__init__(client, bus=bus, verbose=verbose)
+
+        self._wake = None   # Reconnect loop wake (event loop)
+        self.future = None  # Concurrent future of reconnect loop
+
+    def start(self):
+        """Start connection manager (returns immediately)
+        """
+        self.future = loop(verbose=self.verbose).add(self.client)
+
+    def stop(self):
+        """Stop connection manager
+        """
+        self._stop.set()
+        self.wake()
+
+    def lost(self):
+        """Connection lost (e.g. EOF), reconnect
+        """
+        if self._state in (connection.ConnectionState.connected, connection.ConnectionState.degraded):
+            self._set_state(connection.ConnectionState.disconnected)
+        self.wake()
+
+    def wake(self):
+        """Wake reconnect loop (threadsafe)
+        """
+        if self._wake is not None:
+            self.client._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run(self):
+        """Reconnect loop (event loop), until stopped
+        """
+        _methodname = self.run.__name__
+
+        self.client._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                if not self.connected:
+                    self._set_state(connection.ConnectionState.connecting)
+                    dt = self._attempted(await self.client.connect(retry=1, delay=0.0))
+                else:
+                    dt = self._poll()
+            except Exception as e:
+                dt = cfgt._FT3_TCPIP_CONN_POLL_S
+                if self.verbose >= util.VerboseLevel.error:
+                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                    print("FasTrak3 {} connection exception e {}".format(self.client.ip, e))
+                    sys.stdout.flush()
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), dt)
+            except asyncio.TimeoutError:
+                pass
+
+
+class EventLoop(object):
+    def __init__(self, verbose=util.VerboseLevel.info):
+        """Initialize event loop serving many FasTrak3 clients
+           (one thread for all boards)
+        """
+        self.verbose = verbose
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        self.clients = []
+
+    def run(self, coro):
+        """Run coroutine in event loop (threadsafe)
+           Returns concurrent future
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def add(self, client, heartbeat=True):
+        """Add client, connecting (and heartbeat) in event loop
+           Returns concurrent future of connect (of reconnect loop iff
+           client has connection manager)
+        """
+        async def _start():
+            if heartbeat:
+                client.heartbeat_task = asyncio.ensure_future(client.heartbeat())
+            if client.connection is not None:
+                return await client.connection.run()
+            return await client.connect()
+
+        self.clients += [client]
+        return self.run(_start())
+
+    def stop(self):
+        """Close clients and stop event loop
+        """
+        for c in self.clients:
+            c.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_loop = None
+_mutex = Lock()
+
+def loop(verbose=util.VerboseLevel.info):
+    """Get process-wide FasTrak3 client event loop (started on first use)
+    """
+    global _loop
+    with _mutex:
+        if _loop is None:
+            _loop = EventLoop(verbose=verbose)
+    return _loop
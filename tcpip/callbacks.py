@@ -7,15 +7,19 @@ import sys
 import numpy as np
 import pandas as pd
 
-import struct
-
 from typing import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from collections import deque
 
 from threading import Lock
 
 import tcpip.msgdata as msg
+import tcpip.reassembly as reassembly
+import data.data as data
 import data.config as cfgd
+import bus.bus as bus
+import pipeline.pipeline as pipeline
+import pipeline.config as cfgpl
 import util.util as util
 
 
@@ -32,6 +36,14 @@ class CallbackEvents:
     t    : list
     event: list
 
+@dataclass
+class CallbackShot:
+    meta  : CallbackMeta
+    events: CallbackEvents
+    rec   : np.ndarray   # Shot samples (structured records)
+    s_ad  : pd.DataFrame # Shot A/D measurements
+    df    : pd.DataFrame # Shot data
+
 @dataclass
 class CallbackGroup:
     send_cmd  : Callable[[msg.CmdData  ], None]
@@ -40,7 +52,11 @@ class CallbackGroup:
 
 
 class Callbacks(object):
-    def __init__(self, board=None, verbose=util.VerboseLevel.info):
+    def __init__(self, board=None, nowait=False, verbose=util.VerboseLevel.info):
+        """Initialize FasTrak3 TCP/IP callbacks
+           (nowait iff receive callback must never block, e.g. event
+            loop, frames then dropped while reassembly queue full)
+        """
         _methodname = self.__init__.__name__
 
         self.board = board
@@ -64,8 +80,23 @@ class Callbacks(object):
         self._meta = CallbackMeta(shot=_shot, t0=None, t1=None, num_p=0, num_t=0)
         self._events = CallbackEvents(t=[], event=[])
 
-        self._shot_bytes_p = b''
-        self._shot_bytes_t = b''
+        # Position- and time- sampled shot datasets
+        self.shot = reassembly.ShotReassembly()
+
+        self.num_incomplete = 0 # Shots dropped (datasets missing packets or absent)
+        self._spill = deque()   # Shot numbers not queued to persist stage (retried)
+
+        # Shot ingest pipeline
+        # NB: Receive thread only queues (copied) frames, shot
+        #     processing proceeds in stage workers
+        _stages = [('reassemble', self._reassemble_stage),
+                   ('decode'    , self._decode_stage),
+                   ('convert'   , self._convert_stage),
+                   ('publish'   , self._publish_stage),
+                   ('persist'   , self._persist_stage)]
+        self.pipeline = pipeline.FT3Pipeline(_stages, config=cfgpl._FT3_PIPELINE_INGEST_STAGES,
+                                             on_drop={'persist': self._spill_cb}, verbose=verbose)
+        self._put = self.pipeline.put_nowait if nowait else self.pipeline.put
 
         self.fcn = CallbackGroup(send_cmd=lambda m: None,
                                  recv_resp=self._recv_resp_cb,
@@ -87,15 +118,60 @@ class Callbacks(object):
             print("FasTrak3 recv async data [{}]".format(len(m.data)))
             sys.stdout.flush()
 
-        _type = msg.AsyncDataType(m.header.bin_type)
+        # NB: Frame data copied (receive buffer reused on next read),
+        #     receive time stamped prior to queueing
+        self._put((m.header, bytes(m.data), pd.Timestamp.now()))
+
+    @property
+    def num_lost(self):
+        """Get lost shots (dropped incomplete, failed or dropped by shot
+           stages of ingest pipeline, or dropped by lossless board shot
+           subscribers, e.g. parameter calculation)
+        """
+        rv = self.num_incomplete + sum(self.pipeline[n].num_failed + self.pipeline[n].num_dropped
+                                       for n in cfgpl._FT3_PIPELINE_INGEST_SHOT_STAGES)
+        if self.board is not None and getattr(self.board, 'bus', None) is not None:
+            rv += sum(S.num_dropped for S in self.board.bus.subscribers(data.FT3DataType.shot)
+                      if S.policy == bus.Policy.lossless)
+        return rv
+
+    @property
+    def num_spilled(self):
+        """Get shots spilled by persist stage (not yet written)
+        """
+        return len(self._spill)
+
+    def _spill_cb(self, shot):
+        """Spill shot number not queued to persist stage (retried by
+           persist stage)
+           Returns True (shot retained)
+        """
+        _methodname = self._spill_cb.__name__
+
+        self._spill.append(shot)
+        if self.verbose >= util.VerboseLevel.warn:
+            util._FT3_UTIL_VERBOSE_WARN_WITH_TS(_methodname)
+            print("shot {} persist spilled ({:d} spilled)".format(shot, len(self._spill)))
+            sys.stdout.flush()
+        return True
+
+    def _reassemble_stage(self, item):
+        """Reassemble shot datasets and events of received frames
+           Returns shot (on shot completion) to decode stage
+        """
+        _methodname = self._reassemble_stage.__name__
+
+        header,data,t = item
+
+        _type = msg.AsyncDataType(header.bin_type)
         if _type == msg.AsyncDataType.shot_pos:
             self.mutexes.shot.acquire()
             try:
-                if not self._shot_bytes_p:
+                if self.shot[_type].empty:
                     self.mutexes.meta.acquire()
                     try:
                         self._meta.shot += 1
-                        self._meta.t1 = pd.Timestamp.now()
+                        self._meta.t1 = t
                     except Exception as e:
                         if self.verbose >= util.VerboseLevel.error:
                             util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -103,7 +179,7 @@ class Callbacks(object):
                             sys.stdout.flush()
                     self.mutexes.meta.release()
 
-                self._shot_bytes_p += m.data
+                self.shot.add(_type, header, data)
             except Exception as e:
                 if self.verbose >= util.VerboseLevel.error:
                     util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -113,7 +189,7 @@ class Callbacks(object):
         elif _type == msg.AsyncDataType.shot_time:
             self.mutexes.shot.acquire()
             try:
-                self._shot_bytes_t += m.data
+                self.shot.add(_type, header, data)
             except Exception as e:
                 if self.verbose >= util.VerboseLevel.error:
                     util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -123,137 +199,163 @@ class Callbacks(object):
         elif _type == msg.AsyncDataType.shot_comp:
             if self.verbose >= util.VerboseLevel.info:
                 util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
-                print("FasTrak3 shot acquired [P:{} T:{}]".format(len(self._shot_bytes_p), len(self._shot_bytes_t)))
+                print("FasTrak3 shot acquired [P:{} T:{}]".format(len(self.shot[msg.AsyncDataType.shot_pos]),
+                                                                  len(self.shot[msg.AsyncDataType.shot_time])))
                 sys.stdout.flush()
 
-            # Unpack position- and time- shot data streams
+            # Position- and time- shot data streams (structured records, copied
+            # so shot-data buffers are reused by next shot)
+            # NB: Shot missing packets or datasets dropped (not decoded,
+            #     calculated nor written), its shot number skipped
+            _rec = None
             self.mutexes.shot.acquire()
             try:
-                _llp = [s for s in struct.iter_unpack(msg._FT3_TCPIP_ASYNC_SHOT_DATA_FORMAT, self._shot_bytes_p)]
-                _llt = [s for s in struct.iter_unpack(msg._FT3_TCPIP_ASYNC_SHOT_DATA_FORMAT, self._shot_bytes_t)]
+                _missing = 0
+                _absent = self.shot.absent
+                for _d in self.shot.datasets.values():
+                    _missing += _d.missing
+                    _d.finish()
+
+                if not _missing and not _absent:
+                    _recp = msg._FT3_TCPIP_ASYNC_SHOT_DATA_VIEW(self.shot.view(msg.AsyncDataType.shot_pos))
+                    _rect = msg._FT3_TCPIP_ASYNC_SHOT_DATA_VIEW(self.shot.view(msg.AsyncDataType.shot_time))
+                    _rec = np.concatenate((_recp, _rect))
             except Exception as e:
                 if self.verbose >= util.VerboseLevel.error:
                     util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
                     print("shot-buffer unpack exception e {}".format(e))
                     sys.stdout.flush()
+            finally:
+                self.shot.clear()
             self.mutexes.shot.release()
 
-            self.mutexes.meta.acquire()
-            try:
-                _shot  = self._meta.shot
-                _num_p = self._meta.num_p = len(_llp)
-                _num_t = self._meta.num_t = len(_llt)
-            except Exception as e:
-                if self.verbose >= util.VerboseLevel.error:
-                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                    print("metadata access exception e {}".format(e))
+            if _rec is None:
+                self.num_incomplete += 1
+                if self.verbose >= util.VerboseLevel.warn:
+                    util._FT3_UTIL_VERBOSE_WARN_WITH_TS(_methodname)
+                    print("shot {} dropped, datasets missing packets [{}] absent [{}]".format(self._meta.shot, _missing,
+                                                                                           ', '.join(t.name for t in _absent)))
                     sys.stdout.flush()
-            self.mutexes.meta.release()
-
-            _pre_p = pd.DataFrame(data=[[_shot,'P']]*_num_p, columns=('shot','type'))
-            _pre_t = pd.DataFrame(data=[[_shot,'T']]*_num_t, columns=('shot','type'))
-
-            s_ad_p = pd.DataFrame(data=_llp, columns=msg._FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES)
-            s_ad_t = pd.DataFrame(data=_llt, columns=msg._FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES)
-
-            s_ad_p = pd.concat((_pre_p, s_ad_p), axis=1)
-            s_ad_t = pd.concat((_pre_t, s_ad_t), axis=1)
 
-            s_ad = pd.concat((s_ad_p, s_ad_t))
-            s_ad.reset_index(drop=True, inplace=True)
+                self.mutexes.events.acquire()
+                self._events = CallbackEvents(t=[], event=[])
+                self.mutexes.events.release()
+                return None
 
-            # Shot timespan
+            # Shot metadata and events (snapshots), event buffer cleared for next shot
             self.mutexes.meta.acquire()
+            self.mutexes.events.acquire()
             try:
-                elap_ms = s_ad.one_ms_timer.values[-1]
-                self._meta.t0 = self._meta.t1 - pd.Timedelta(value=elap_ms, unit='ms')
-            except Exception as e:
-                if self.verbose >= util.VerboseLevel.error:
-                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                    print("metadata update exception e {}".format(e))
-                    sys.stdout.flush()
-            self.mutexes.meta.release()
+                self._meta.num_p = len(_recp)
+                self._meta.num_t = len(_rect)
+                _meta = replace(self._meta)
+                _events = self._events
+                self._events = CallbackEvents(t=[], event=[])
+            finally:
+                self.mutexes.events.release()
+                self.mutexes.meta.release()
 
-            # Convert shot data (A/D measurements to engineering data)
-            B = self.board
-            Bd = B.data
-            df = B.convert_ad(s_ad)
+            return CallbackShot(meta=_meta, events=_events, rec=_rec, s_ad=None, df=None)
 
-# TODO ... integrate/enable shot data via FasTrak3 board rather than sim
-            # Metadata
-            self.mutexes.meta.acquire()
-            try:
-                m = self._meta
-                data = [(m.shot, m.t0, m.t1, m.num_p, m.num_t)]
-                Bd.meta += pd.DataFrame(data=data, columns=cfgd._FT3_DATA_META_DATAFRAME_VARIABLES)
-            except Exception as e:
-                if self.verbose >= util.VerboseLevel.error:
-                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                    print("metadata board-data exception e {}".format(e))
-                    sys.stdout.flush()
+        elif _type == msg.AsyncDataType.string:
+            if self.verbose >= util.VerboseLevel.info:
+                util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+                print("FasTrak3 async message {} [{}]".format(data,len(data)))
+                sys.stdout.flush()
 
-# TODO ... integrate/enable events via FasTrak3 board rather than sim
             self.mutexes.events.acquire()
             try:
-                ev = self._events
-                _shot  = pd.Series(data=[m.shot]*len(ev.t), name=cfgd._FT3_DATA_EVENTS_DATAFRAME_VARIABLES[0])
-                _t     = pd.Series(data=ev.t, name=cfgd._FT3_DATA_EVENTS_DATAFRAME_VARIABLES[1])
-                _event = pd.Series(data=ev.event, name=cfgd._FT3_DATA_EVENTS_DATAFRAME_VARIABLES[2])
-                Bd.events += pd.concat((_shot, _t, _event), axis=1)
+                self._events.t += [t]
+                self._events.event +=[data.decode().strip('\\n')]
             except Exception as e:
                 if self.verbose >= util.VerboseLevel.error:
                     util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                    print("events board-data exception e {}".format(e))
+                    print("event-buffer update exception e {}".format(e))
                     sys.stdout.flush()
             self.mutexes.events.release()
-            self.mutexes.meta.release()
 
-# TODO ... integrate/enable shot data via FasTrak3 board rather than sim
-            # Shot A/D measurements
-            Bd.ad += s_ad
+        return None
 
-# TODO ... integrate/enable shot data via FasTrak3 board rather than sim
-            # Shot data
-            Bd.shot += df
+    def _decode_stage(self, shot):
+        """Decode shot samples to A/D measurements dataframe
+        """
+        _methodname = self._decode_stage.__name__
 
-            # SQL database
-            B.sql_write()
+        m = shot.meta
 
-            # Clear shot-data and event buffers
-            self.mutexes.shot.acquire()
-            try:
-                self._shot_bytes_p = b''
-                self._shot_bytes_t = b''
-            except Exception as e:
-                if self.verbose >= util.VerboseLevel.error:
-                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                    print("shot-buffer clear exception e {}".format(e))
-                    sys.stdout.flush()
-            self.mutexes.shot.release()
+        _ad = {}
+        _ad.update(shot = np.full(m.num_p + m.num_t, m.shot))
+        _ad.update(type = np.repeat(np.array(['P','T']), (m.num_p, m.num_t)))
+        _ad.update({n: shot.rec[n] for n in msg._FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES})
+        shot.s_ad = pd.DataFrame(data=_ad, columns=cfgd._FT3_DATA_AD_DATAFRAME_VARIABLES, copy=False)
 
-            self.mutexes.events.acquire()
-            try:
-                self._events = CallbackEvents(t=[], event=[])
-            except Exception as e:
-                if self.verbose >= util.VerboseLevel.error:
-                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                    print("event-buffer clear exception e {}".format(e))
-                    sys.stdout.flush()
-            self.mutexes.events.release()
+        # Shot timespan
+        try:
+            elap_ms = shot.s_ad.one_ms_timer.values[-1]
+            m.t0 = m.t1 - pd.Timedelta(value=elap_ms, unit='ms')
+        except Exception as e:
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("metadata update exception e {}".format(e))
+                sys.stdout.flush()
 
-        elif _type == msg.AsyncDataType.string:
-            if self.verbose >= util.VerboseLevel.info:
-                util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
-                print("FasTrak3 async message {} [{}]".format(m.data,len(m.data)))
+        return shot
+
+    def _convert_stage(self, shot):
+        """Convert shot data (A/D measurements to engineering data)
+        """
+        shot.df = self.board.convert_ad(shot.s_ad)
+        return shot
+
+    def _publish_stage(self, shot):
+        """Append shot to board data
+           (published to board bus, see Board._calc_cb)
+           NB: Metadata and events appended prior to shot data
+        """
+        _methodname = self._publish_stage.__name__
+
+        Bd = self.board.data
+
+# TODO ... integrate/enable shot data via FasTrak3 board rather than sim
+        # Metadata
+        try:
+            m = shot.meta
+            data = [(m.shot, m.t0, m.t1, m.num_p, m.num_t)]
+            Bd.meta += pd.DataFrame(data=data, columns=cfgd._FT3_DATA_META_DATAFRAME_VARIABLES)
+        except Exception as e:
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("metadata board-data exception e {}".format(e))
                 sys.stdout.flush()
 
-            self.mutexes.events.acquire()
-            try:
-                self._events.t += [pd.Timestamp.now()]
-                self._events.event +=[m.data.decode().strip('\\n')]
-            except Exception as e:
-                if self.verbose >= util.VerboseLevel.error:
-                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                    print("event-buffer update exception e {}".format(e))
-                    sys.stdout.flush()
-            self.mutexes.events.release()
+# TODO ... integrate/enable events via FasTrak3 board rather than sim
+        try:
+            ev = shot.events
+            _shot  = pd.Series(data=[m.shot]*len(ev.t), name=cfgd._FT3_DATA_EVENTS_DATAFRAME_VARIABLES[0])
+            _t     = pd.Series(data=ev.t, name=cfgd._FT3_DATA_EVENTS_DATAFRAME_VARIABLES[1])
+            _event = pd.Series(data=ev.event, name=cfgd._FT3_DATA_EVENTS_DATAFRAME_VARIABLES[2])
+            Bd.events += pd.concat((_shot, _t, _event), axis=1)
+        except Exception as e:
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("events board-data exception e {}".format(e))
+                sys.stdout.flush()
+
+# TODO ... integrate/enable shot data via FasTrak3 board rather than sim
+        # Shot A/D measurements
+        Bd.ad += shot.s_ad
+
+# TODO ... integrate/enable shot data via FasTrak3 board rather than sim
+        # Shot data
+        Bd.shot += shot.df
+
+        return m.shot
+
+    def _persist_stage(self, shot):
+        """Write shot, after spilled shots (oldest first), to SQL database
+           NB: Spilled shots written from board data (or archive), shot
+               failing to write is lost, later shots retried on next
+        """
+        self._spill.append(shot)
+        while self._spill:
+            self.board.sql_write(shot=self._spill.popleft())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 TCP/IP wire capture and replay
+"""
+import os
+import sys
+import time
+import struct
+
+from dataclasses import dataclass
+from enum import IntEnum,unique
+
+from threading import Lock
+
+import tcpip.config as cfgt
+import tcpip.msgdata as msg
+import tcpip.reader as reader
+
+import util.util as util
+
+
+@unique
+class Direction(IntEnum):
+    rx = 0 # Received from board
+    tx = 1 # Sent to board
+
+
+@dataclass
+class CaptureRecord:
+    t        : float # Time (seconds since epoch)
+    direction: Direction
+    data     : bytes
+
+
+@dataclass
+class ReplayStats:
+    records: int
+    bytes  : int
+    frames : int
+    elapsed: float # Replay wall-clock time (s)
+    span   : float # Captured time span (s)
+
+
+_Rs = struct.Struct(cfgt._FT3_TCPIP_CAPTURE_RECORD_FORMAT)
+
+
+class Capture(object):
+    def __init__(self, path):
+        """Initialize wire capture file (append-only)
+           (one record per socket read or send)
+        """
+        self.path = path
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        _new = not os.path.exists(path) or not os.path.getsize(path)
+        self._file = open(path, 'ab')
+        if _new:
+            self._file.write(cfgt._FT3_TCPIP_CAPTURE_MAGIC)
+
+        self.num_records = 0
+        self.num_bytes = 0
+
+        self._mutex = Lock()
+
+    def write(self, direction, data, t=None):
+        """Write capture record (raw bytes, copied)
+           NB: Flushed per record, so a crashed process loses at most
+               the record being written (see read)
+        """
+        t = time.time() if t is None else t
+        with self._mutex:
+            if self._file is None:
+                return
+            self._file.write(_Rs.pack(t, direction, len(data)))
+            self._file.write(data)
+            self._file.flush()
+            self.num_records += 1
+            self.num_bytes += len(data)
+
+    def close(self):
+        """Close capture file
+        """
+        with self._mutex:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read(path):
+    """Read capture file
+       Yields capture records, stopping at truncated trailing record
+    """
+    _m = cfgt._FT3_TCPIP_CAPTURE_MAGIC
+    with open(path, 'rb') as f:
+        if f.read(len(_m)) != _m:
+            raise ValueError("{} is not a FasTrak3 capture".format(path))
+        while True:
+            h = f.read(_Rs.size)
+            if len(h) < _Rs.size:
+                return
+            t,d,n = _Rs.unpack(h)
+            b = f.read(n)
+            if len(b) < n:
+                return
+            yield CaptureRecord(t=t, direction=Direction(d), data=b)
+
+
+class Replay(object):
+    def __init__(self, path, cb, speed=1.0, verbose=util.VerboseLevel.info):
+        """Initialize capture replay through client callbacks
+           (speed multiple of captured rate, None for maximum speed)
+        """
+        self.path = path
+        self.cb = cb
+        self.speed = speed
+        self.verbose = verbose
+
+        self._reader = reader.FrameReader()
+
+    def run(self):
+        """Replay received bytes of capture (blocks until done)
+           Returns replay statistics
+        """
+        _methodname = self.run.__name__
+
+        self._reader.clear()
+
+        num_r = num_b = num_f = 0
+        t0 = tc0 = tc = None
+        for r in read(self.path):
+            if r.direction != Direction.rx:
+                continue
+
+            # Pace to captured inter-arrival times (scaled)
+            if tc0 is None:
+                t0,tc0 = time.perf_counter(),r.t
+            tc = r.t
+            if self.speed:
+                dt = (r.t - tc0) / self.speed - (time.perf_counter() - t0)
+                if dt >= cfgt._FT3_TCPIP_REPLAY_SLEEP_MIN_S:
+                    time.sleep(dt)
+
+            self._reader.feed(r.data)
+            num_f += self._dispatch()
+            num_r += 1
+            num_b += len(r.data)
+
+        rv = ReplayStats(records=num_r, bytes=num_b, frames=num_f,
+                         elapsed=(time.perf_counter() - t0) if t0 is not None else 0.0,
+                         span=(tc - tc0) if tc0 is not None else 0.0)
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("replay {} [{} frames, {:.3f}s]".format(self.path, rv.frames, rv.elapsed))
+            sys.stdout.flush()
+
+        return rv
+
+    def _dispatch(self):
+        """Dispatch buffered complete frames to callbacks (see Client.recv)
+           Returns frame count
+        """
+        n = 0
+        for hdr,rv in self._reader.frames():
+            if hdr is None:
+                if self.cb.fcn.recv_resp is not None:
+                    self.cb.fcn.recv_resp(msg.RespData(data=rv))
+            else:
+                if self.cb.fcn.recv_async is not None:
+                    self.cb.fcn.recv_async(msg.AsyncData(header=hdr, data=rv))
+            n += 1
+        return n
@@ -3,21 +3,29 @@
 """
 ABSTRACT: Visi-Trak FasTrak3 TCP/IP client
 """
+import os
 import sys
+import errno
 
-from threading import Thread
+from threading import Thread, Event, Lock
 import select
 
 import socket
-import struct
 
 import ipaddress
 
 import time
 
+from collections import deque
+from functools import partial
+import concurrent.futures
+
 import tcpip.config as cfgt
 import tcpip.msgdata as msg
 import tcpip.callbacks as cb
+import tcpip.reader as reader
+import tcpip.capture as capture
+import tcpip.telemetry as telemetry
 
 import board.config as cfgb
 
@@ -41,8 +49,31 @@ class Client(object):
         self._local = None
         self._peer = None
 
+        # Batched frame reader (reusable receive buffer)
+        self._reader = reader.FrameReader()
+
+        # Connection manager (see tcpip.connection), time of last received data
+        self.connection = None
+        self.last_rx = time.monotonic()
+
+        # Wire capture (optional, see tcpip.capture)
+        self.capture = None
+
+        # Connection health (see tcpip.telemetry)
+        self.telemetry = telemetry.Telemetry()
+
+        # Response futures (FIFO) of pipelined commands, as (future, deadline)
+        self._pending = deque()
+        self._send_mutex = Lock()
+        self._timeouts = 0 # Consecutive response timeouts
+
+        self.num_timeouts = 0
+        self.num_purged = 0
+        self.num_unsolicited = 0
+
         self.cb = cb.Callbacks(board=board, verbose=verbose)
 
+        self._stop = Event()
         if ipaddress.ip_address(self.board.ip) == cfgb._FT3_BOARD_IP_LOCALHOST:
             self.super_thread = None
         else:
@@ -76,6 +107,7 @@ class Client(object):
         c = self._local = self._socket.getsockname()
         try:
             s = self._peer = self._socket.getpeername()
+            self.telemetry.connected()
         except OSError as e:
             if e.errno == 57:
                 # [Errno 57] Socket is not connected
@@ -88,6 +120,77 @@ class Client(object):
             print("socket server {}:{}".format(s[0], s[1]))
             sys.stdout.flush()
 
+    def connect_once(self, port=cfgt._FT3_TCPIP_CLIENT_PORT_DEFAULT, timeout=cfgt._FT3_TCPIP_CONN_TIMEOUT_S):
+        """Connect to host (single attempt, new socket)
+           Returns True iff connected
+        """
+        s = self.connect_start(port=port)
+        if s is None:
+            return False
+
+        _,w,x = select.select([], [s], [s], timeout)
+        return self.connect_done(s, ready=bool(w or x))
+
+    def connect_start(self, port=cfgt._FT3_TCPIP_CLIENT_PORT_DEFAULT):
+        """Start non-blocking connect to host (single attempt, new socket)
+           Returns connecting socket (writable when connect done, see
+           connect_done), None if connect failed
+        """
+        _methodname = self.connect_start.__name__
+
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.setblocking(False)
+        e = s.connect_ex((str(self.board.ip),port))
+        if e not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            s.close()
+            if self._verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("connect exception e {}".format(OSError(e, os.strerror(e))))
+                sys.stdout.flush()
+            return None
+
+        return s
+
+    def connect_done(self, s, ready=True):
+        """Complete non-blocking connect of socket s (see connect_start)
+           (socket closed unless ready, i.e. writable, and connected)
+           Returns True iff connected
+        """
+        _methodname = self.connect_done.__name__
+
+        try:
+            if not ready:
+                raise socket.timeout("timed out")
+            e = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if e:
+                raise OSError(e, os.strerror(e))
+            s.setblocking(True)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, cfgt._FT3_TCPIP_CLIENT_RECV_TIMEOUT)
+            _local, _peer = s.getsockname(), s.getpeername()
+        except OSError as e:
+            s.close()
+            if self._verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("connect exception e {}".format(e))
+                sys.stdout.flush()
+            return False
+
+        self._socket = s
+        self._reader.clear()
+        self._local = _local
+        self._peer = _peer
+        self.last_rx = time.monotonic()
+        self.telemetry.connected()
+
+        if self._verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("socket client {}:{}".format(self._local[0], self._local[1]))
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("socket server {}:{}".format(self._peer[0], self._peer[1]))
+            sys.stdout.flush()
+
+        return True
+
     def close(self):
         """Close FasTrak3 TCP/IP client socket
         """
@@ -103,6 +206,16 @@ class Client(object):
 
         self._socket.close()
 
+    def stop(self):
+        """Stop FasTrak3 TCP/IP client supervisor and close socket (and capture)
+        """
+        self._stop.set()
+        self.close()
+        if self.super_thread is not None:
+            self.super_thread.join(cfgt._FT3_TCPIP_SELECT_WAIT_IO_TIMEOUT_S + cfgt._FT3_TCPIP_CONN_POLL_S)
+        if self.capture is not None:
+            self.capture.close()
+
     def reset(self):
         """Reset FasTrak3 TCP/IP client socket
            (Close and reconnect to peer)
@@ -115,75 +228,92 @@ class Client(object):
             sys.stdout.flush()
 
         self.close()
-        if self._peer is not None:
-            self.connect(self._peer[0], self._peer[1])
+        self._reader.clear()
+        self._fail(ConnectionError("FasTrak3 {} connection reset".format(self.board.ip)))
+        if self.connection is not None:
+            # Reconnect (with backoff) by connection manager
+            self.connection.lost()
+        elif self._peer is not None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, cfgt._FT3_TCPIP_CLIENT_RECV_TIMEOUT)
+            self.connect(port=self._peer[1])
 
     def send(self, m):
         """Send message
+           Returns response future (see request)
+        """
+        return self.request(m)
+
+    def request(self, m, timeout=cfgt._FT3_TCPIP_CLIENT_REQUEST_TIMEOUT_S):
+        """Send command without waiting on its response
+           Returns future of response (TimeoutError after timeout s)
+           NB: Responses resolve requests in FIFO order, so a timed-out
+               request still consumes its (late) response within grace
+               period (see _expire)
         """
-        _methodname = self.send.__name__
+        return self.requests([m], timeout=timeout)[0]
 
-        if self._verbose >= util.VerboseLevel.info:
-            h = self._socket.getpeername()
-            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
-            print("send data (N={:5d}) to {}:{}".format(len(m), h[0], h[1]))
-            sys.stdout.flush()
+    def requests(self, ms, timeout=cfgt._FT3_TCPIP_CLIENT_REQUEST_TIMEOUT_S):
+        """Send commands back-to-back (one round trip for all)
+           Returns futures of responses, in command order
+        """
+        _methodname = self.requests.__name__
 
-        b = m.encode()
-        self._socket.sendall(b)
+        bb = [m.encode() if isinstance(m, str) else bytes(m) for m in ms]
+        b = b''.join(bb)
 
-        if self.cb.fcn.send_cmd is not None:
-            _m = msg.CmdData(data=b)
-            self.cb.fcn.send_cmd(_m)
+        _t = time.monotonic() + timeout if timeout is not None else None
+        ff = [concurrent.futures.Future() for _ in bb]
 
-    def recv(self):
-        """Receive message
-        """
-        _methodname = self.recv.__name__
+        # NB: Futures queued in wire order of commands
+        with self._send_mutex:
+            if self._verbose >= util.VerboseLevel.info:
+                h = self._socket.getpeername()
+                util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+                print("send data (N={:5d}) to {}:{}".format(len(b), h[0], h[1]))
+                sys.stdout.flush()
 
-        # Message framing
-        rv = self._recv_helper(msg._FT3_TCPIP_MSG_FRAME_LEN)
-        if not rv:
-            return
-        _u = ord(rv)
+            self._pending.extend((f,_t) for f in ff)
+            try:
+                self._socket.sendall(b)
+            except Exception:
+                for _ in ff:
+                    self._pending.pop()
+                raise
 
-        is_async = msg._FT3_TCPIP_IS_ASYNC(_u)
-        rv = msg._FT3_TCPIP_UNSET_ASYNC(_u)
+        if self.capture is not None:
+            self.capture.write(capture.Direction.tx, b)
 
-        if not is_async:
-            # Read resp data
-            rv += self._recv_helper(msg._FT3_TCPIP_RESP_LEN - 1)
+        if self.cb.fcn.send_cmd is not None:
+            for _b in bb:
+                _m = msg.CmdData(data=_b)
+                self.cb.fcn.send_cmd(_m)
 
-            if self.cb.fcn.recv_resp is not None:
-                _m = msg.RespData(data=rv)
-                self.cb.fcn.recv_resp(_m)
+        return ff
 
-            return
-        else:
-            # Read async header
-            rv += self._recv_helper(msg._FT3_TCPIP_ASYNC_HEADER_LEN - 1)
-            if not rv:
-                return
+    @property
+    def pending(self):
+        """Get commands awaiting response
+        """
+        return len(self._pending)
+
+    def recv(self):
+        """Receive messages
+           (one recv_into, dispatching all complete buffered frames)
+        """
+        _methodname = self.recv.__name__
 
-        # Unpack async header
         try:
-            hdr = msg.AsyncHeader(*struct.unpack(msg._FT3_TCPIP_ASYNC_HEADER_FORMAT, rv))
+            n = self._reader.fill(self._socket)
         except Exception as e:
             if self._verbose >= util.VerboseLevel.error:
                 util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                print("header unpack exception e {}".format(e))
+                print("recv exception e {}".format(e))
                 sys.stdout.flush()
-
-            self.reset()
             return None
 
-        # Header consistency checks
-        # TODO ...
-
-        # Read async data
-        rv = self._recv_helper(hdr.num_bytes)
-        if not rv:
-            # None on EOF (socket closed or no data)
+        if not n:
+            # EOF (socket closed)
             if self._verbose >= util.VerboseLevel.error:
                 util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
                 print("EOF")
@@ -192,43 +322,37 @@ class Client(object):
             self.reset()
             return None
 
-        if self.cb.fcn.recv_async is not None:
-            _m = msg.AsyncData(header=hdr, data=rv)
-            self.cb.fcn.recv_async(_m)
+        self.last_rx = time.monotonic()
+        self.telemetry.rx(n)
+        if self.connection is not None:
+            self.connection.alive()
 
-    def _recv_helper(self, n):
-        """Receive message helper
-           Read n bytes
-        """
-        _methodname = self._recv_helper.__name__
-
-        data = b''
+        if self.capture is not None:
+            self.capture.write(capture.Direction.rx, self._reader.tail(n))
 
-        while len(data) < n:
-            try:
-                p = self._socket.recv(n - len(data))
-                if not p:
-                    # None on EOF (socket closed or no data)
-                    if self._verbose >= util.VerboseLevel.error:
-                        util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                        print("EOF")
-                        sys.stdout.flush()
-                    return None
-                data += p
-            #except OSError as e:
-            #    #self.reset()
-            #    if self._verbose >= util.VerboseLevel.error:
-            #        util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-            #        print("OSError socket exception e {}".format(e))
-            #        sys.stdout.flush()
-            #    return None
-            except Exception as e:
-                if self._verbose >= util.VerboseLevel.error:
-                    util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
-                    print("recv exception e {}".format(e))
-                    sys.stdout.flush()
+        # NB: Frame views valid until next fill, i.e. callbacks copy
+        #     (or consume) frame data prior to return
+        for hdr,rv in self._reader.frames():
+            self.telemetry.frame(hdr)
+            if hdr is None:
+                _m = msg.RespData(data=rv)
+                if self._pending:
+                    # NB: Done iff request timed out (late response, within grace)
+                    f,_ = self._pending.popleft()
+                    self._timeouts = 0
+                    if not f.done():
+                        f.set_result(msg.RespData(data=bytes(rv)))
+                else:
+                    self.num_unsolicited += 1
+                if self.cb.fcn.recv_resp is not None:
+                    self.cb.fcn.recv_resp(_m)
+            else:
+                # Header consistency checks
+                # TODO ...
 
-        return data
+                if self.cb.fcn.recv_async is not None:
+                    _m = msg.AsyncData(header=hdr, data=rv)
+                    self.cb.fcn.recv_async(_m)
 
 
     def _supervisor(self):
@@ -236,12 +360,16 @@ class Client(object):
         """
         _methodname = self._supervisor.__name__
 
-        while True:
+        while not self._stop.is_set():
+            if self.connection is not None and not self.connection.connected:
+                # Wait on (re)connect by connection manager
+                time.sleep(cfgt._FT3_TCPIP_CONN_POLL_S)
+                continue
+
             S = [self._socket] + [sys.stdin]
 
             try:
-                inp,outp,err = select.select(S,[],S,
-                                             cfgt._FT3_TCPIP_SELECT_WAIT_IO_TIMEOUT_S)
+                inp,outp,err = select.select(S,[],S,self._select_wait())
             except Exception as e:
                 if self._verbose >= util.VerboseLevel.error:
                     util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -257,7 +385,7 @@ class Client(object):
                     if m:
                         try:
                             # Send message over command/response socket
-                            self.send(m.encode())
+                            self.send(m)
                         except Exception as e:
                             if self._verbose >= util.VerboseLevel.error:
                                 util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
@@ -273,6 +401,8 @@ class Client(object):
                             print("recv exception e {}".format(e))
                             sys.stdout.flush()
 
+            self._expire()
+
             for s in outp:
                 if self._verbose >= util.VerboseLevel.warn:
                     util._FT3_UTIL_VERBOSE_WARN_WITH_TS(_methodname)
@@ -286,6 +416,55 @@ class Client(object):
 
         return
 
+    def _select_wait(self):
+        """Supervisor select wait (until earliest response deadline)
+        """
+        dt = cfgt._FT3_TCPIP_SELECT_WAIT_IO_TIMEOUT_S
+        for f,_t in list(self._pending):
+            if _t is not None and not f.done():
+                dt = min(dt, max(_t - time.monotonic(), 0.0))
+        return dt
+
+    def _expire(self):
+        """Fail requests past response deadline, purging requests past
+           grace period and resetting connection on repeated timeouts
+           NB: Expired requests remain queued (for grace period) to
+               consume late responses
+        """
+        _methodname = self._expire.__name__
+
+        _now = time.monotonic()
+        for f,_t in list(self._pending):
+            if _t is not None and _t <= _now and not f.done():
+                f.set_exception(TimeoutError("FasTrak3 {} response timeout".format(self.board.ip)))
+                self._timeouts += 1
+                self.num_timeouts += 1
+
+        with self._send_mutex:
+            while self._pending:
+                f,_t = self._pending[0]
+                if _t is None or _t + cfgt._FT3_TCPIP_CLIENT_RESPONSE_GRACE_S > _now or not f.done():
+                    break
+                self._pending.popleft()
+                self.num_purged += 1
+
+        if self._timeouts >= cfgt._FT3_TCPIP_CLIENT_TIMEOUT_RESET_NUM:
+            if self._verbose >= util.VerboseLevel.warn:
+                util._FT3_UTIL_VERBOSE_WARN_WITH_TS(_methodname)
+                print("{} consecutive response timeouts, resynchronize".format(self._timeouts))
+                sys.stdout.flush()
+            self._timeouts = 0
+            self.reset()
+
+    def _fail(self, e):
+        """Fail and discard pending requests (e.g. connection reset)
+        """
+        with self._send_mutex:
+            _pending,self._pending = self._pending,deque()
+        for f,_ in _pending:
+            if not f.done():
+                f.set_exception(e)
+
     def _heartbeat(self):
         """FasTrak3 TCP/IP heartbeat (echo-request) transmit
         """
@@ -297,13 +476,17 @@ class Client(object):
             sys.stdout.flush()
 
         try:
-            self.send(cfgt._FT3_TCPIP_HEARTBEAT_MSG)
+            f = self.send(cfgt._FT3_TCPIP_HEARTBEAT_MSG)
+            f.add_done_callback(partial(self.telemetry.heartbeat, time.perf_counter()))
         except Exception as e:
             if self._verbose >= util.VerboseLevel.error:
                 util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
                 print("TCP/IP heartbeat transmit exception e {}".format(e))
                 sys.stdout.flush()
 
+            if self.connection is not None:
+                self.connection.degrade()
+
 
     @property
     def socket(self):
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 """
+import os
 import struct
 
 import board.config as cfgb
@@ -15,8 +16,65 @@ _FT3_TCPIP_CLIENT_RECV_TIMEOUT = struct.pack('ll',3,0) # 0,0 for no recv-timeout
 _FT3_TCPIP_CLIENT_CONNECT_RETRY_NUM = 10
 _FT3_TCPIP_CLIENT_CONNECT_RETRY_S   = 1.00
 
+_FT3_TCPIP_CLIENT_REQUEST_TIMEOUT_S = 5.00 # Command response timeout (pipelined requests)
+
+# NB: Timed-out requests consume late responses for grace period, then
+#     purged (later responses unsolicited). Consecutive timeouts reset
+#     (resynchronize) connection
+_FT3_TCPIP_CLIENT_RESPONSE_GRACE_S  = _FT3_TCPIP_CLIENT_REQUEST_TIMEOUT_S
+_FT3_TCPIP_CLIENT_TIMEOUT_RESET_NUM = 3
+
 
 _FT3_TCPIP_SELECT_WAIT_IO_TIMEOUT_S = 5.00
 
 _FT3_TCPIP_HEARTBEAT_PERIOD_MS = 30000
 _FT3_TCPIP_HEARTBEAT_MSG       = '*\r'
+
+
+# Shot reassembly
+_FT3_TCPIP_ASYNC_PACKET_NUM_BASE = 0 # Async header packet number of first dataset packet
+
+# Frame reader
+_FT3_TCPIP_READER_BUFFER_LEN = 65536 # Receive buffer (many async packets per recv_into)
+
+# asyncio client
+_FT3_TCPIP_ACLIENT_CONNECT_TIMEOUT_S = 5.00
+_FT3_TCPIP_ACLIENT_REQUEST_TIMEOUT_S = 5.00
+_FT3_TCPIP_ACLIENT_FRAMES_MAX_LEN    = 4096 # Async frames queued for iteration (oldest dropped)
+_FT3_TCPIP_ACLIENT_LATE_RESPONSE_S   = 5.00 # Timed-out request response grace (else lost, connection reset)
+
+# Connection manager
+_FT3_TCPIP_CONN_TOPIC = 'connection' # Board bus topic of connection state events
+
+_FT3_TCPIP_CONN_TIMEOUT_S = 3.00 # Connect attempt timeout
+
+_FT3_TCPIP_CONN_BACKOFF_MIN_S  = 0.50
+_FT3_TCPIP_CONN_BACKOFF_MAX_S  = 30.00
+_FT3_TCPIP_CONN_BACKOFF_JITTER = 0.25 # Fractional (+/-) backoff jitter
+_FT3_TCPIP_CONN_BACKOFF = lambda n: min(_FT3_TCPIP_CONN_BACKOFF_MAX_S, _FT3_TCPIP_CONN_BACKOFF_MIN_S * (2 ** n))
+
+_FT3_TCPIP_CONN_STALE_S = 3 * _FT3_TCPIP_HEARTBEAT_PERIOD_MS / 1000.0 # No received data (degraded)
+_FT3_TCPIP_CONN_POLL_S  = 1.00
+
+# NB: Degraded connection reset (reconnected) after consecutive stale
+#     polls or heartbeat failures
+_FT3_TCPIP_CONN_STALE_RESET_NUM     = 30
+_FT3_TCPIP_CONN_HEARTBEAT_RESET_NUM = 3
+
+_FT3_TCPIP_CONN_THREAD_NAME = 'ft3-connections' # Connection managers of all boards (one thread)
+
+# Wire capture
+_FT3_TCPIP_CAPTURE_MAGIC = b'FT3CAP01' # Capture file header
+
+# NB: Record header (time, direction, length) precedes raw bytes
+_FT3_TCPIP_CAPTURE_RECORD_FORMAT = '<dBI'
+
+_FT3_TCPIP_CAPTURE_ABSPATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'capture')
+_FT3_TCPIP_CAPTURE_EXT     = '.ft3cap'
+_FT3_TCPIP_CAPTURE_NAME    = lambda ip, ts: str(ip).replace('.','_') + '_' + ts.strftime('%Y%m%d_%H%M%S') + _FT3_TCPIP_CAPTURE_EXT
+
+_FT3_TCPIP_REPLAY_SLEEP_MIN_S = 0.001 # Replay pacing sleeps shorter than this are skipped
+
+# Connection telemetry
+_FT3_TCPIP_TELEMETRY_RTT_EDGES_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000] # Heartbeat RTT histogram
+_FT3_TCPIP_TELEMETRY_SHOTS_NUM    = 64 # Shots retained for packets-per-shot statistics
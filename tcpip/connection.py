@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 TCP/IP connection manager
+"""
+import sys
+import time
+import random
+import select
+import socket
+
+import numpy as np
+
+from dataclasses import dataclass
+from enum import IntEnum,unique
+
+from threading import Thread, Event, Lock
+
+import tcpip.config as cfgt
+
+import util.util as util
+
+
+@unique
+class ConnectionState(IntEnum):
+    disconnected = 0
+    connecting   = 1
+    connected    = 2
+    degraded     = 3 # Connected, heartbeat failing or no data received
+
+
+@dataclass
+class ConnectionEvent:
+    ip     : str
+    state  : ConnectionState
+    attempt: int
+    t      : float
+
+
+class ConnectionManager(object):
+    def __init__(self, client, bus=None, verbose=util.VerboseLevel.info):
+        """Initialize FasTrak3 connection manager
+           (background connect and reconnect with jittered exponential
+            backoff, served by process-wide connections thread)
+        """
+        self.client = client
+        self.bus = bus
+        self.verbose = verbose
+
+        self._state = ConnectionState.disconnected
+        self._attempt = 0
+        self._stale = 0 # Consecutive stale polls
+        self._pending = None # Connecting socket (non-blocking connect attempt)
+        self._mutex = Lock()
+
+        self._stop = Event()
+        self._due = 0.0 # Time (monotonic) of next state-machine step
+
+        self.num_connects = 0
+        self.num_reconnects = 0
+        self.num_resets = 0
+
+        client.connection = self
+
+    def start(self):
+        """Start connection manager (returns immediately)
+        """
+        connections(verbose=self.verbose).add(self)
+
+    def stop(self):
+        """Stop connection manager
+        """
+        self._stop.set()
+        connections().remove(self)
+
+    def lost(self):
+        """Connection lost (e.g. EOF), reconnect
+        """
+        if self._state in (ConnectionState.connected, ConnectionState.degraded):
+            self._set_state(ConnectionState.disconnected)
+        if self._pending is None:
+            self._due = 0.0
+        connections().wake()
+
+    def degrade(self):
+        """Connection degraded (e.g. heartbeat transmit failure)
+        """
+        if self._state == ConnectionState.connected:
+            self._set_state(ConnectionState.degraded)
+
+    def alive(self):
+        """Data received on connection
+        """
+        if self._state == ConnectionState.degraded:
+            self._set_state(ConnectionState.connected)
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def connected(self):
+        return self._state in (ConnectionState.connected, ConnectionState.degraded)
+
+    def _set_state(self, state):
+        """Set connection state, publishing state-change event
+        """
+        _methodname = self._set_state.__name__
+
+        with self._mutex:
+            if state == self._state:
+                return
+            self._state = state
+
+        if self.verbose >= util.VerboseLevel.info:
+            util._FT3_UTIL_VERBOSE_INFO_WITH_TS(_methodname)
+            print("FasTrak3 {} connection {}".format(self.client.board.ip, state.name))
+            sys.stdout.flush()
+
+        if self.bus is not None:
+            self.bus.publish(cfgt._FT3_TCPIP_CONN_TOPIC,
+                             ConnectionEvent(ip=str(self.client.board.ip), state=state,
+                                             attempt=self._attempt, t=time.time()))
+
+    def _backoff(self):
+        """Jittered exponential backoff of connect attempt
+        """
+        dt = cfgt._FT3_TCPIP_CONN_BACKOFF(self._attempt)
+        return dt * (1.0 + cfgt._FT3_TCPIP_CONN_BACKOFF_JITTER * random.uniform(-1.0, 1.0))
+
+    def _step(self, ready=False):
+        """Connection state-machine step (connections thread)
+           (non-blocking connect attempt started, then done when
+            connecting socket ready or attempt timed out)
+           Returns time to next step (s)
+        """
+        if self._pending is not None:
+            s, self._pending = self._pending, None
+            return self._attempted(self.client.connect_done(s, ready=ready))
+
+        if not self.connected:
+            self._set_state(ConnectionState.connecting)
+            self._pending = self.client.connect_start()
+            if self._pending is None:
+                return self._attempted(False)
+            return cfgt._FT3_TCPIP_CONN_TIMEOUT_S
+
+        return self._poll()
+
+    def _abort(self):
+        """Abort connect attempt in progress (connections thread)
+        """
+        s, self._pending = self._pending, None
+        if s is not None:
+            s.close()
+
+    def _attempted(self, ok):
+        """Connect attempt done, backing off iff failed
+           Returns time to next step (s)
+        """
+        if ok:
+            if self.num_connects:
+                self.num_reconnects += 1
+            self.num_connects += 1
+            self._attempt = 0
+            self._set_state(ConnectionState.connected)
+            return cfgt._FT3_TCPIP_CONN_POLL_S
+
+        self._set_state(ConnectionState.disconnected)
+        dt = self._backoff()
+        self._attempt += 1
+        return dt
+
+    def _poll(self):
+        """Connected state-machine step
+           (degraded connection reset iff stale or heartbeat failing)
+           Returns time to next step (s)
+        """
+        _methodname = self._poll.__name__
+
+        # Stale connection (no received data)
+        if time.monotonic() - self.client.last_rx > cfgt._FT3_TCPIP_CONN_STALE_S:
+            self._stale += 1
+            self.degrade()
+        else:
+            self._stale = 0
+
+        _misses = self.client.telemetry.heartbeat_misses
+        if _misses >= cfgt._FT3_TCPIP_CONN_HEARTBEAT_RESET_NUM:
+            self.degrade()
+
+        if self._stale >= cfgt._FT3_TCPIP_CONN_STALE_RESET_NUM or _misses >= cfgt._FT3_TCPIP_CONN_HEARTBEAT_RESET_NUM:
+            if self.verbose >= util.VerboseLevel.warn:
+                util._FT3_UTIL_VERBOSE_WARN_WITH_TS(_methodname)
+                print("FasTrak3 {} connection reset [stale polls {} heartbeat failures {}]".format(self.client.board.ip, self._stale, _misses))
+                sys.stdout.flush()
+
+            # NB: Reset reconnects via lost (disconnected, connecting)
+            self._stale = 0
+            self.client.telemetry.heartbeat_misses = 0
+            self.num_resets += 1
+            self.client.reset()
+
+        return cfgt._FT3_TCPIP_CONN_POLL_S
+
+
+class Connections(object):
+    def __init__(self, verbose=util.VerboseLevel.info):
+        """Initialize connections of many FasTrak3 boards
+           (one thread stepping connection managers when due)
+           NB: Connect attempts are non-blocking and concurrent (connecting
+               sockets selected until done or timed out), so unreachable
+               boards neither delay others nor block the thread
+        """
+        self.verbose = verbose
+
+        self.managers = []
+        self._removed = [] # Removed managers (connect attempts aborted by thread)
+        self._mutex = Lock()
+
+        # Wake socket pair (interrupts select of connecting sockets)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+        self.thread = Thread(target=self._run, name=cfgt._FT3_TCPIP_CONN_THREAD_NAME, daemon=True)
+        self.thread.start()
+
+    def add(self, M):
+        """Add connection manager (stepped immediately)
+        """
+        with self._mutex:
+            if M not in self.managers:
+                self.managers = self.managers + [M]
+        M._due = 0.0
+        self.wake()
+
+    def remove(self, M):
+        """Remove connection manager
+        """
+        with self._mutex:
+            self.managers = [m for m in self.managers if m is not M]
+            self._removed += [M]
+        self.wake()
+
+    def wake(self):
+        try:
+            self._wake_w.send(b'\x00')
+        except OSError:
+            pass # Wake pending (socket buffer full)
+
+    def _run(self):
+        """Connections thread
+        """
+        while True:
+            with self._mutex:
+                _removed, self._removed = self._removed, []
+            for M in _removed:
+                M._abort()
+
+            for M in self.managers:
+                if M._stop.is_set():
+                    M._abort()
+                elif time.monotonic() >= M._due:
+                    self._step(M)
+
+            # Connecting sockets (done when writable, or error)
+            _pending = {M._pending: M for M in self.managers if M._pending is not None}
+
+            _due = [M._due for M in self.managers if not M._stop.is_set()]
+            dt = min(min(_due, default=np.inf) - time.monotonic(), cfgt._FT3_TCPIP_CONN_POLL_S)
+
+            try:
+                r,w,x = select.select([self._wake_r], list(_pending), list(_pending), max(dt, 0.0))
+            except (OSError, ValueError):
+                continue
+
+            if self._wake_r in r:
+                try:
+                    while self._wake_r.recv(4096):
+                        pass
+                except OSError:
+                    pass
+
+            for s in set(w) | set(x):
+                self._step(_pending[s], ready=True)
+
+    def _step(self, M, ready=False):
+        """Step connection manager M, scheduling its next step
+        """
+        _methodname = self._step.__name__
+
+        # NB: Connection lost during step (due reset) stepped again immediately
+        M._due = np.inf
+        try:
+            dt = M._step(ready=ready)
+        except Exception as e:
+            dt = cfgt._FT3_TCPIP_CONN_POLL_S
+            if self.verbose >= util.VerboseLevel.error:
+                util._FT3_UTIL_VERBOSE_ERROR_WITH_TS(_methodname)
+                print("FasTrak3 {} connection exception e {}".format(M.client.board.ip, e))
+                sys.stdout.flush()
+        if M._due == np.inf:
+            M._due = time.monotonic() + dt
+
+_connections = None
+_mutex = Lock()
+
+def connections(verbose=util.VerboseLevel.info):
+    """Get process-wide FasTrak3 connections (started on first use)
+    """
+    global _connections
+    with _mutex:
+        if _connections is None:
+            _connections = Connections(verbose=verbose)
+    return _connections
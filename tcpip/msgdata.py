@@ -116,6 +116,15 @@ _FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES += ['one_ms_timer']
 _FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES += ['position']
 _FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES += ['sample_num']
 
+# Shot data NumPy structured dtype (packed, mirrors shot data format)
+_FT3_TCPIP_ASYNC_SHOT_DATA_DTYPE = np.dtype([(n, _FT3_TCPIP_ASYNC_SHOT_DATA_FORMAT[0] + f) for n,f in
+                                             zip(_FT3_TCPIP_ASYNC_SHOT_DATA_PARAMETER_NAMES, _FT3_TCPIP_ASYNC_SHOT_DATA_FORMAT[1:])])
+_FT3_TCPIP_ASYNC_SHOT_DATA_LEN   = _FT3_TCPIP_ASYNC_SHOT_DATA_DTYPE.itemsize
+
+# Zero-copy shot data samples view of buffer (trailing partial sample ignored)
+_FT3_TCPIP_ASYNC_SHOT_DATA_VIEW = lambda b: np.frombuffer(b, dtype=_FT3_TCPIP_ASYNC_SHOT_DATA_DTYPE,
+                                                          count=len(b) // _FT3_TCPIP_ASYNC_SHOT_DATA_LEN)
+
 
 @unique
 class AsyncDataType(IntEnum):
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 TCP/IP batched frame reader
+"""
+import struct
+
+import tcpip.config as cfgt
+import tcpip.msgdata as msg
+
+
+class FrameReader(object):
+    def __init__(self, size=cfgt._FT3_TCPIP_READER_BUFFER_LEN):
+        """Initialize frame reader
+           (reusable receive buffer filled by recv_into)
+        """
+        self._buf = bytearray(max(int(size), msg._FT3_TCPIP_ASYNC_BUFFER_LEN, msg._FT3_TCPIP_RESP_LEN))
+        self._mv = memoryview(self._buf)
+        self._r = 0 # Read (parse) position
+        self._w = 0 # Write (fill) position
+
+        self.num_recv = 0   # recv_into calls
+        self.num_frames = 0 # Frames parsed
+
+    def __len__(self):
+        """Get buffered (unparsed) byte count
+        """
+        return self._w - self._r
+
+    def fill(self, sock):
+        """Fill buffer from socket (one recv_into)
+           Returns bytes received, zero on EOF
+           NB: Invalidates frame views of previous fill
+        """
+        self._compact()
+
+        n = sock.recv_into(self._mv[self._w:])
+        self._w += n
+        self.num_recv += 1
+        return n
+
+    def feed(self, data):
+        """Append received bytes to buffer (e.g. asyncio protocol data)
+           NB: Invalidates frame views of previous fill
+        """
+        self._compact()
+
+        n = len(data)
+        if self._w + n > len(self._buf):
+            # Grow buffer (previous views retain previous buffer)
+            _buf = bytearray(max(2 * len(self._buf), self._w + n))
+            _buf[:self._w] = self._buf[:self._w]
+            self._buf,self._mv = _buf,memoryview(_buf)
+
+        self._mv[self._w:self._w+n] = data
+        self._w += n
+        self.num_recv += 1
+        return n
+
+    def frames(self):
+        """Parse complete buffered frames
+           Yields (async header or None, zero-copy frame body view)
+           NB: Views are valid until next fill
+        """
+        _hlen = msg._FT3_TCPIP_ASYNC_HEADER_LEN
+
+        while self._w > self._r:
+            _u = self._buf[self._r]
+            if not (_u & msg._FT3_TCPIP_ASYNC_BIT):
+                # Response frame (fixed length, incl. frame byte)
+                i1 = self._r + msg._FT3_TCPIP_RESP_LEN
+                if i1 > self._w:
+                    return
+                hdr,i0 = None,self._r
+            else:
+                # Async header (frame byte async bit unset) and data
+                if self._r + _hlen > self._w:
+                    return
+                hdr = list(struct.unpack_from(msg._FT3_TCPIP_ASYNC_HEADER_FORMAT, self._buf, self._r))
+                hdr[0] = _u & ~msg._FT3_TCPIP_ASYNC_BIT
+                hdr = msg.AsyncHeader(*hdr)
+
+                i0 = self._r + _hlen
+                i1 = i0 + hdr.num_bytes
+                if i1 > self._w:
+                    return
+
+            self._r = i1
+            self.num_frames += 1
+            yield hdr, self._mv[i0:i1]
+
+    def tail(self, n):
+        """Get zero-copy view of last n buffered bytes (e.g. of last fill)
+        """
+        return self._mv[self._w-n:self._w]
+
+    def clear(self):
+        """Discard buffered bytes (e.g. on reconnect)
+        """
+        self._r = self._w = 0
+
+    def _compact(self):
+        """Compact unparsed tail to buffer start
+        """
+        if self._r:
+            n = self._w - self._r
+            self._buf[:n] = self._buf[self._r:self._w]
+            self._r,self._w = 0,n
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 async shot dataset reassembly
+"""
+import numpy as np
+
+from dataclasses import dataclass
+
+import tcpip.config as cfgt
+import tcpip.msgdata as msg
+
+
+@dataclass
+class ReassemblyCounters:
+    datasets    : int # Datasets started
+    packets     : int # Packets written
+    missing     : int # Packets missing from completed datasets
+    duplicate   : int # Packets received more than once (ignored)
+    out_of_range: int # Packets with invalid packet number (ignored)
+
+
+class DatasetReassembly(object):
+    def __init__(self):
+        """Initialize async dataset reassembly
+           (buffer sized from header packet count, reused across datasets)
+        """
+        self._buf = bytearray()
+        self._received = np.zeros(0, dtype=bool)
+        self._len = 0
+
+        self.dataset_num = None
+        self.num_packets = 0
+        self.started = False # Dataset started since cleared (e.g. of shot)
+
+        self.counters = ReassemblyCounters(datasets=0, packets=0, missing=0, duplicate=0, out_of_range=0)
+
+    def __len__(self):
+        return self._len
+
+    def start(self, dataset_num, num_packets):
+        """Start dataset, (re)allocating buffer iff too small
+           NB: Reused buffer zeroed so packets missing from dataset
+               never decode bytes of prior dataset
+        """
+        self.finish()
+
+        n = num_packets * msg._FT3_TCPIP_ASYNC_DATA_LEN
+        if len(self._buf) < n:
+            self._buf = bytearray(n)
+        else:
+            np.frombuffer(self._buf, dtype=np.uint8, count=n)[:] = 0
+        if len(self._received) < num_packets:
+            self._received = np.zeros(num_packets, dtype=bool)
+        self._received[:] = False
+        self._len = 0
+
+        self.dataset_num = dataset_num
+        self.num_packets = num_packets
+        self.started = True
+        self.counters.datasets += 1
+
+    def add(self, header, data):
+        """Write packet at its dataset offset
+           Returns False if packet ignored (duplicate or out of range)
+        """
+        if header.dataset_num != self.dataset_num or self.dataset_num is None:
+            self.start(header.dataset_num, header.num_packets)
+
+        k = header.packet_num - cfgt._FT3_TCPIP_ASYNC_PACKET_NUM_BASE
+        n = len(data)
+        if k < 0 or k >= self.num_packets or n > msg._FT3_TCPIP_ASYNC_DATA_LEN:
+            self.counters.out_of_range += 1
+            return False
+        if self._received[k]:
+            self.counters.duplicate += 1
+            return False
+
+        # NB: Packets full length but final packet
+        i0 = k * msg._FT3_TCPIP_ASYNC_DATA_LEN
+        memoryview(self._buf)[i0:i0+n] = data
+        self._received[k] = True
+        self._len = max(self._len, i0 + n)
+        self.counters.packets += 1
+        return True
+
+    def finish(self):
+        """Finish dataset, counting missing packets
+        """
+        if self.dataset_num is not None:
+            self.counters.missing += self.missing
+        self.dataset_num = None
+
+    def clear(self):
+        """Finish dataset and discard its data
+        """
+        self.finish()
+        self._len = 0
+        self.started = False
+
+    def view(self):
+        """Get zero-copy view of dataset bytes
+           NB: View is valid until next dataset is started
+        """
+        return memoryview(self._buf)[:self._len]
+
+    @property
+    def missing(self):
+        """Get missing packets of current dataset
+        """
+        return int(self.num_packets - np.count_nonzero(self._received[:self.num_packets])) if self.dataset_num is not None else 0
+
+    @property
+    def empty(self):
+        return self.dataset_num is None and not self._len
+
+
+class ShotReassembly(object):
+    def __init__(self):
+        """Initialize shot reassembly of position- and time- sampled datasets
+        """
+        self.datasets = {msg.AsyncDataType.shot_pos : DatasetReassembly(),
+                         msg.AsyncDataType.shot_time: DatasetReassembly()}
+
+    def __getitem__(self, type):
+        return self.datasets[type]
+
+    def add(self, type, header, data):
+        """Write packet of dataset type
+        """
+        return self.datasets[type].add(header, data)
+
+    def clear(self):
+        """Finish shot datasets and discard their data
+        """
+        for d in self.datasets.values():
+            d.clear()
+
+    def view(self, type):
+        """Get zero-copy view of dataset bytes
+        """
+        return self.datasets[type].view()
+
+    @property
+    def absent(self):
+        """Get shot datasets never started (e.g. all packets lost)
+           NB: Shot datasets are all required, packet count of absent
+               dataset unknown (incomplete regardless)
+        """
+        return [t for t,d in self.datasets.items() if not d.started]
+
+    @property
+    def counters(self):
+        """Get reassembly counters (summed over datasets)
+        """
+        c = ReassemblyCounters(datasets=0, packets=0, missing=0, duplicate=0, out_of_range=0)
+        for d in self.datasets.values():
+            for f in c.__dataclass_fields__:
+                setattr(c, f, getattr(c, f) + getattr(d.counters, f))
+        return c
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 TCP/IP connection health telemetry
+"""
+import time
+
+from threading import Lock
+
+import numpy as np
+
+import metrics.metrics as metrics
+import tcpip.config as cfgt
+import tcpip.msgdata as msg
+
+
+class Telemetry(object):
+    def __init__(self):
+        """Initialize connection telemetry
+           (heartbeat round-trip time, receive throughput, async packets
+            per shot, reconnects and time since last frame)
+        """
+        self.rtt = metrics.Histogram(cfgt._FT3_TCPIP_TELEMETRY_RTT_EDGES_MS) # Heartbeat RTT (ms)
+        self.rtt_stats = metrics.LatencyStats()                              # Heartbeat RTT (s)
+
+        self.rx_bytes = metrics.RateCounter()
+        self.rx_frames = metrics.RateCounter()
+
+        self.packets = metrics.LatencyStats(maxlen=cfgt._FT3_TCPIP_TELEMETRY_SHOTS_NUM) # Async packets per shot
+        self._packets = 0 # Shot data packets of current shot
+
+        self.num_connects = 0
+        self.num_heartbeats = 0
+        self.num_heartbeat_failures = 0
+        self.heartbeat_misses = 0 # Consecutive heartbeat failures
+
+        self.last_frame = None # Time (monotonic) of last received frame
+
+        self._mutex = Lock()
+
+    def connected(self):
+        """Record (re)connection
+        """
+        with self._mutex:
+            self.num_connects += 1
+            self._packets = 0
+            self.heartbeat_misses = 0
+
+    def rx(self, n):
+        """Record received bytes
+        """
+        self.rx_bytes.add(n)
+
+    def frame(self, hdr):
+        """Record received frame (header None for command response)
+        """
+        self.rx_frames.add()
+        self.last_frame = time.monotonic()
+
+        if hdr is None:
+            return
+        if hdr.bin_type in (msg.AsyncDataType.shot_pos, msg.AsyncDataType.shot_time):
+            self._packets += 1
+        elif hdr.bin_type == msg.AsyncDataType.shot_comp:
+            self.packets.add(self._packets)
+            self._packets = 0
+
+    def heartbeat(self, t0, f):
+        """Record heartbeat response (done callback of heartbeat
+           request future sent at t0, perf_counter)
+        """
+        self.num_heartbeats += 1
+        if f.cancelled() or f.exception() is not None:
+            self.num_heartbeat_failures += 1
+            self.heartbeat_misses += 1
+            return
+        self.heartbeat_misses = 0
+
+        dt = time.perf_counter() - t0
+        self.rtt.add(1000.0 * dt)
+        self.rtt_stats.add(dt)
+
+    @property
+    def num_reconnects(self):
+        return max(self.num_connects - 1, 0)
+
+    @property
+    def since_last_frame(self):
+        """Get time since last received frame (s, None if none received)
+        """
+        return (time.monotonic() - self.last_frame) if self.last_frame is not None else None
+
+    def snapshot(self):
+        """Get telemetry (rates per second over trailing window,
+           RTT in ms)
+        """
+        _rtt = self.rtt_stats.summary()
+        _pk = self.packets.summary()
+        return {'rtt'             : {k: 1000.0 * v if k != 'count' else v for k,v in _rtt.items()},
+                'rtt_histogram'   : self.rtt.summary(),
+                'heartbeats'      : self.num_heartbeats,
+                'heartbeat_fails' : self.num_heartbeat_failures,
+                'rx_bytes'        : self.rx_bytes.total,
+                'rx_bytes_per_s'  : self.rx_bytes.rate(),
+                'rx_frames'       : self.rx_frames.total,
+                'rx_frames_per_s' : self.rx_frames.rate(),
+                'packets_per_shot': {'shots': _pk['count'], 'mean': _pk['mean'], 'max': _pk['max']},
+                'reconnects'      : self.num_reconnects,
+                'since_last_frame': self.since_last_frame if self.last_frame is not None else np.nan}
+
+    def clear(self):
+        with self._mutex:
+            self.rtt.clear()
+            self.rtt_stats.clear()
+            self.rx_bytes.clear()
+            self.rx_frames.clear()
+            self.packets.clear()
+            self._packets = 0
+            self.num_connects = 0
+            self.num_heartbeats = 0
+            self.num_heartbeat_failures = 0
+            self.heartbeat_misses = 0
+            self.last_frame = None
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 asyncio TCP/IP client tests
+"""
+import asyncio
+
+import pytest
+
+import tcpip.aclient as aclient
+import tcpip.config as cfgt
+import tcpip.msgdata as msg
+import util.util as util
+
+
+class _Transport(object):
+    def __init__(self):
+        """Loopback transport (records writes and close)
+        """
+        self.tx = []
+        self.closed = False
+
+    def write(self, b):
+        self.tx += [b]
+
+    def close(self):
+        self.closed = True
+
+
+def _resp(k):
+    """Response frame (fixed length) tagged k
+    """
+    return bytes([0, k]) + bytes(msg._FT3_TCPIP_RESP_LEN - 2)
+
+
+def _client():
+    C = aclient.AsyncClient(ip='127.0.0.1', verbose=util.VerboseLevel.off)
+    C._loop = asyncio.get_running_loop()
+    C._transport = _Transport()
+    return C
+
+
+def test_request_late_response():
+    async def _run():
+        C = _client()
+
+        # Response arrives after request timeout
+        with pytest.raises(asyncio.TimeoutError):
+            await C.request(b'a', timeout=0.01)
+        C._data_received(_resp(1))
+        assert C.num_late == 1
+
+        # Next request resolved by its own response
+        f = asyncio.ensure_future(C.request(b'b', timeout=1.0))
+        await asyncio.sleep(0)
+        C._data_received(_resp(2))
+        assert (await f).data[1] == 2
+        assert not C._transport.closed
+
+    asyncio.run(_run())
+
+
+def test_request_lost_response(monkeypatch):
+    monkeypatch.setattr(cfgt, '_FT3_TCPIP_ACLIENT_LATE_RESPONSE_S', 0.01)
+
+    async def _run():
+        C = _client()
+        _T = C._transport
+
+        # Response never arrives, connection reset after grace
+        with pytest.raises(asyncio.TimeoutError):
+            await C.request(b'a', timeout=0.01)
+        await asyncio.sleep(0.05)
+        assert _T.closed
+
+    asyncio.run(_run())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ABSTRACT: Visi-Trak FasTrak3 shot reassembly tests
+"""
+import numpy as np
+import pandas as pd
+
+import tcpip.callbacks as callbacks
+import tcpip.msgdata as msg
+import tcpip.config as cfgt
+import util.util as util
+
+
+def _frames(type, dataset_num, num_samples):
+    """Async frames (header, data, t) of shot dataset of num_samples
+    """
+    b = np.arange(num_samples * msg._FT3_TCPIP_ASYNC_SHOT_DATA_LEN, dtype=np.uint8).tobytes()
+    n = msg._FT3_TCPIP_ASYNC_DATA_LEN
+    _num = (len(b) + n - 1) // n
+    return [(msg.AsyncHeader(bin_id=0, bin_type=type, flags=0, dataset_num=dataset_num,
+                             packet_num=cfgt._FT3_TCPIP_ASYNC_PACKET_NUM_BASE + k, num_packets=_num,
+                             num_bytes=len(b[k*n:(k+1)*n])), b[k*n:(k+1)*n], pd.Timestamp.now())
+            for k in range(_num)]
+
+
+def _comp():
+    return (msg.AsyncHeader(bin_id=0, bin_type=msg.AsyncDataType.shot_comp, flags=0, dataset_num=0,
+                            packet_num=0, num_packets=1, num_bytes=0), b'', pd.Timestamp.now())
+
+
+def _shot(C, pos=True, time=True):
+    """Reassemble shot (datasets optionally lost), returns shot or None
+    """
+    _f = []
+    if pos:
+        _f += _frames(msg.AsyncDataType.shot_pos, 1, 500)
+    if time:
+        _f += _frames(msg.AsyncDataType.shot_time, 2, 700)
+    for f in _f:
+        C._reassemble_stage(f)
+    return C._reassemble_stage(_comp())
+
+
+def test_shot_complete():
+    C = callbacks.Callbacks(verbose=util.VerboseLevel.off)
+    try:
+        S = _shot(C)
+        assert S is not None
+        assert (S.meta.num_p, S.meta.num_t) == (500, 700)
+        assert C.num_incomplete == 0
+    finally:
+        C.pipeline.close(drain=False)
+
+
+def test_shot_dataset_lost():
+    C = callbacks.Callbacks(verbose=util.VerboseLevel.off)
+    try:
+        assert _shot(C, time=False) is None
+        assert _shot(C, pos=False) is None
+        assert C.num_incomplete == 2
+
+        # Reassembly recovers on next complete shot
+        assert _shot(C) is not None
+        assert C.num_incomplete == 2
+    finally:
+        C.pipeline.close(drain=False)